@@ -25,6 +25,14 @@ class AnalysisAgent(BaseAgent):
 
     def run(self, user_input: str) -> Dict[str, Any]:
         """运行分析代理"""
+        return self.drive(self._run_steps(user_input))
+
+    async def arun(self, user_input: str) -> Dict[str, Any]:
+        """异步运行分析代理"""
+        return await self.adrive(self._run_steps(user_input))
+
+    def _run_steps(self, user_input: str):
+        """分析流程的步骤生成器，由run/arun驱动"""
         logger.info(f"开始分析用户需求: {user_input}")
 
         try:
@@ -67,7 +75,7 @@ class AnalysisAgent(BaseAgent):
 
             # 发送请求
             try:
-                response = self.send_to_llm()
+                response = yield self.llm_step()
                 result = self.parse_json_response(response)
             except Exception as api_error:
                 logger.error(f"API请求失败: {str(api_error)}")
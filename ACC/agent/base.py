@@ -4,14 +4,24 @@
 Agent负责与LLM交互，执行特定任务。
 """
 
+import asyncio
 import json
 import logging
 import os
-import time
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional, Union, Callable, TypeVar
+from typing import Dict, List, Any, Optional, Union, Callable, TypeVar, Generator, Tuple
 
-from ACC.llm import send_message, parse_json_response
+from ACC.agent.context_window import ContextWindowManager
+from ACC.config import get_llm_config
+from ACC.llm import (
+    send_message,
+    async_send_message,
+    send_message_stream,
+    async_send_message_stream,
+    parse_json_response,
+    StreamAccumulator,
+)
+from ACC.retry import RetryBudget, RetryEngine, RetryPolicy
 from ACC.tool.base import ToolRegistry
 
 logger = logging.getLogger(__name__)
@@ -19,6 +29,58 @@ logger = logging.getLogger(__name__)
 # 定义泛型类型变量
 T = TypeVar('T')
 
+# 步骤生成器：yield出(步骤类型, 参数)，由驱动函数执行后把结果send回生成器
+Step = Tuple[str, Any]
+StepGenerator = Generator[Step, Any, Any]
+
+
+def drive_steps(steps: StepGenerator, perform: Callable[[str, Any], Any]) -> Any:
+    """同步驱动步骤生成器
+
+    Args:
+        steps: 步骤生成器
+        perform: 执行单个步骤的函数，参数为(步骤类型, 参数)
+
+    Returns:
+        步骤生成器的返回值
+    """
+    try:
+        step = next(steps)
+        while True:
+            try:
+                value = perform(*step)
+            except Exception as e:
+                # 将异常抛回生成器，由生成器内部的try/except处理
+                step = steps.throw(e)
+            else:
+                step = steps.send(value)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def adrive_steps(steps: StepGenerator, aperform: Callable[[str, Any], Any]) -> Any:
+    """异步驱动步骤生成器，与drive_steps逻辑相同，但每个步骤以await方式执行
+
+    Args:
+        steps: 步骤生成器
+        aperform: 执行单个步骤的协程函数，参数为(步骤类型, 参数)
+
+    Returns:
+        步骤生成器的返回值
+    """
+    try:
+        step = next(steps)
+        while True:
+            try:
+                value = await aperform(*step)
+            except Exception as e:
+                step = steps.throw(e)
+            else:
+                step = steps.send(value)
+    except StopIteration as stop:
+        return stop.value
+
+
 class BaseAgent(ABC):
     """Agent基础类"""
     
@@ -32,6 +94,16 @@ class BaseAgent(ABC):
         self.name = name
         self.system_prompt = system_prompt
         self.messages = []
+        llm_config = get_llm_config()
+        self.retry_engine = RetryEngine(
+            name=name, policy=RetryPolicy.from_config(llm_config)
+        )
+        # 是否使用流式响应，以及最近一次流式响应的统计信息（含首token耗时）
+        self.stream = llm_config.get("stream", False)
+        self.last_stream_stats = None
+        # 上下文窗口管理，以及最近一次请求的压缩报告（含节省的token数）
+        self.context_manager = ContextWindowManager.from_config(llm_config)
+        self.last_context_report = None
         self.reset_messages()
     
     def reset_messages(self):
@@ -105,8 +177,19 @@ class BaseAgent(ABC):
         """
         return ToolRegistry.get_tools_dict()
     
+    def set_retry_budget(self, budget: Optional[RetryBudget]):
+        """设置共享的重试预算（由工作流在其所有Agent之间共享）
+        
+        Args:
+            budget: 重试预算
+        """
+        self.retry_engine.budget = budget
+    
     def retry_operation(self, func: Callable[..., T], *args, **kwargs) -> T:
-        """重试操作装饰器
+        """重试操作
+        
+        退避、Retry-After和重试预算由RetryEngine统一处理；
+        单次请求的超时由传输层控制，超时的请求会被socket层中断，不会遗留线程。
         
         Args:
             func: 要执行的函数
@@ -117,72 +200,24 @@ class BaseAgent(ABC):
             函数执行结果
             
         Raises:
-            Exception: 如果重试三次后仍然失败，则抛出最后一次的异常
+            Exception: 如果重试后仍然失败，则抛出最后一次的异常
         """
-        max_retries = 5
-        retry_delay = 30  # 秒
-        request_timeout = 180  # 3分钟超时时间
-        anti_stuck_retries = 3  # 防卡重试次数
-        anti_stuck_delay = 15  # 防卡重试等待时间（秒）
+        return self.retry_engine.call(func, *args, **kwargs)
+    
+    async def aretry_operation(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """异步重试操作，func为协程函数
+
+        超时通过asyncio.wait_for取消正在进行的请求，不会遗留线程。
         
-        for attempt in range(1, max_retries + 1):
-            try:
-                # 添加超时控制
-                import threading
-                import concurrent.futures
-                
-                # 使用线程池执行函数，设置超时时间
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(func, *args, **kwargs)
-                    try:
-                        return future.result(timeout=request_timeout)
-                    except concurrent.futures.TimeoutError:
-                        # 请求超时，实施防卡重试策略
-                        logger.warning(f"[{self.name}] 请求超时 (超过 {request_timeout} 秒)")
-                        
-                        # 尝试取消正在执行的任务
-                        for t in threading.enumerate():
-                            if t.name.startswith('ThreadPoolExecutor'):
-                                # 这里无法直接终止线程，但会在下一次循环中重新创建线程池
-                                pass
-                        
-                        # 防卡重试逻辑
-                        for anti_stuck_attempt in range(1, anti_stuck_retries + 1):
-                            logger.info(f"[{self.name}] 防卡重试 ({anti_stuck_attempt}/{anti_stuck_retries})，等待 {anti_stuck_delay} 秒后重试...")
-                            time.sleep(anti_stuck_delay)
-                            
-                            # 创建新的线程池重试
-                            with concurrent.futures.ThreadPoolExecutor() as retry_executor:
-                                retry_future = retry_executor.submit(func, *args, **kwargs)
-                                try:
-                                    return retry_future.result(timeout=request_timeout)
-                                except concurrent.futures.TimeoutError:
-                                    logger.warning(f"[{self.name}] 防卡重试 {anti_stuck_attempt} 仍然超时")
-                                    continue  # 继续下一次防卡重试
-                                except Exception as e:
-                                    logger.warning(f"[{self.name}] 防卡重试 {anti_stuck_attempt} 出错: {str(e)}")
-                                    continue  # 继续下一次防卡重试
-                        
-                        # 如果所有防卡重试都失败，抛出超时异常
-                        raise TimeoutError(f"请求超时 (超过 {request_timeout} 秒)，且 {anti_stuck_retries} 次防卡重试均失败")
-                        
-            except TimeoutError as e:
-                logger.error(f"[{self.name}] 请求超时且防卡重试失败: {str(e)}")
-                if attempt < max_retries:
-                    logger.info(f"[{self.name}] 等待 {retry_delay} 秒后进行常规重试...")
-                    time.sleep(retry_delay)
-                else:
-                    logger.error(f"[{self.name}] 重试 {max_retries} 次后仍然失败")
-                    raise
-            except Exception as e:
-                logger.warning(f"[{self.name}] 操作失败 (尝试 {attempt}/{max_retries}): {str(e)}")
-                
-                if attempt < max_retries:
-                    logger.info(f"[{self.name}] 等待 {retry_delay} 秒后重试...")
-                    time.sleep(retry_delay)
-                else:
-                    logger.error(f"[{self.name}] 重试 {max_retries} 次后仍然失败")
-                    raise
+        Args:
+            func: 要执行的协程函数
+            *args: 函数参数
+            **kwargs: 函数关键字参数
+            
+        Returns:
+            函数执行结果
+        """
+        return await self.retry_engine.acall(func, *args, **kwargs)
     
     @abstractmethod
     def run(self, user_input: str) -> Dict[str, Any]:
@@ -196,32 +231,190 @@ class BaseAgent(ABC):
         """
         pass
     
-    def send_to_llm(self, tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
-        """发送消息到LLM
+    async def arun(self, *args, **kwargs) -> Dict[str, Any]:
+        """异步运行Agent
+
+        子类应通过步骤生成器同时实现run和arun；未实现时退回到线程中执行run。
+        
+        Returns:
+            运行结果字典
+        """
+        return await asyncio.to_thread(self.run, *args, **kwargs)
+    
+    def llm_step(
+        self,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        on_delta: Optional[Callable[[str, StreamAccumulator], None]] = None,
+    ) -> Step:
+        """构造一个LLM请求步骤，在步骤生成器中使用: response = yield self.llm_step()
         
         Args:
             tools: 工具列表，默认为None
+            on_delta: 流式模式下每收到一段文本时的回调
             
         Returns:
-            LLM响应字典
+            步骤元组
+        """
+        return ("llm", {"tools": tools, "on_delta": on_delta})
+    
+    def blocking_step(self, func: Callable[..., Any], *args, **kwargs) -> Step:
+        """构造一个阻塞调用步骤（如工具执行），异步驱动时会放到线程中执行
+        
+        Args:
+            func: 要执行的函数
+            *args: 函数参数
+            **kwargs: 函数关键字参数
+            
+        Returns:
+            步骤元组
         """
-        # 在发送前规范化消息
-        normalized_messages = self.normalize_messages(self.messages)
+        return ("call", (func, args, kwargs))
+    
+    def perform_step(self, kind: str, payload: Any) -> Any:
+        """同步执行单个步骤"""
+        if kind == "llm":
+            return self.send_to_llm(**payload)
+        if kind == "call":
+            func, args, kwargs = payload
+            return func(*args, **kwargs)
+        raise ValueError(f"未知的步骤类型: {kind}")
+    
+    async def aperform_step(self, kind: str, payload: Any) -> Any:
+        """异步执行单个步骤"""
+        if kind == "llm":
+            return await self.asend_to_llm(**payload)
+        if kind == "call":
+            func, args, kwargs = payload
+            return await asyncio.to_thread(func, *args, **kwargs)
+        raise ValueError(f"未知的步骤类型: {kind}")
+    
+    def drive(self, steps: StepGenerator) -> Any:
+        """同步驱动本Agent的步骤生成器"""
+        return drive_steps(steps, self.perform_step)
+    
+    async def adrive(self, steps: StepGenerator) -> Any:
+        """异步驱动本Agent的步骤生成器"""
+        return await adrive_steps(steps, self.aperform_step)
+    
+    def _build_llm_kwargs(self, tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """构建发送到LLM的请求参数
+        
+        Args:
+            tools: 工具列表，默认为None
+            
+        Returns:
+            请求参数字典
+        """
+        # 压缩到上下文预算以内，再规范化消息
+        messages, report = self.context_manager.fit(self.messages)
+        self.last_context_report = report
+        if report["tokens_saved"]:
+            logger.info(
+                f"[{self.name}] 上下文压缩 ({', '.join(report['strategies'])}): "
+                f"{report['tokens_before']} -> {report['tokens_after']} tokens，"
+                f"节省 {report['tokens_saved']} tokens"
+            )
+        normalized_messages = self.normalize_messages(messages)
         
         # 获取当前配置的max_tokens
-        from ACC.config import get_llm_config
         config = get_llm_config()
         max_tokens = config.get('max_tokens', None)
         
-        # 始终发送max_tokens参数
-        kwargs = {
+        # 始终发送max_tokens参数，单次请求超时交给传输层
+        return {
             'messages': normalized_messages, 
             'tools': tools,
-            'max_tokens': max_tokens
+            'max_tokens': max_tokens,
+            'timeout': self.retry_engine.policy.request_timeout,
         }
+    
+    def send_to_llm(
+        self,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        on_delta: Optional[Callable[[str, StreamAccumulator], None]] = None,
+        stream: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """发送消息到LLM
+        
+        Args:
+            tools: 工具列表，默认为None
+            on_delta: 流式模式下每收到一段文本时的回调，参数为(新文本, 累加器)，可用于提前处理部分输出
+            stream: 是否使用流式响应，默认使用配置中的stream
             
+        Returns:
+            LLM响应字典
+        """
+        kwargs = self._build_llm_kwargs(tools)
+        if self.stream if stream is None else stream:
+            return self.retry_operation(self._collect_stream, kwargs, on_delta)
         return self.retry_operation(send_message, **kwargs)
     
+    async def asend_to_llm(
+        self,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        on_delta: Optional[Callable[[str, StreamAccumulator], None]] = None,
+        stream: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """异步发送消息到LLM
+        
+        Args:
+            tools: 工具列表，默认为None
+            on_delta: 流式模式下每收到一段文本时的回调
+            stream: 是否使用流式响应，默认使用配置中的stream
+            
+        Returns:
+            LLM响应字典
+        """
+        kwargs = self._build_llm_kwargs(tools)
+        if self.stream if stream is None else stream:
+            # 流式响应可能持续较久，只依赖传输层的读超时
+            return await self.retry_engine.acall(
+                self._acollect_stream, kwargs, on_delta, attempt_timeout=None
+            )
+        return await self.aretry_operation(async_send_message, **kwargs)
+    
+    def _collect_stream(
+        self, kwargs: Dict[str, Any], on_delta: Optional[Callable[[str, StreamAccumulator], None]] = None
+    ) -> Dict[str, Any]:
+        """接收流式响应并拼接为完整响应
+        
+        Args:
+            kwargs: 请求参数
+            on_delta: 每收到一段文本时的回调
+            
+        Returns:
+            与非流式响应格式相同的响应字典
+        """
+        accumulator = StreamAccumulator()
+        for chunk in send_message_stream(**kwargs):
+            text = accumulator.add(chunk)
+            if text and on_delta:
+                on_delta(text, accumulator)
+        return self._finish_stream(accumulator)
+    
+    async def _acollect_stream(
+        self, kwargs: Dict[str, Any], on_delta: Optional[Callable[[str, StreamAccumulator], None]] = None
+    ) -> Dict[str, Any]:
+        """异步接收流式响应并拼接为完整响应"""
+        accumulator = StreamAccumulator()
+        async for chunk in async_send_message_stream(**kwargs):
+            text = accumulator.add(chunk)
+            if text and on_delta:
+                on_delta(text, accumulator)
+        return self._finish_stream(accumulator)
+    
+    def _finish_stream(self, accumulator: StreamAccumulator) -> Dict[str, Any]:
+        """结束流式响应并记录首token耗时"""
+        response = accumulator.result()
+        self.last_stream_stats = accumulator.stats()
+        ttft = self.last_stream_stats["time_to_first_token"]
+        logger.info(
+            f"[{self.name}] 流式响应完成，首token耗时: "
+            f"{'无输出' if ttft is None else f'{ttft:.2f}秒'}，"
+            f"总耗时: {self.last_stream_stats['total_time']:.2f}秒"
+        )
+        return response
+    
     def parse_json_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
         """解析JSON格式的响应
         
@@ -231,4 +424,5 @@ class BaseAgent(ABC):
         Returns:
             解析后的JSON字典
         """
-        return self.retry_operation(parse_json_response, response)
+        # 解析是确定性操作，重试不会改变结果，直接解析
+        return parse_json_response(response)
@@ -0,0 +1,313 @@
+"""上下文窗口管理模块
+
+该模块负责在发送给LLM之前控制消息列表的token数量，避免提示词随着多步任务无限增长。
+- token在本地计数，优先使用tiktoken，未安装时使用基于字符的估算
+- 每个模型有各自的上下文预算，可在配置中覆盖
+- 超出预算时按策略压缩：截断较早的工具结果、将较早的对话压缩为摘要、只保留最近N条
+"""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 常见模型的上下文窗口大小（按模型名前缀匹配，越具体的前缀越靠前）
+MODEL_CONTEXT_WINDOWS = [
+    ("gpt-4o", 128000),
+    ("gpt-4-turbo", 128000),
+    ("gpt-4.1", 1000000),
+    ("gpt-4-32k", 32768),
+    ("gpt-4", 8192),
+    ("gpt-3.5-turbo", 16385),
+    ("o1", 128000),
+    ("o3", 200000),
+    ("claude", 200000),
+    ("deepseek", 64000),
+    ("qwen", 32768),
+    ("glm", 128000),
+]
+
+# 未知模型的默认上下文窗口
+DEFAULT_CONTEXT_WINDOW = 32768
+
+# 每条消息的固定开销（角色、分隔符等）
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# token计数缓存的条目数
+TOKEN_COUNT_CACHE_SIZE = 4096
+
+# 压缩策略，按激进程度排序；指定的策略不足以满足预算时依次使用后面的策略
+STRATEGIES = ("truncate_tool_results", "summarize", "last_n")
+
+# 摘要消息的开头，摘要消息与系统消息一样不再被压缩
+SUMMARY_HEADER = "以下是较早对话的摘要（已压缩以节省上下文）:"
+
+Tokenizer = Callable[[str], int]
+
+
+def heuristic_token_count(text: str) -> int:
+    """估算token数量：ASCII字符约4个一个token，其他字符（如中文）约1个一个token"""
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def get_tokenizer(model: str = "", name: str = "auto") -> Tokenizer:
+    """获取token计数函数
+
+    Args:
+        model: 模型名称，用于选择tiktoken编码
+        name: auto（有tiktoken时使用tiktoken）、tiktoken或heuristic
+
+    Returns:
+        计数函数，参数为文本，返回token数量
+    """
+    if name in ("auto", "tiktoken"):
+        try:
+            import tiktoken
+
+            try:
+                encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                encoding = tiktoken.get_encoding("cl100k_base")
+            return lambda text: len(encoding.encode(text, disallowed_special=()))
+        except Exception as e:
+            if name == "tiktoken":
+                logger.warning(f"无法使用tiktoken计数，改用估算: {e}")
+
+    return heuristic_token_count
+
+
+def get_context_window(model: str) -> int:
+    """根据模型名获取上下文窗口大小"""
+    model = (model or "").lower()
+    for prefix, window in MODEL_CONTEXT_WINDOWS:
+        if model.startswith(prefix) or f"/{prefix}" in model:
+            return window
+    return DEFAULT_CONTEXT_WINDOW
+
+
+class ContextWindowManager:
+    """上下文窗口管理器，将消息列表压缩到token预算以内"""
+
+    def __init__(
+        self,
+        budget: int,
+        tokenizer: Optional[Tokenizer] = None,
+        strategy: str = "truncate_tool_results",
+        keep_last: int = 6,
+        tool_result_tokens: int = 200,
+    ):
+        """初始化上下文窗口管理器
+
+        Args:
+            budget: 消息列表允许的最大token数
+            tokenizer: token计数函数，默认使用get_tokenizer()
+            strategy: 首选的压缩策略，见STRATEGIES
+            keep_last: 始终原样保留的最近消息条数
+            tool_result_tokens: 截断较早的工具结果时保留的token数
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"未知的上下文压缩策略: {strategy}，可选: {', '.join(STRATEGIES)}")
+
+        self.budget = budget
+        self.strategy = strategy
+        self.keep_last = max(keep_last, 1)
+        self.tool_result_tokens = tool_result_tokens
+        self._tokenizer = tokenizer or get_tokenizer()
+        # 同一段内容会在每一轮重复发送，缓存计数结果；以(长度, 哈希)为键，
+        # 不持有文本本身，已被压缩掉的大段工具结果不会因为缓存而常驻内存
+        self._counts: "OrderedDict[Tuple[int, int], int]" = OrderedDict()
+        self._counts_lock = threading.Lock()
+        self.total_saved = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "ContextWindowManager":
+        """根据[llm]配置创建上下文窗口管理器"""
+        model = config.get("model", "")
+        budget = config.get("context_budget")
+        if not budget:
+            # 为模型输出预留空间
+            budget = get_context_window(model) - config.get("context_reserve", 4096)
+
+        return cls(
+            budget=budget,
+            tokenizer=get_tokenizer(model, config.get("context_tokenizer", "auto")),
+            strategy=config.get("context_strategy", "truncate_tool_results"),
+            keep_last=config.get("context_keep_last", 6),
+            tool_result_tokens=config.get("context_tool_result_tokens", 200),
+        )
+
+    def count_tokens(self, text: str) -> int:
+        """计算文本的token数量"""
+        if not text:
+            return 0
+        key = (len(text), hash(text))
+        with self._counts_lock:
+            count = self._counts.get(key)
+            if count is not None:
+                self._counts.move_to_end(key)
+                return count
+        count = self._tokenizer(text)
+        with self._counts_lock:
+            self._counts[key] = count
+            if len(self._counts) > TOKEN_COUNT_CACHE_SIZE:
+                self._counts.popitem(last=False)
+        return count
+
+    def count_message(self, message: Dict[str, Any]) -> int:
+        """计算单条消息的token数量"""
+        content = message.get("content")
+        if not isinstance(content, str):
+            content = json.dumps(content, ensure_ascii=False) if content else ""
+        return MESSAGE_OVERHEAD_TOKENS + self.count_tokens(content)
+
+    def count_messages(self, messages: List[Dict[str, Any]]) -> int:
+        """计算消息列表的token数量"""
+        return sum(self.count_message(message) for message in messages)
+
+    def fit(self, messages: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """将消息列表压缩到预算以内，不修改传入的列表
+
+        系统消息和最近keep_last条消息始终保留，只压缩中间较早的消息。
+
+        Args:
+            messages: 消息列表
+
+        Returns:
+            (压缩后的消息列表, 压缩报告)
+        """
+        tokens_before = self.count_messages(messages)
+        report = {
+            "budget": self.budget,
+            "tokens_before": tokens_before,
+            "tokens_after": tokens_before,
+            "tokens_saved": 0,
+            "strategies": [],
+        }
+        if tokens_before <= self.budget:
+            return messages, report
+
+        result = list(messages)
+        for strategy in STRATEGIES[STRATEGIES.index(self.strategy):]:
+            result = getattr(self, f"_{strategy}")(result)
+            report["strategies"].append(strategy)
+            if self.count_messages(result) <= self.budget:
+                break
+        else:
+            logger.warning(f"上下文压缩后仍超出预算 ({self.count_messages(result)}/{self.budget} tokens)")
+
+        report["tokens_after"] = self.count_messages(result)
+        report["tokens_saved"] = tokens_before - report["tokens_after"]
+        self.total_saved += report["tokens_saved"]
+        return result, report
+
+    @staticmethod
+    def _is_pinned(message: Dict[str, Any]) -> bool:
+        """是否为始终保留的消息（系统消息和摘要消息）"""
+        content = message.get("content")
+        return message.get("role") == "system" or (
+            isinstance(content, str) and content.startswith(SUMMARY_HEADER)
+        )
+
+    def _split(self, messages: List[Dict[str, Any]]) -> Tuple[List[int], List[int]]:
+        """划分可压缩消息与需保留消息的下标
+
+        Returns:
+            (可压缩的较早消息下标, 需原样保留的消息下标)
+        """
+        candidates = [
+            i for i, message in enumerate(messages) if not self._is_pinned(message)
+        ]
+        older = candidates[: max(len(candidates) - self.keep_last, 0)]
+        older_set = set(older)
+        return older, [i for i in range(len(messages)) if i not in older_set]
+
+    def _truncate_text(self, text: str, max_tokens: int) -> str:
+        """保留文本的开头和结尾，省略中间部分"""
+        total = self.count_tokens(text)
+        if total <= max_tokens:
+            return text
+        # 按token占比估算保留的字符数
+        keep_chars = max(int(len(text) * max_tokens / total) // 2, 1)
+        omitted = total - self.count_tokens(text[:keep_chars] + text[-keep_chars:])
+        return f"{text[:keep_chars]}\n...[已省略约 {omitted} tokens]...\n{text[-keep_chars:]}"
+
+    def _truncate_tool_results(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """截断较早的工具结果，从最早的开始直到满足预算"""
+        result = list(messages)
+        older, _ = self._split(result)
+        total = self.count_messages(result)
+        for i in older:
+            if total <= self.budget:
+                break
+            message = result[i]
+            if message.get("role") not in ("tool_result", "tool", "history_result"):
+                continue
+            content = message.get("content")
+            if not isinstance(content, str):
+                continue
+            truncated = dict(message, content=self._truncate_text(content, self.tool_result_tokens))
+            total += self.count_message(truncated) - self.count_message(message)
+            result[i] = truncated
+        return result
+
+    def _summarize_message(self, message: Dict[str, Any]) -> str:
+        """提取单条消息的要点（不调用LLM）"""
+        role = message.get("role", "")
+        content = message.get("content") or ""
+        if not isinstance(content, str):
+            content = json.dumps(content, ensure_ascii=False)
+
+        # 操作Agent的回复为JSON，提取关键字段
+        try:
+            data = json.loads(content.replace("```json", "").replace("```", "").strip())
+        except (json.JSONDecodeError, ValueError):
+            data = None
+
+        if isinstance(data, dict):
+            fields = ("step_summary", "action_type", "tool_name", "status", "message", "success")
+            parts = [f"{key}={data[key]}" for key in fields if key in data]
+            if parts:
+                return f"[{role}] " + ", ".join(str(part) for part in parts)[:300]
+
+        first_line = content.strip().split("\n", 1)[0]
+        return f"[{role}] {first_line[:200]}"
+
+    def _summarize(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """将较早的对话替换为一条摘要消息"""
+        older, keep = self._split(messages)
+        if not older:
+            return list(messages)
+
+        summary = SUMMARY_HEADER + "\n" + "\n".join(
+            self._summarize_message(messages[i]) for i in older
+        )
+        summary_message = {"role": "user", "content": summary}
+
+        # 摘要放在系统消息之后、保留的最近消息之前
+        result = [messages[i] for i in keep if self._is_pinned(messages[i])]
+        result.append(summary_message)
+        result.extend(messages[i] for i in keep if not self._is_pinned(messages[i]))
+        return result
+
+    def _last_n(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """只保留系统消息和最近keep_last条消息，仍超出预算时截断较长的消息"""
+        _, keep = self._split(messages)
+        result = [messages[i] for i in keep]
+
+        # 最后一条为当前请求，不截断；其余按从长到短截断
+        total = self.count_messages(result)
+        per_message = max(self.budget // max(len(result), 1), self.tool_result_tokens)
+        for i in sorted(range(len(result) - 1), key=lambda i: -self.count_message(result[i])):
+            if total <= self.budget:
+                break
+            content = result[i].get("content")
+            if self._is_pinned(result[i]) or not isinstance(content, str):
+                continue
+            truncated = dict(result[i], content=self._truncate_text(content, per_message))
+            total += self.count_message(truncated) - self.count_message(result[i])
+            result[i] = truncated
+        return result
@@ -4,12 +4,18 @@
 操作Agent是ACC系统的执行组件，它将细化步骤转化为具体的代码操作。
 """
 
+import contextvars
 import json
 import logging
 import os#
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
 
 from ACC.agent.base import BaseAgent
+from ACC.fileio import atomic_write
+from ACC.llm import StreamingJSONFields
+from ACC.memory.operation_history import OperationHistoryStore, get_operation_history_store
+from ACC.memory.planning_store import get_planning_store
 
 # 修复导入，添加WORKSPACE_ABS_PATH
 from ACC.prompt.operate import (
@@ -21,10 +27,20 @@ from ACC.prompt.operate import (
 )
 from ACC.memory.memory_manager import MemoryManager
 from ACC.tool.base import execute_tool, ToolRegistry
+from ACC.tool.python_kernel import task_namespace
 
 import re
 logger = logging.getLogger(__name__)
 
+# 流式输出中可以提前执行的只读工具：重试或解析失败时丢弃其结果不会留下副作用
+EARLY_DISPATCH_TOOLS = frozenset({"read_file", "list_directory", "search_workspace"})
+EARLY_DISPATCH_PREFIXES = ("search_",)
+
+
+def _can_dispatch_early(tool_name: str) -> bool:
+    """工具是否可以在流式输出过程中提前执行"""
+    return tool_name in EARLY_DISPATCH_TOOLS or tool_name.startswith(EARLY_DISPATCH_PREFIXES)
+
 
 class OperateAgent(BaseAgent):
     """操作Agent，负责根据细化步骤执行具体代码操作"""
@@ -41,6 +57,13 @@ class OperateAgent(BaseAgent):
             
             # 确保操作历史记录目录存在
             self._ensure_operation_history_dir()
+
+            # 流式模式下提前执行的工具调用: (工具名, 参数, Future)
+            self._early_dispatch = None
+            self._dispatch_executor = None
+
+            # 当前任务编号，用作python_interpreter的默认命名空间
+            self.current_task_number = None
         except Exception as e:
             logger.error(f"操作Agent初始化失败: {e}")
             import traceback
@@ -92,15 +115,12 @@ class OperateAgent(BaseAgent):
 
     def _ensure_operation_history_dir(self):
         """确保操作历史记录目录存在"""
-        self.operation_history_dir = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)), 
-            "memory", 
-            "operation_generalization"
-        )
-        if not os.path.exists(self.operation_history_dir):
-            os.makedirs(self.operation_history_dir, exist_ok=True)
-            logger.info(f"创建操作历史记录目录: {self.operation_history_dir}")
-        logger.debug(f"操作历史记录目录: {self.operation_history_dir}")
+        logger.debug(f"操作历史记录目录: {self.history_store.directory}")
+
+    @property
+    def history_store(self) -> OperationHistoryStore:
+        """当前内存会话的操作历史记录存储"""
+        return get_operation_history_store()
 
     def _clean_operate_history(self, task_number=None):
         """清空操作历史记录
@@ -109,22 +129,11 @@ class OperateAgent(BaseAgent):
             task_number: 任务编号，如果为None则清空所有历史记录
         """
         try:
+            self.history_store.clear(task_number)
             if task_number is None:
-                # 清空所有历史记录
-                import glob
-                history_files = glob.glob(os.path.join(self.operation_history_dir, "*.json"))
-                for file_path in history_files:
-                    with open(file_path, "w", encoding="utf-8") as f:
-                        f.write("[]")
-                logger.info(f"清空所有操作历史记录完成，共{len(history_files)}个文件")
-                logger.debug(f"已清空的历史记录文件: {history_files}")
+                logger.info("清空所有操作历史记录完成")
             else:
-                # 清空指定任务的历史记录
-                history_file = self._get_history_file_path(task_number)
-                with open(history_file, "w", encoding="utf-8") as f:
-                    f.write("[]")
                 logger.info(f"清空任务 {task_number} 的操作历史记录完成")
-                logger.debug(f"已清空的历史记录文件: {history_file}")
         except Exception as e:
             logger.error(f"清空操作历史记录失败: {e}")
             import traceback
@@ -142,17 +151,10 @@ class OperateAgent(BaseAgent):
     def _get_file_content(self, file_path: str) -> Optional[str]:
         """获取文件内容"""
         try:
-            memory_dir = os.path.join(
-                os.path.dirname(os.path.dirname(__file__)), "memory"
-            )
-            full_path = os.path.join(memory_dir, file_path)
-
-            if not os.path.exists(full_path):
-                logger.error(f"文件不存在: {full_path}")
-                return None
-
-            with open(full_path, "r", encoding="utf-8") as f:
-                return f.read()
+            # 通过MemoryManager读取，重复读取同一文件时使用缓存
+            return MemoryManager.read_file(file_path)
+        except FileNotFoundError:
+            return None
         except Exception as e:
             logger.error(f"读取文件失败: {e}")
             return None
@@ -160,17 +162,13 @@ class OperateAgent(BaseAgent):
     def _update_refinement_file(self, file_path: str, updated_content: str) -> bool:
         """更新细化文件内容"""
         try:
-            memory_dir = os.path.join(
-                os.path.dirname(os.path.dirname(__file__)), "memory"
-            )
-            full_path = os.path.join(memory_dir, file_path)
+            full_path = os.path.join(MemoryManager.memory_dir(), file_path)
 
             if not os.path.exists(full_path):
                 logger.error(f"文件不存在: {full_path}")
                 return False
 
-            with open(full_path, "w", encoding="utf-8") as f:
-                f.write(updated_content)
+            atomic_write(full_path, updated_content)
 
             logger.info(f"更新细化文件成功: {full_path}")
             return True
@@ -198,6 +196,101 @@ class OperateAgent(BaseAgent):
             logger.error(f"工具执行失败: {e}")
             return {"error": f"工具执行失败: {e}"}
 
+    def _prepare_tool_params(
+        self, tool_name: str, tool_params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """执行前调整工具参数"""
+        # 如果是写入文件相关的工具，检查是否需要处理文件已存在的情况
+        if tool_name in [
+            "create_file",
+            "write_file",
+        ] and "zuowen.txt" in str(tool_params.get("file_path", "")):
+            # 对于zuowen.txt文件，添加覆盖参数
+            if tool_name == "create_file":
+                tool_params["overwrite"] = True
+
+        # 同一任务的Python代码在同一命名空间中执行，后续步骤可以复用已加载的数据
+        if tool_name == "python_interpreter" and self.current_task_number and not tool_params.get("namespace"):
+            tool_params["namespace"] = task_namespace(self.current_task_number)
+        return tool_params
+
+    def _early_tool_listener(self):
+        """创建流式输出监听器
+
+        流式输出中action_type、tool_name和tool_params字段闭合后立即在后台开始执行工具，
+        与后续explanation等字段的生成并行。只提前执行只读工具（见EARLY_DISPATCH_TOOLS），
+        有副作用的工具等最终解析结果确定后再执行。
+
+        Returns:
+            传给send_to_llm的on_delta回调
+        """
+        self._early_dispatch = None
+        state = {"accumulator": None, "scanner": None}
+
+        def on_delta(text, accumulator):
+            # 重试时会产生新的累加器：丢弃上一次尝试提前执行的调用，从新的响应重新开始解析
+            if state["accumulator"] is not accumulator:
+                state["accumulator"] = accumulator
+                state["scanner"] = StreamingJSONFields()
+                self._early_dispatch = None
+                text = accumulator.content
+            elif self._early_dispatch is not None:
+                return
+
+            state["scanner"].feed(text)
+            fields = state["scanner"].fields
+            tool_name = fields.get("tool_name")
+            tool_params = fields.get("tool_params")
+            if (
+                fields.get("action_type") == "tool"
+                and isinstance(tool_name, str)
+                and isinstance(tool_params, dict)
+                and _can_dispatch_early(tool_name)
+            ):
+                tool_params = self._prepare_tool_params(tool_name, dict(tool_params))
+                logger.info(f"流式输出中已解析到只读工具调用 {tool_name}，提前开始执行")
+                if self._dispatch_executor is None:
+                    self._dispatch_executor = ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix="operate-dispatch"
+                    )
+                future = self._dispatch_executor.submit(
+                    contextvars.copy_context().run,
+                    self._execute_tool_action,
+                    tool_name,
+                    tool_params,
+                )
+                self._early_dispatch = (tool_name, tool_params, future)
+
+        return on_delta
+
+    def _shutdown_dispatch_executor(self):
+        """关闭提前执行工具使用的线程（并行模式下每个任务有独立的Agent实例）"""
+        self._early_dispatch = None
+        executor, self._dispatch_executor = self._dispatch_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _claim_early_dispatch(
+        self, tool_name: str, tool_params: Dict[str, Any]
+    ) -> Optional[Future]:
+        """获取与最终解析结果一致的提前执行的工具调用
+
+        Returns:
+            工具执行的Future，没有匹配的提前执行时返回None
+        """
+        early_dispatch, self._early_dispatch = self._early_dispatch, None
+        if early_dispatch is None:
+            return None
+
+        early_name, early_params, future = early_dispatch
+        if early_name == tool_name and early_params == tool_params:
+            return future
+
+        logger.warning(
+            f"提前执行的只读工具调用 {early_name} 与最终解析结果 {tool_name} 不一致，丢弃其结果并按最终结果执行"
+        )
+        return None
+
     def handle_tool_calls(self, tool_calls: List[Dict[str, Any]]) -> Dict[str, Any]:
         """处理工具调用
 
@@ -234,6 +327,21 @@ class OperateAgent(BaseAgent):
         Returns:
             操作结果字典
         """
+        return self.drive(self._run_steps(user_input))
+
+    async def arun(self, user_input: str) -> Dict[str, Any]:
+        """异步运行操作Agent，工具调用在线程中执行，LLM请求走异步客户端
+        
+        Args:
+            user_input: 细化文件路径
+        
+        Returns:
+            操作结果字典
+        """
+        return await self.adrive(self._run_steps(user_input))
+
+    def _run_steps(self, user_input: str):
+        """操作流程的步骤生成器，由run/arun驱动"""
         refinement_file = user_input  # 将参数重命名为符合实际用途的变量
     
         try:
@@ -241,7 +349,7 @@ class OperateAgent(BaseAgent):
             refinement_content = MemoryManager.read_file(refinement_file)
     
             # 读取规划文件内容
-            planning_content = MemoryManager.read_file("todo/planning.md")
+            planning_content = get_planning_store().render_markdown()
             
             # 获取当前任务编号
             task_number = "unknown"
@@ -254,6 +362,7 @@ class OperateAgent(BaseAgent):
                 from datetime import datetime
                 task_number = f"unknown_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
                 logger.warning(f"无法从文件名获取任务编号: {refinement_file}，使用时间戳: {task_number}")
+            self.current_task_number = task_number
     
             # 读取操作历史记录
             operation_history = self._read_operation_history(task_number)
@@ -293,15 +402,19 @@ class OperateAgent(BaseAgent):
             # 添加：保存用户消息到操作历史记录
             operation_history.append({"role": "user", "content": prompt})
     
-            # 发送请求
+            # 发送请求（流式模式下工具调用字段闭合后即开始执行工具）
             logger.info("🔄 正在向LLM发送操作请求...")
-            response = self.send_to_llm()
+            response = yield self.llm_step(on_delta=self._early_tool_listener())
     
             # 解析响应
             result = self.parse_json_response(response)
     
             # 如果解析失败，添加默认值防止后续处理出错
             if not isinstance(result, dict):
+                if self._early_dispatch is not None:
+                    # 提前执行的只有只读工具，丢弃其结果不会遗漏副作用
+                    logger.warning("响应解析失败，丢弃流式输出中提前执行的只读工具结果")
+                    self._early_dispatch = None
                 logger.error(f"解析响应失败，响应内容: {response}")
                 return {"error": f"解析响应失败: {response}", "success": False}
     
@@ -314,16 +427,16 @@ class OperateAgent(BaseAgent):
                 tool_params = result.get("tool_params", {})
     
                 if tool_name:
-                    # 如果是写入文件相关的工具，检查是否需要处理文件已存在的情况
-                    if tool_name in [
-                        "create_file",
-                        "write_file",
-                    ] and "zuowen.txt" in str(tool_params.get("file_path", "")):
-                        # 对于zuowen.txt文件，添加覆盖参数
-                        if tool_name == "create_file":
-                            tool_params["overwrite"] = True
+                    tool_params = self._prepare_tool_params(tool_name, tool_params)
     
-                    tool_result = self._execute_tool_action(tool_name, tool_params)
+                    early_future = self._claim_early_dispatch(tool_name, tool_params)
+                    if early_future is not None:
+                        # 工具已在流式输出过程中开始执行，等待其结果
+                        tool_result = yield self.blocking_step(early_future.result)
+                    else:
+                        tool_result = yield self.blocking_step(
+                            self._execute_tool_action, tool_name, tool_params
+                        )
                     result["tool_result"] = tool_result
     
                     # 根据工具执行结果判断是否成功完成
@@ -398,7 +511,7 @@ class OperateAgent(BaseAgent):
                         try:
                             # 发送请求
                             logger.info("🔄 正在向LLM发送工具结果处理请求...")
-                            tool_response = self.send_to_llm()
+                            tool_response = yield self.llm_step()
     
                             # 解析响应
                             tool_result_handling = self.parse_json_response(
@@ -499,7 +612,7 @@ class OperateAgent(BaseAgent):
                     
                     # 发送请求
                     logger.info(f"🔄 正在向LLM发送工具查询请求: {tool_name}...")
-                    response = self.send_to_llm()
+                    response = yield self.llm_step()
                     
                     # 解析响应
                     result = self.parse_json_response(response)
@@ -569,7 +682,7 @@ class OperateAgent(BaseAgent):
                     try:
                         # 发送请求
                         logger.info("🔄 正在向LLM发送历史记录处理请求...")
-                        history_response = self.send_to_llm()
+                        history_response = yield self.llm_step()
                         
                         # 解析响应
                         history_result_handling = self.parse_json_response(history_response)
@@ -627,38 +740,19 @@ class OperateAgent(BaseAgent):
 
             logger.debug(f"操作Agent执行异常堆栈: {traceback.format_exc()}")
             return {"error": f"操作Agent执行失败: {str(e)}", "success": False}
+        finally:
+            self._shutdown_dispatch_executor()
 
     def _get_history_file_path(self, task_number):
-        """获取历史记录文件路径"""
-        # 确保task_number是有效的格式
-        if not isinstance(task_number, str):
-            task_number = str(task_number)
-        
-        # 将任务编号格式化为文件名，例如：1.1 -> 1_1.json
-        file_name = f"{task_number.replace('.', '_')}.json"
-        if not file_name.endswith('.json'):
-            file_name += '.json'
-            
-        return os.path.join(self.operation_history_dir, file_name)
+        """获取历史记录文件路径，例如：1.1 -> 1_1.jsonl"""
+        return self.history_store.path(task_number)
     
     def _read_operation_history(self, task_number):
         """读取操作历史记录"""
         try:
-            history_file = self._get_history_file_path(task_number)
-            logger.debug(f"尝试读取任务 {task_number} 的操作历史记录: {history_file}")
-            
-            if not os.path.exists(history_file):
-                logger.debug(f"历史记录文件不存在: {history_file}，返回空列表")
-                return []
-                
-            with open(history_file, "r", encoding="utf-8") as f:
-                content = f.read()
-                if not content.strip():
-                    logger.debug(f"历史记录文件为空: {history_file}，返回空列表")
-                    return []
-                history = json.loads(content)
-                logger.debug(f"成功读取任务 {task_number} 的操作历史记录，包含 {len(history)} 条记录")
-                return history
+            history = self.history_store.read(task_number)
+            logger.debug(f"读取任务 {task_number} 的操作历史记录，包含 {len(history)} 条记录")
+            return history
         except Exception as e:
             logger.error(f"读取操作历史记录失败: {e}")
             import traceback
@@ -666,14 +760,10 @@ class OperateAgent(BaseAgent):
             return []
             
     def _save_operation_history(self, task_number, history):
-        """保存操作历史记录"""
+        """保存操作历史记录，只追加上次保存之后新增的消息"""
         try:
-            history_file = self._get_history_file_path(task_number)
-            logger.debug(f"尝试保存任务 {task_number} 的操作历史记录: {history_file}，共 {len(history)} 条记录")
-            
-            with open(history_file, "w", encoding="utf-8") as f:
-                json.dump(history, f, ensure_ascii=False, indent=2)
-            logger.debug(f"保存操作历史记录成功: {history_file}")
+            self.history_store.save(task_number, history)
+            logger.debug(f"保存任务 {task_number} 的操作历史记录成功，共 {len(history)} 条记录")
         except Exception as e:
             logger.error(f"保存操作历史记录失败: {e}")
 
@@ -694,58 +784,51 @@ class OperateAgent(BaseAgent):
             history_results = {}
             
             for history_id in history_id_list:
-                # 获取历史记录文件路径
-                history_file = self._get_history_file_path(history_id)
-                
-                if not os.path.exists(history_file):
-                    logger.warning(f"历史记录文件不存在: {history_file}")
+                if not self.history_store.exists(history_id):
+                    logger.warning(f"历史记录不存在: {history_id}")
                     history_results[history_id] = {"error": "历史记录不存在"}
                     continue
                     
-                # 读取历史记录文件内容
-                with open(history_file, "r", encoding="utf-8") as f:
-                    content = f.read()
-                    if not content.strip():
-                        logger.warning(f"历史记录文件为空: {history_file}")
-                        history_results[history_id] = {"error": "历史记录为空"}
-                        continue
-                    
-                    # 解析历史记录内容
-                    history_data = json.loads(content)
-                    
-                    # 提取所有相关消息内容，包括助手消息和工具结果
-                    processed_history = []
-                    for msg in history_data:
-                        if isinstance(msg, dict):
-                            role = msg.get("role", "")
-                            content = msg.get("content", "")
-                            
-                            # 处理助手消息
-                            if role == "assistant":
-                                try:
-                                    # 移除可能的Markdown代码块标记
-                                    cleaned_content = content.replace("```json", "").replace("```", "").strip()
-                                    # 解析JSON内容
-                                    json_content = json.loads(cleaned_content)
-                                    processed_history.append(json_content)
-                                except json.JSONDecodeError:
-                                    # 如果不是有效的JSON，则保留原始内容
-                                    processed_history.append({"raw_content": content})
-                            
-                            # 处理工具结果消息
-                            elif role == "tool_result":
-                                try:
-                                    # 解析工具结果
-                                    tool_result = json.loads(content)
-                                    processed_history.append({
-                                        "type": "tool_result",
-                                        "result": tool_result
-                                    })
-                                except json.JSONDecodeError:
-                                    processed_history.append({
-                                        "type": "tool_result",
-                                        "raw_content": content
-                                    })
+                # 通过历史记录存储读取（已缓存的部分不会重复解析）
+                history_data = self.history_store.read(history_id)
+                if not history_data:
+                    logger.warning(f"历史记录为空: {history_id}")
+                    history_results[history_id] = {"error": "历史记录为空"}
+                    continue
+                
+                # 提取所有相关消息内容，包括助手消息和工具结果
+                processed_history = []
+                for msg in history_data:
+                    if isinstance(msg, dict):
+                        role = msg.get("role", "")
+                        content = msg.get("content", "")
+                        
+                        # 处理助手消息
+                        if role == "assistant":
+                            try:
+                                # 移除可能的Markdown代码块标记
+                                cleaned_content = content.replace("```json", "").replace("```", "").strip()
+                                # 解析JSON内容
+                                json_content = json.loads(cleaned_content)
+                                processed_history.append(json_content)
+                            except json.JSONDecodeError:
+                                # 如果不是有效的JSON，则保留原始内容
+                                processed_history.append({"raw_content": content})
+                        
+                        # 处理工具结果消息
+                        elif role == "tool_result":
+                            try:
+                                # 解析工具结果
+                                tool_result = json.loads(content)
+                                processed_history.append({
+                                    "type": "tool_result",
+                                    "result": tool_result
+                                })
+                            except json.JSONDecodeError:
+                                processed_history.append({
+                                    "type": "tool_result",
+                                    "raw_content": content
+                                })
                 
                 history_results[history_id] = processed_history
             
@@ -14,13 +14,13 @@ from ACC.agent.base import BaseAgent
 from ACC.prompt.planning import SYSTEM_PROMPT, FIRST_STEP_PROMPT
 
 from ACC.memory.memory_manager import MemoryManager
+from ACC.memory.planning_store import get_planning_store
 
 logger = logging.getLogger(__name__)
 
 
 # 在文件顶部添加以下导入
 import os
-from pathlib import Path
 
 
 class PlanningAgent(BaseAgent):
@@ -65,26 +65,28 @@ class PlanningAgent(BaseAgent):
             return {"error": f"JSON解析错误: {str(e)}", "raw_response": content}
 
     def _save_planning_md(self, content: str) -> str:
-        """保存规划文件到ACC/memory/todo目录"""
-        # 计算项目根目录（假设planning.py在ACC/agent目录）
-        current_dir = Path(__file__).parent
-        todo_dir = current_dir.parent / "memory" / "todo"
-        todo_dir.mkdir(parents=True, exist_ok=True)
-
-        file_path = todo_dir / "planning.md"
+        """解析规划内容并保存到规划任务存储（同时渲染ACC/memory/todo/planning.md）"""
+        store = get_planning_store()
 
         try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                # 确保内容中的换行符被正确处理
-                f.write(content.replace("\\n", "\n"))
-            logger.info(f"保存规划文件成功: {file_path}")
-            return str(file_path)
+            # 确保内容中的换行符被正确处理
+            store.load_markdown(content.replace("\\n", "\n"))
+            logger.info(f"保存规划文件成功: {store.markdown_path}")
+            return store.markdown_path
         except Exception as e:
             logger.error(f"保存规划文件失败: {e}")
             raise
 
     def run(self, user_input: str) -> Dict[str, Any]:
         """运行规划Agent"""
+        return self.drive(self._run_steps(user_input))
+
+    async def arun(self, user_input: str) -> Dict[str, Any]:
+        """异步运行规划Agent"""
+        return await self.adrive(self._run_steps(user_input))
+
+    def _run_steps(self, user_input: str):
+        """规划流程的步骤生成器，由run/arun驱动"""
         logger.info(f"规划Agent开始处理用户输入: {user_input}")
     
         # 初始化response变量，避免未绑定错误
@@ -126,7 +128,7 @@ class PlanningAgent(BaseAgent):
             self.add_message("user", FIRST_STEP_PROMPT.format(user_input=user_input))
     
             logger.info("🔄 正在向LLM发送规划请求...")
-            response = self.send_to_llm()
+            response = yield self.llm_step()
             logger.info("✅ 成功接收LLM规划响应")
     
             planning_result = self.parse_json_response(response)
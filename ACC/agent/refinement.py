@@ -1,11 +1,12 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
 import json
 import re  # 添加缺失的re模块导入
 from pathlib import Path
 from ACC.agent.base import BaseAgent
 from ACC.memory.memory_manager import MemoryManager
-from ACC.prompt.refinement import SYSTEM_PROMPT, FIRST_STEP_PROMPT  # 添加缺失的导入
+from ACC.memory.planning_store import get_planning_store
+from ACC.prompt.refinement import SYSTEM_PROMPT, FIRST_STEP_PROMPT, TASK_STEP_PROMPT  # 添加缺失的导入
 
 logger = logging.getLogger(__name__)
 
@@ -18,39 +19,61 @@ class RefinementAgent(BaseAgent):
         )
         self.task_counter = 1  # 新增任务计数器
 
-    def run(self) -> Dict[str, Any]:
-        """运行细化流程"""
+    def run(self, task_number: Optional[str] = None) -> Dict[str, Any]:
+        """运行细化流程
+
+        Args:
+            task_number: 要细化的任务编号，默认为第一个未完成的任务
+        """
+        return self.drive(self._run_steps(task_number))
+
+    async def arun(self, task_number: Optional[str] = None) -> Dict[str, Any]:
+        """异步运行细化流程"""
+        return await self.adrive(self._run_steps(task_number))
+
+    def _run_steps(self, task_number: Optional[str] = None):
+        """细化流程的步骤生成器，由run/arun驱动"""
         try:
-            # 添加读取TODO文件的代码
-            current_dir = Path(__file__).parent
-            todo_path = current_dir.parent / "memory" / "todo" / "planning.md"
+            # TODO列表从规划任务存储渲染，不再读取planning.md
+            store = get_planning_store()
 
-            if not todo_path.exists():
-                logger.error(f"规划文件不存在: {todo_path}")
-                return {"error": f"规划文件不存在: {todo_path}"}
+            if not len(store):
+                logger.error(f"规划任务不存在: {store.path}")
+                return {"error": f"规划任务不存在: {store.path}"}
 
-            todos_content = todo_path.read_text(encoding="utf-8")  # 定义todos_content
+            todos_content = store.render_markdown()  # 定义todos_content
             
             # 直接重置消息列表，不读取历史记录
             self.reset_messages()
 
             # 直接添加用户提示
-            self.add_message(
-                "user", FIRST_STEP_PROMPT.format(current_todos=todos_content)
-            )
+            if task_number:
+                prompt = TASK_STEP_PROMPT.format(
+                    task_number=task_number, current_todos=todos_content
+                )
+            else:
+                prompt = FIRST_STEP_PROMPT.format(current_todos=todos_content)
+            self.add_message("user", prompt)
             
             # 获取LLM响应
             logger.info("🔄 正在生成细化步骤...")
-            response = self.send_to_llm()
+            response = yield self.llm_step()
             refinement_data = self.parse_json_response(response)
 
+            # 指定了任务时，以指定的任务编号为准
+            if task_number and "current_task" in refinement_data:
+                current_task = str(refinement_data["current_task"])
+                if not re.match(re.escape(task_number) + r"(?!\d)", current_task):
+                    logger.warning(f"细化结果的任务编号与指定任务 {task_number} 不一致: {current_task}")
+                    refinement_data["current_task"] = f"{task_number} {current_task}"
+
             # 保存细化结果
             if "current_task" in refinement_data:
                 # 加强正则匹配，只匹配开头的数字编号
-                task_number = re.search(r"^(\d+\.\d+)", refinement_data["current_task"])
-                if task_number:
+                current_number = re.search(r"^(\d+\.\d+)", refinement_data["current_task"])
+                if current_number:
                     # 替换点为下划线并截断后续内容
-                    filename = f"{task_number.group().replace('.', '_')}.md"
+                    filename = f"{current_number.group().replace('.', '_')}.md"
                 else:
                     filename = "unknown_task.md"
                     logger.warning(
@@ -58,7 +81,7 @@ class RefinementAgent(BaseAgent):
                     )
 
                 # 确保目录存在
-                refinement_dir = current_dir.parent / "memory" / "todo" / "refinement"
+                refinement_dir = Path(MemoryManager.memory_dir()) / "todo" / "refinement"
                 refinement_dir.mkdir(parents=True, exist_ok=True)
 
                 # 新保存路径
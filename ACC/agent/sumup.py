@@ -7,13 +7,14 @@
 import json
 import logging
 import os
-import glob
 from typing import Dict, Any, List
 from pathlib import Path
 
 from ACC.agent.base import BaseAgent
+from ACC.fileio import atomic_write
 from ACC.prompt.sumup import SYSTEM_PROMPT, FIRST_STEP_PROMPT
 from ACC.memory.memory_manager import MemoryManager
+from ACC.memory.operation_history import OperationHistoryStore, get_operation_history_store
 
 logger = logging.getLogger(__name__)
 
@@ -31,15 +32,12 @@ class SumupAgent(BaseAgent):
         
     def _ensure_operation_history_dir(self):
         """确保操作历史记录目录存在"""
-        self.operation_history_dir = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)), 
-            "memory", 
-            "operation_generalization"
-        )
-        if not os.path.exists(self.operation_history_dir):
-            os.makedirs(self.operation_history_dir, exist_ok=True)
-            logger.info(f"创建操作历史记录目录: {self.operation_history_dir}")
-        logger.debug(f"操作历史记录目录: {self.operation_history_dir}")
+        logger.debug(f"操作历史记录目录: {self.history_store.directory}")
+
+    @property
+    def history_store(self) -> OperationHistoryStore:
+        """当前内存会话的操作历史记录存储"""
+        return get_operation_history_store()
 
     def _get_all_operation_history(self) -> List[Dict]:
         """获取所有操作历史记录
@@ -48,48 +46,21 @@ class SumupAgent(BaseAgent):
             按任务编号排序的所有操作历史记录列表
         """
         try:
-            # 获取所有操作历史文件
-            history_files = glob.glob(os.path.join(self.operation_history_dir, "*.json"))
-            
-            # 按文件名排序（文件名格式为：任务编号.json）
-            history_files.sort(key=lambda x: self._extract_task_number(os.path.basename(x)))
-            
             all_history = []
-            for file_path in history_files:
+            for task_number in sorted(self.history_store.tasks()):
                 try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        history = json.load(f)
-                        
-                    # 添加任务编号信息
-                    task_number = self._extract_task_number(os.path.basename(file_path))
                     all_history.append({
                         "task_number": task_number,
-                        "history": history
+                        "history": self.history_store.read(task_number)
                     })
                 except Exception as e:
-                    logger.error(f"读取操作历史文件失败: {file_path}, 错误: {e}")
+                    logger.error(f"读取任务 {task_number} 的操作历史失败: {e}")
             
             return all_history
         except Exception as e:
             logger.error(f"获取所有操作历史记录失败: {e}")
             return []
     
-    def _extract_task_number(self, filename: str) -> str:
-        """从文件名中提取任务编号
-        
-        Args:
-            filename: 文件名，格式为：任务编号.json
-            
-        Returns:
-            任务编号，如：1.1
-        """
-        # 文件名格式为：1_1.json，需要转换为1.1
-        try:
-            name_without_ext = os.path.splitext(filename)[0]
-            return name_without_ext.replace("_", ".")
-        except Exception:
-            return filename
-    
     def _format_operation_history(self, all_history: List[Dict]) -> str:
         """格式化操作历史记录为可读文本
         
@@ -147,6 +118,14 @@ class SumupAgent(BaseAgent):
 
     def run(self) -> Dict[str, Any]:
         """运行总结Agent，生成系统执行总结报告"""
+        return self.drive(self._run_steps())
+
+    async def arun(self) -> Dict[str, Any]:
+        """异步运行总结Agent"""
+        return await self.adrive(self._run_steps())
+
+    def _run_steps(self):
+        """总结流程的步骤生成器，由run/arun驱动"""
         logger.info("开始生成系统执行总结报告")
         
         try:
@@ -174,18 +153,13 @@ class SumupAgent(BaseAgent):
             
             # 获取LLM响应
             logger.info("🔄 正在生成系统执行总结报告...")
-            response = self.send_to_llm()
+            response = yield self.llm_step()
             
             # 保存总结报告
             summary_content = response.get("content", "")
-            summary_path = os.path.join(
-                os.path.dirname(os.path.dirname(__file__)),
-                "memory",
-                "summary.md"
-            )
+            summary_path = os.path.join(MemoryManager.memory_dir(), "summary.md")
             
-            with open(summary_path, "w", encoding="utf-8") as f:
-                f.write(summary_content)
+            atomic_write(summary_path, summary_content)
             
             logger.info(f"系统执行总结报告已保存至: {summary_path}")
             
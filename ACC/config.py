@@ -57,6 +57,86 @@ def get_llm_config() -> Dict[str, Any]:
     return config.get("llm", {})
 
 
+def get_workflow_config() -> Dict[str, Any]:
+    """获取工作流配置信息
+
+    Returns:
+        工作流配置信息字典
+    """
+    config = get_config()
+    return config.get("workflow", {})
+
+
+def get_search_config() -> Dict[str, Any]:
+    """获取搜索工具配置信息
+
+    Returns:
+        搜索工具配置信息字典
+    """
+    config = get_config()
+    return config.get("search", {})
+
+
+def get_python_interpreter_config() -> Dict[str, Any]:
+    """获取Python解释器工具配置信息
+
+    Returns:
+        Python解释器工具配置信息字典
+    """
+    config = get_config()
+    return config.get("python_interpreter", {})
+
+
+def get_execute_command_config() -> Dict[str, Any]:
+    """获取执行命令工具配置信息
+
+    Returns:
+        执行命令工具配置信息字典
+    """
+    config = get_config()
+    return config.get("execute_command", {})
+
+
+def get_read_file_config() -> Dict[str, Any]:
+    """获取读取文件工具配置信息
+
+    Returns:
+        读取文件工具配置信息字典
+    """
+    config = get_config()
+    return config.get("read_file", {})
+
+
+def get_workspace_index_config() -> Dict[str, Any]:
+    """获取工作空间索引配置信息
+
+    Returns:
+        工作空间索引配置信息字典
+    """
+    config = get_config()
+    return config.get("workspace_index", {})
+
+
+def get_memory_cache_config() -> Dict[str, Any]:
+    """获取内存文件缓存配置信息
+
+    Returns:
+        内存文件缓存配置信息字典
+    """
+    config = get_config()
+    return config.get("memory_cache", {})
+
+
+def get_memory_session_config() -> Dict[str, Any]:
+    """获取内存会话配置信息
+
+    Returns:
+        内存会话配置信息字典
+    """
+    config = get_config()
+    return config.get("memory_session", {})
+
+
 # 添加获取默认工作空间路径的函数
 def get_default_workspace_path():
     """获取默认的工作空间路径
@@ -0,0 +1,222 @@
+"""原子文件写入模块
+
+所有需要持久化的文件都通过该模块写入，避免崩溃或并发读取时看到写了一半的文件：
+- 先写入同目录下的临时文件，fsync后再用os.replace替换目标文件（替换是原子的）
+- 可选对所在目录执行fsync，确保重命名本身在断电后也不会丢失
+- AtomicBatch把多个文件的写入合并：先全部写入临时文件，再依次替换，每个目录只fsync一次
+- 每次替换后通知已注册的监听器（例如内存文件的读缓存），使其缓存的旧内容失效
+"""
+
+import logging
+import os
+import time
+import uuid
+from typing import Callable, Dict, List, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+IS_WINDOWS = os.name == "nt"
+
+# Windows下目标文件被其他进程短暂打开时，替换会失败，重试的次数和间隔
+REPLACE_RETRIES = 5
+REPLACE_RETRY_DELAY = 0.05
+
+# 文件被替换后调用的监听器，参数为目标文件的绝对路径
+_write_listeners: List[Callable[[str], None]] = []
+
+
+def add_write_listener(listener: Callable[[str], None]):
+    """注册监听器，通过本模块写入的文件被替换后调用"""
+    if listener not in _write_listeners:
+        _write_listeners.append(listener)
+
+
+def remove_write_listener(listener: Callable[[str], None]):
+    """移除监听器"""
+    if listener in _write_listeners:
+        _write_listeners.remove(listener)
+
+
+def _notify(path: str):
+    """通知监听器文件已被替换"""
+    for listener in list(_write_listeners):
+        try:
+            listener(path)
+        except Exception as e:
+            logger.debug(f"文件写入监听器出错: {e}")
+
+
+def temp_path(path: str, suffix: str = ".tmp") -> str:
+    """目标文件所在目录中不会与其他写入者冲突的临时文件名"""
+    directory, name = os.path.split(os.path.abspath(path))
+    # 截短文件名，避免加上前后缀后超出文件名长度限制
+    return os.path.join(directory, f".{name[:100]}.{uuid.uuid4().hex[:12]}{suffix}")
+
+
+def write_file(
+    path: str,
+    content: Union[str, bytes],
+    encoding: str = "utf-8",
+    fsync: bool = True,
+    exclusive: bool = False,
+):
+    """直接写入文件（不保证原子性，用于写入临时文件）
+
+    Args:
+        path: 文件路径
+        content: 文本或字节内容
+        encoding: 文本内容的编码
+        fsync: 写入后是否fsync
+        exclusive: 文件已存在时是否报错
+    """
+    mode = "x" if exclusive else "w"
+    # 文本内容使用文本模式写入，与open(..., "w")一样转换换行符
+    if isinstance(content, str):
+        f = open(path, mode, encoding=encoding)
+    else:
+        f = open(path, mode + "b")
+    with f:
+        f.write(content)
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+
+
+def fsync_directory(directory: str):
+    """对目录执行fsync，使其中的创建和重命名持久化（Windows不支持，直接跳过）"""
+    if IS_WINDOWS:
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    except OSError as e:
+        logger.debug(f"目录fsync失败: {directory}: {e}")
+    finally:
+        os.close(fd)
+
+
+def replace(source: str, target: str):
+    """原子替换目标文件，Windows下遇到文件被占用时短暂重试"""
+    for attempt in range(REPLACE_RETRIES):
+        try:
+            os.replace(source, target)
+            return
+        except PermissionError:
+            if not IS_WINDOWS or attempt == REPLACE_RETRIES - 1:
+                raise
+            time.sleep(REPLACE_RETRY_DELAY * (attempt + 1))
+
+
+def discard(path: str):
+    """删除临时文件，忽略错误"""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _stage(path: str, content: Union[str, bytes], encoding: str, fsync: bool) -> str:
+    """把内容写入临时文件，覆盖已有文件时保留其权限，返回临时文件路径"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp = temp_path(path)
+    try:
+        write_file(temp, content, encoding, fsync, exclusive=True)
+        try:
+            os.chmod(temp, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+    except BaseException:
+        discard(temp)
+        raise
+    return temp
+
+
+def atomic_write(
+    path: str,
+    content: Union[str, bytes],
+    encoding: str = "utf-8",
+    fsync: bool = True,
+    fsync_dir: bool = False,
+):
+    """原子写入文件：读取者只会看到旧内容或新内容
+
+    Args:
+        path: 文件路径（父目录不存在时自动创建）
+        content: 文本或字节内容
+        encoding: 文本内容的编码
+        fsync: 替换前是否对临时文件执行fsync（关闭时仍是原子的，但断电后可能丢失新内容）
+        fsync_dir: 替换后是否对所在目录执行fsync
+    """
+    path = os.path.abspath(os.fspath(path))
+    temp = _stage(path, content, encoding, fsync)
+    try:
+        replace(temp, path)
+    except BaseException:
+        discard(temp)
+        raise
+    _notify(path)
+    if fsync_dir:
+        fsync_directory(os.path.dirname(os.path.abspath(path)))
+
+
+class AtomicBatch:
+    """批量原子写入
+
+    在with块中调用write登记文件，正常退出时才写入：所有文件先写入临时文件，
+    全部成功后再依次替换目标文件，最后每个目录执行一次fsync。
+    with块中发生异常或写入临时文件失败时，不会修改任何目标文件。
+    同一路径多次写入时以最后一次为准。
+    """
+
+    def __init__(self, fsync: bool = True, fsync_dir: bool = False, encoding: str = "utf-8"):
+        """初始化批量写入
+
+        Args:
+            fsync: 替换前是否对临时文件执行fsync
+            fsync_dir: 替换后是否对涉及的目录执行fsync
+            encoding: 文本内容的编码
+        """
+        self.fsync = fsync
+        self.fsync_dir = fsync_dir
+        self.encoding = encoding
+        self._pending: Dict[str, Union[str, bytes]] = {}
+
+    def write(self, path: str, content: Union[str, bytes]):
+        """登记一个文件"""
+        self._pending[os.path.abspath(os.fspath(path))] = content
+
+    def commit(self):
+        """写入所有登记的文件"""
+        staged: List[Tuple[str, str]] = []
+        try:
+            for path, content in self._pending.items():
+                staged.append((_stage(path, content, self.encoding, self.fsync), path))
+        except BaseException:
+            for temp, _ in staged:
+                discard(temp)
+            raise
+
+        directories = set()
+        for index, (temp, path) in enumerate(staged):
+            try:
+                replace(temp, path)
+            except BaseException:
+                for remaining, _ in staged[index:]:
+                    discard(remaining)
+                raise
+            _notify(path)
+            directories.add(os.path.dirname(path))
+        self._pending.clear()
+
+        if self.fsync_dir:
+            for directory in directories:
+                fsync_directory(directory)
+
+    def __enter__(self) -> "AtomicBatch":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self._pending.clear()
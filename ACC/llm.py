@@ -4,9 +4,16 @@
 模块会读取配置文件中的API设置，并提供发送请求和接收响应的功能。
 """
 
+import asyncio
+import hashlib
 import json
 import logging
 import os
+import socket
+import sqlite3
+import threading
+import time
+import weakref
 from typing import Dict, List, Optional, Union, Any
 
 # 在文件顶部添加以下导入
@@ -16,8 +23,10 @@ import json
 from json import JSONDecodeError
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from ACC.config import get_config, get_llm_config
+from ACC.retry import cancellable
 
 import os
 
@@ -25,6 +34,190 @@ os.environ["PYTHONLEGACYWINDOWSSTDIO"] = "utf-8"  # 针对Windows终端的特殊
 
 logger = logging.getLogger(__name__)
 
+# 响应缓存的默认存储位置
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "llm_cache.sqlite"
+)
+
+
+class ResponseCache:
+    """LLM响应缓存，以请求内容的哈希为键存储在本地SQLite文件中
+
+    - 键由模型、规范化后的消息、温度、工具等请求参数计算得到，相同请求命中同一条记录
+    - 记录超过ttl秒后失效；总大小超过上限时按最近访问时间淘汰（LRU）
+    - 是否读取缓存由调用方决定，默认只对temperature为0的请求使用缓存
+    """
+
+    # 参与缓存键计算的消息字段
+    MESSAGE_KEYS = ("role", "content", "name", "tool_calls", "tool_call_id")
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: Optional[float] = 86400, max_size_mb: float = 100):
+        """初始化响应缓存
+
+        Args:
+            path: SQLite文件路径
+            ttl: 记录有效期（秒），None表示永不过期
+            max_size_mb: 缓存总大小上限（MB）
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+        )
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["ResponseCache"]:
+        """根据[llm]配置创建响应缓存
+
+        Returns:
+            未启用缓存时返回None
+        """
+        if not config.get("cache", False):
+            return None
+
+        path = config.get("cache_path") or DEFAULT_CACHE_PATH
+        if not os.path.isabs(path):
+            # 相对路径以项目根目录为基准
+            path = os.path.join(os.path.dirname(os.path.dirname(DEFAULT_CACHE_PATH)), path)
+
+        try:
+            return cls(
+                path=path,
+                ttl=config.get("cache_ttl", 86400) or None,
+                max_size_mb=config.get("cache_max_size_mb", 100),
+            )
+        except sqlite3.Error as e:
+            logger.error(f"打开LLM响应缓存失败，已禁用缓存: {e}")
+            return None
+
+    @classmethod
+    def make_key(cls, data: Dict[str, Any]) -> str:
+        """根据请求体计算缓存键
+
+        Args:
+            data: 发送给API的请求体
+
+        Returns:
+            SHA-256十六进制摘要
+        """
+        messages = [
+            {
+                key: message[key]
+                for key in cls.MESSAGE_KEYS
+                if message.get(key) not in (None, "", [])
+            }
+            for message in data.get("messages", [])
+        ]
+        for message in messages:
+            if isinstance(message.get("content"), str):
+                message["content"] = message["content"].replace("\r\n", "\n").strip()
+
+        payload = {
+            "model": data.get("model"),
+            "messages": messages,
+            "temperature": data.get("temperature"),
+            "max_tokens": data.get("max_tokens"),
+            "tools": data.get("tools"),
+            "tool_choice": data.get("tool_choice"),
+        }
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存的响应，过期记录会被删除
+
+        Returns:
+            API响应字典，未命中时返回None
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def put(self, key: str, response: Dict[str, Any]):
+        """写入响应并按需淘汰旧记录
+
+        Args:
+            key: 缓存键
+            response: API响应字典
+        """
+        value = json.dumps(response, ensure_ascii=False).encode("utf-8")
+        if len(value) > self.max_size:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        """删除过期记录，并按LRU淘汰直到总大小不超过上限（调用方需持有锁）"""
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_size:
+            return
+
+        evicted = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed ASC"
+        ).fetchall():
+            if total <= self.max_size:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        logger.debug(f"LLM响应缓存淘汰了 {evicted} 条记录")
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计信息"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "size": size}
+
+    def close(self):
+        """关闭缓存文件"""
+        with self._lock:
+            self._conn.close()
+
 
 class LLMClient:
     """LLM客户端，负责与OpenAI API通信"""
@@ -50,7 +243,22 @@ class LLMClient:
         self.api_type = self.config.get("api_type", "openai")
         self.api_version = self.config.get("api_version", None)
 
+        # 连接池与超时配置
+        self.pool_connections = self.config.get("pool_connections", 10)
+        self.pool_maxsize = self.config.get("pool_maxsize", 10)
+        self.keep_alive = self.config.get("keep_alive", True)
+        self.connect_timeout = self.config.get("connect_timeout", 10)
+        self.read_timeout = self.config.get("read_timeout", 180)
+        self.http2 = self.config.get("http2", False)
+
         self._validate_config()  # 确保配置验证
+
+        # 可选的响应缓存（[llm] cache = true 时启用）
+        self.cache = ResponseCache.from_config(self.config)
+
+        # 客户端持有的共享连接池，所有请求复用同一组TCP/TLS连接
+        self.transport = "requests"
+        self.session = self._create_session()
         logger.info(f"LLM客户端初始化完成，使用模型: {self.model}")
 
     def _validate_config(self):
@@ -63,6 +271,167 @@ class LLMClient:
             logger.error("API URL未配置")
             raise ValueError("API URL未配置，请在config.toml中设置base_url")
 
+    def _create_session(self):
+        """创建带连接池的HTTP会话
+
+        开启http2时优先使用httpx（需安装httpx[http2]），否则使用requests会话。
+
+        Returns:
+            HTTP会话对象
+        """
+        if self.http2:
+            try:
+                import httpx
+                import h2  # noqa: F401 httpx的HTTP/2支持依赖h2
+
+                limits = httpx.Limits(
+                    max_connections=self.pool_maxsize,
+                    max_keepalive_connections=self.pool_maxsize if self.keep_alive else 0,
+                )
+                session = httpx.Client(
+                    http2=True,
+                    limits=limits,
+                    timeout=httpx.Timeout(
+                        self.read_timeout, connect=self.connect_timeout
+                    ),
+                )
+                self.transport = "httpx"
+                logger.info("LLM传输层: httpx (HTTP/2)")
+                return session
+            except ImportError:
+                logger.warning("未安装httpx[http2]，已回退到requests连接池 (HTTP/1.1)")
+
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=0,  # 重试由Agent层统一处理
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+
+        self.transport = "requests"
+        logger.info(
+            f"LLM传输层: requests (连接池大小: {self.pool_maxsize}, keep-alive: {self.keep_alive})"
+        )
+        return session
+
+    @property
+    def request_errors(self) -> tuple:
+        """当前传输层的请求异常类型"""
+        if self.transport == "httpx":
+            import httpx
+
+            return (httpx.HTTPError,)
+        return (requests.exceptions.RequestException,)
+
+    def _timeout(self, timeout: Optional[float] = None):
+        """构建传输层超时参数
+
+        Args:
+            timeout: 读超时（秒），默认使用配置中的read_timeout
+
+        Returns:
+            当前传输层使用的超时对象
+        """
+        read_timeout = timeout if timeout is not None else self.read_timeout
+        if self.transport == "httpx":
+            import httpx
+
+            return httpx.Timeout(read_timeout, connect=self.connect_timeout)
+        return (self.connect_timeout, read_timeout)
+
+    def _post(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        data: Dict[str, Any],
+        timeout: Optional[float] = None,
+    ):
+        """通过共享会话发送POST请求
+
+        Args:
+            url: 请求URL
+            headers: 请求头
+            data: 请求体
+            timeout: 读超时（秒），超时由socket层中断请求
+
+        Returns:
+            已读取响应体的响应对象
+        """
+        # 以流式方式发起请求再读取响应体，读取期间可被重试引擎的cancel()中断
+        if self.transport == "httpx":
+            with self._open_stream(url, headers, data, timeout) as response:
+                with cancellable(lambda: self._abort_response(response)):
+                    response.read()
+            return response
+        response = self._open_stream(url, headers, data, timeout)
+        with cancellable(lambda: self._abort_response(response)):
+            response.content
+        return response
+
+    def _open_stream(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        data: Dict[str, Any],
+        timeout: Optional[float] = None,
+    ):
+        """通过共享会话发起流式POST请求
+
+        Returns:
+            可用于with语句的流式响应对象
+        """
+        if self.transport == "httpx":
+            return self.session.stream(
+                "POST", url, headers=headers, json=data, timeout=self._timeout(timeout)
+            )
+        return self.session.post(
+            url,
+            headers=headers,
+            json=data,
+            stream=True,
+            timeout=self._timeout(timeout),
+        )
+
+    @staticmethod
+    def _abort_response(response):
+        """中断正在读取的响应（在调用cancel()的线程中执行）
+
+        关闭响应不能唤醒阻塞在socket读取上的线程，因此先shutdown底层socket，
+        读取方会收到连接错误，响应由读取方的with语句关闭。
+
+        Args:
+            response: requests或httpx的响应对象
+        """
+        sock = None
+        network_stream = getattr(response, "extensions", {}).get("network_stream")
+        if network_stream is not None:
+            sock = network_stream.get_extra_info("socket")
+        else:
+            connection = getattr(getattr(response, "raw", None), "_connection", None)
+            sock = getattr(connection, "sock", None)
+
+        if sock is None:
+            response.close()
+            return
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def close(self):
+        """关闭连接池"""
+        try:
+            self.session.close()
+            logger.debug("LLM连接池已关闭")
+        except Exception as e:
+            logger.error(f"关闭LLM连接池失败: {e}")
+        if self.cache is not None:
+            self.cache.close()
+
     def _prepare_headers(self) -> Dict[str, str]:
         """准备请求头
 
@@ -82,7 +451,7 @@ class LLMClient:
 
         return headers
 
-    def send_request(
+    def _build_request(
         self,
         messages: List[Dict[str, str]],
         model: Optional[str] = None,
@@ -91,20 +460,11 @@ class LLMClient:
         stream: bool = False,
         tools: Optional[List[Dict[str, Any]]] = None,
         tool_choice: Optional[Union[str, Dict[str, Any]]] = None,
-    ) -> Union[Dict[str, Any], Any]:
-        """发送请求到OpenAI API
-
-        Args:
-            messages: 消息列表，包含角色和内容
-            model: 模型名称，默认使用配置中的模型
-            temperature: 温度参数，控制随机性，默认使用配置中的温度
-            max_tokens: 最大生成token数，默认使用配置中的最大token数
-            stream: 是否使用流式响应，默认为False
-            tools: 工具列表，默认为None
-            tool_choice: 工具选择，默认为None
+    ):
+        """构建请求URL、请求头和请求体
 
         Returns:
-            API响应字典或流式响应生成器
+            (url, headers, data) 三元组
         """
         model = model or self.model
         temperature = temperature if temperature is not None else self.temperature
@@ -137,7 +497,6 @@ class LLMClient:
         if tool_choice:
             data["tool_choice"] = tool_choice
 
-        # 发送请求
         # 在发送请求前添加调试日志
         if self.debug:
             logger.debug("⬆️ 即将发送API请求:")
@@ -147,43 +506,133 @@ class LLMClient:
                 f"Request Body: {json.dumps(data, indent=2, ensure_ascii=False)}"
             )
 
-        try:
-            headers = self._prepare_headers()
+        return url, headers, data
 
-            # 处理流式响应
-            if stream:
-                return self._handle_streaming_response(url, headers, data)
+    def _check_response(self, response) -> Dict[str, Any]:
+        """检查响应状态并解析响应JSON
 
-            # 处理普通响应
-            response = requests.post(url, headers=headers, json=data)
+        Args:
+            response: HTTP响应对象
 
-            # 增强错误处理 - 记录详细的错误信息
-            if response.status_code != 200:
-                logger.error(f"API请求失败，状态码: {response.status_code}")
-                logger.error(f"响应内容: {response.text}")
-                # 尝试解析错误响应
-                try:
-                    error_data = response.json()
-                    logger.error(
-                        f"错误详情: {json.dumps(error_data, ensure_ascii=False)}"
-                    )
-                except:
-                    logger.error("无法解析错误响应为JSON")
+        Returns:
+            API响应字典
+        """
+        # 增强错误处理 - 记录详细的错误信息
+        if response.status_code != 200:
+            logger.error(f"API请求失败，状态码: {response.status_code}")
+            logger.error(f"响应内容: {response.text}")
+            # 尝试解析错误响应
+            try:
+                error_data = response.json()
+                logger.error(
+                    f"错误详情: {json.dumps(error_data, ensure_ascii=False)}"
+                )
+            except:
+                logger.error("无法解析错误响应为JSON")
+
+        response.raise_for_status()
+
+        # 调试模式下记录完整响应
+        if self.debug:
+            logger.debug("⬇️ 收到API响应:")
+            logger.debug(f"Status Code: {response.status_code}")
+            logger.debug(f"Response Headers: {dict(response.headers)}")
+            logger.debug(f"Full Response: {response.text}")
+
+        return response.json()
+
+    def _cache_key(self, data: Dict[str, Any], cache: Optional[bool]) -> Optional[str]:
+        """判断请求是否可以使用响应缓存
+
+        Args:
+            data: 请求体
+            cache: None表示仅在temperature为0时使用缓存，True表示调用方明确允许，False表示不使用
+
+        Returns:
+            可以使用缓存时返回缓存键，否则返回None
+        """
+        if self.cache is None or cache is False:
+            return None
+        if cache is None and data.get("temperature") != 0:
+            return None
+        return ResponseCache.make_key(data)
+
+    def _cached_stream(self, response: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """将缓存的完整响应转换为流式片段"""
+        result = self.parse_response(response)
+        tool_calls = [
+            dict(tool_call, index=index)
+            for index, tool_call in enumerate(result.get("tool_calls") or [])
+        ]
+        return [{"content": result.get("content") or "", "tool_calls": tool_calls, "finish_reason": "stop"}]
+
+    def _cache_stream_result(self, cache_key: Optional[str], accumulator: "StreamAccumulator"):
+        """将完整接收的流式响应写入缓存"""
+        if cache_key is None or accumulator.finish_reason is None:
+            return
+        result = accumulator.result()
+        message = {"role": "assistant", "content": result["content"]}
+        if result["tool_calls"]:
+            message["tool_calls"] = result["tool_calls"]
+        self.cache.put(
+            cache_key,
+            {"choices": [{"message": message, "finish_reason": accumulator.finish_reason}]},
+        )
+
+    def send_request(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        stream: bool = False,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_choice: Optional[Union[str, Dict[str, Any]]] = None,
+        timeout: Optional[float] = None,
+        cache: Optional[bool] = None,
+    ) -> Union[Dict[str, Any], Any]:
+        """发送请求到OpenAI API
+
+        Args:
+            messages: 消息列表，包含角色和内容
+            model: 模型名称，默认使用配置中的模型
+            temperature: 温度参数，控制随机性，默认使用配置中的温度
+            max_tokens: 最大生成token数，默认使用配置中的最大token数
+            stream: 是否使用流式响应，默认为False
+            tools: 工具列表，默认为None
+            tool_choice: 工具选择，默认为None
+            timeout: 读超时（秒），默认使用配置中的read_timeout
+            cache: 是否使用响应缓存，默认仅在temperature为0时使用
+
+        Returns:
+            API响应字典或流式响应生成器
+        """
+        url, headers, data = self._build_request(
+            messages, model, temperature, max_tokens, stream, tools, tool_choice
+        )
+        cache_key = self._cache_key(data, cache)
 
-            response.raise_for_status()
+        try:
+            # 处理流式响应
+            if stream:
+                return self._handle_streaming_response(url, headers, data, timeout, cache_key)
 
-            # 调试模式下记录完整响应
-            if self.debug:
-                logger.debug("⬇️ 收到API响应:")
-                logger.debug(f"Status Code: {response.status_code}")
-                logger.debug(f"Response Headers: {dict(response.headers)}")
-                logger.debug(f"Full Response: {response.text}")
+            if cache_key is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    logger.info("LLM响应缓存命中")
+                    return cached
 
-            return response.json()
+            # 处理普通响应
+            response = self._post(url, headers, data, timeout)
+            result = self._check_response(response)
+            if cache_key is not None:
+                self.cache.put(cache_key, result)
+            return result
 
-        except requests.exceptions.RequestException as e:
+        except self.request_errors as e:
             logger.error(f"API请求失败: {e}")
-            if hasattr(e, "response") and e.response:
+            if getattr(e, "response", None) is not None:
                 logger.error(f"响应状态码: {e.response.status_code}")
                 logger.error(f"响应内容: {e.response.text}")
                 # 尝试解析错误响应
@@ -197,44 +646,73 @@ class LLMClient:
             raise
 
     def _handle_streaming_response(
-        self, url: str, headers: Dict[str, str], data: Dict[str, Any]
+        self,
+        url: str,
+        headers: Dict[str, str],
+        data: Dict[str, Any],
+        timeout: Optional[float] = None,
+        cache_key: Optional[str] = None,
     ):
         # 在流式处理中添加调试日志
         if self.debug:
             logger.debug("🔍 [调试模式] 开始处理流式响应")  # ✅ 流式处理日志
 
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("LLM响应缓存命中")
+                yield from self._cached_stream(cached)
+                return
+        accumulator = StreamAccumulator() if cache_key is not None else None
+
         try:
-            with requests.post(
-                url, headers=headers, json=data, stream=True
-            ) as response:
+            with self._open_stream(url, headers, data, timeout) as response:
                 if self.debug:
                     logger.debug(f"Streaming Response Status: {response.status_code}")
-
-                for line in response.iter_lines():
-                    if not line:
-                        continue
-
-                    # 移除 "data: " 前缀
-                    if line.startswith(b"data: "):
-                        line = line[6:]
-
-                    # 跳过心跳消息
-                    if line.strip() == b"[DONE]":
-                        break
-
-                    try:
-                        # 解析JSON响应
-                        chunk = json.loads(line)
+                # 错误状态码按HTTPError抛出，交给重试引擎分类；先读取响应体，流关闭后错误日志仍能访问其内容
+                if response.status_code >= 400:
+                    if self.transport == "httpx":
+                        response.read()
+                    else:
+                        response.content
+                response.raise_for_status()
+
+                # 读取期间可被重试引擎的cancel()中断
+                with cancellable(lambda: self._abort_response(response)):
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+
+                        # httpx按文本返回行，统一转为字节
+                        if isinstance(line, str):
+                            line = line.encode("utf-8")
+
+                        # 移除 "data: " 前缀
+                        if line.startswith(b"data: "):
+                            line = line[6:]
+
+                        # 跳过心跳消息
+                        if line.strip() == b"[DONE]":
+                            break
+
+                        try:
+                            # 解析JSON响应
+                            chunk = json.loads(line)
+                        except json.JSONDecodeError as e:
+                            logger.error(f"解析流式响应JSON失败: {e}")
+                            logger.error(f"原始行: {line}")
+                            continue
 
                         # 解析流式响应片段
-                        yield self._parse_stream_chunk(chunk)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"解析流式响应JSON失败: {e}")
-                        logger.error(f"原始行: {line}")
-                        continue
-        except requests.exceptions.RequestException as e:
+                        parsed = self._parse_stream_chunk(chunk)
+                        if accumulator is not None:
+                            accumulator.add(parsed)
+                        yield parsed
+
+            self._cache_stream_result(cache_key, accumulator)
+        except self.request_errors as e:
             logger.error(f"流式请求失败: {e}")
-            if hasattr(e, "response") and e.response:
+            if getattr(e, "response", None) is not None:
                 logger.error(f"响应状态码: {e.response.status_code}")
                 logger.error(f"响应内容: {e.response.text}")
             raise
@@ -312,6 +790,164 @@ class LLMClient:
             raise
 
 
+class AsyncLLMClient(LLMClient):
+    """异步LLM客户端，基于httpx.AsyncClient，可在一个事件循环中并发驱动多个请求
+
+    与LLMClient共用配置、请求构建和响应解析逻辑，send_request为协程版本。
+    httpx的连接池绑定创建它的事件循环，请通过get_async_llm_client()按事件循环获取实例。
+    """
+
+    def _create_session(self):
+        """创建异步HTTP会话
+
+        Returns:
+            httpx.AsyncClient实例
+        """
+        try:
+            import httpx
+        except ImportError as e:
+            raise ImportError("异步LLM客户端需要httpx，请执行: pip install httpx") from e
+
+        http2 = False
+        if self.http2:
+            try:
+                import h2  # noqa: F401 httpx的HTTP/2支持依赖h2
+
+                http2 = True
+            except ImportError:
+                logger.warning("未安装httpx[http2]，异步客户端使用HTTP/1.1")
+
+        limits = httpx.Limits(
+            max_connections=self.pool_maxsize,
+            max_keepalive_connections=self.pool_maxsize if self.keep_alive else 0,
+        )
+        self.transport = "httpx"
+        logger.info(f"异步LLM传输层: httpx (HTTP/2: {http2}, 连接池大小: {self.pool_maxsize})")
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=limits,
+            timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+        )
+
+    async def send_request(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        stream: bool = False,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_choice: Optional[Union[str, Dict[str, Any]]] = None,
+        timeout: Optional[float] = None,
+        cache: Optional[bool] = None,
+    ) -> Union[Dict[str, Any], Any]:
+        """异步发送请求到OpenAI API
+
+        参数与LLMClient.send_request相同。
+
+        Returns:
+            API响应字典或异步流式响应生成器
+        """
+        url, headers, data = self._build_request(
+            messages, model, temperature, max_tokens, stream, tools, tool_choice
+        )
+        cache_key = self._cache_key(data, cache)
+
+        if stream:
+            return self._handle_streaming_response(url, headers, data, timeout, cache_key)
+
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("LLM响应缓存命中")
+                return cached
+
+        try:
+            response = await self.session.post(
+                url, headers=headers, json=data, timeout=self._timeout(timeout)
+            )
+            result = self._check_response(response)
+            if cache_key is not None:
+                self.cache.put(cache_key, result)
+            return result
+        except self.request_errors as e:
+            logger.error(f"异步API请求失败: {e}")
+            raise
+
+    async def _handle_streaming_response(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        data: Dict[str, Any],
+        timeout: Optional[float] = None,
+        cache_key: Optional[str] = None,
+    ):
+        if self.debug:
+            logger.debug("🔍 [调试模式] 开始处理异步流式响应")
+
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("LLM响应缓存命中")
+                for chunk in self._cached_stream(cached):
+                    yield chunk
+                return
+        accumulator = StreamAccumulator() if cache_key is not None else None
+
+        try:
+            async with self.session.stream(
+                "POST", url, headers=headers, json=data, timeout=self._timeout(timeout)
+            ) as response:
+                if self.debug:
+                    logger.debug(f"Streaming Response Status: {response.status_code}")
+                if response.status_code >= 400:
+                    await response.aread()
+                response.raise_for_status()
+
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+
+                    # 移除 "data: " 前缀
+                    if line.startswith("data: "):
+                        line = line[6:]
+
+                    # 跳过心跳消息
+                    if line.strip() == "[DONE]":
+                        break
+
+                    try:
+                        chunk = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        logger.error(f"解析流式响应JSON失败: {e}")
+                        logger.error(f"原始行: {line}")
+                        continue
+
+                    parsed = self._parse_stream_chunk(chunk)
+                    if accumulator is not None:
+                        accumulator.add(parsed)
+                    yield parsed
+
+            self._cache_stream_result(cache_key, accumulator)
+        except self.request_errors as e:
+            logger.error(f"异步流式请求失败: {e}")
+            if getattr(e, "response", None) is not None:
+                logger.error(f"响应状态码: {e.response.status_code}")
+                logger.error(f"响应内容: {e.response.text}")
+            raise
+
+    async def aclose(self):
+        """关闭异步连接池"""
+        await self.session.aclose()
+        logger.debug("异步LLM连接池已关闭")
+        if self.cache is not None:
+            self.cache.close()
+
+    def close(self):
+        """异步客户端请使用aclose()关闭"""
+        raise RuntimeError("异步LLM客户端请使用 await client.aclose() 关闭")
+
+
 # 创建全局LLM客户端实例
 _llm_client = None
 
@@ -330,6 +966,26 @@ def get_llm_client() -> LLMClient:
     return _llm_client
 
 
+# 每个事件循环一个异步客户端（httpx连接池不能跨事件循环使用）
+_async_llm_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_llm_client() -> AsyncLLMClient:
+    """获取当前事件循环的异步LLM客户端实例
+
+    Returns:
+        异步LLM客户端实例
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_llm_clients.get(loop)
+
+    if client is None:
+        client = AsyncLLMClient()
+        _async_llm_clients[loop] = client
+
+    return client
+
+
 def send_message(
     messages: List[Dict[str, str]],
     model: Optional[str] = None,
@@ -337,6 +993,8 @@ def send_message(
     max_tokens: Optional[int] = None,
     tools: Optional[List[Dict[str, Any]]] = None,
     tool_choice: Optional[Union[str, Dict[str, Any]]] = None,
+    timeout: Optional[float] = None,
+    cache: Optional[bool] = None,
 ) -> Dict[str, Any]:
     """发送消息到LLM
 
@@ -347,6 +1005,8 @@ def send_message(
         max_tokens: 最大生成token数，默认使用配置中的最大token数
         tools: 工具列表，默认为None
         tool_choice: 工具选择，默认为None
+        timeout: 读超时（秒），默认使用配置中的read_timeout
+        cache: 是否使用响应缓存，默认仅在temperature为0时使用
 
     Returns:
         解析后的响应字典，包含内容和工具调用信息
@@ -359,6 +1019,8 @@ def send_message(
         max_tokens=max_tokens,
         tools=tools,
         tool_choice=tool_choice,
+        timeout=timeout,
+        cache=cache,
     )
 
     return client.parse_response(response)
@@ -371,6 +1033,8 @@ def send_message_stream(
     max_tokens: Optional[int] = None,
     tools: Optional[List[Dict[str, Any]]] = None,
     tool_choice: Optional[Union[str, Dict[str, Any]]] = None,
+    timeout: Optional[float] = None,
+    cache: Optional[bool] = None,
 ):
     """发送消息到LLM并获取流式响应
 
@@ -381,6 +1045,8 @@ def send_message_stream(
         max_tokens: 最大生成token数，默认使用配置中的最大token数
         tools: 工具列表，默认为None
         tool_choice: 工具选择，默认为None
+        timeout: 读超时（秒），默认使用配置中的read_timeout
+        cache: 是否使用响应缓存，默认仅在temperature为0时使用
 
     Yields:
         流式响应片段，包含内容和工具调用信息
@@ -394,16 +1060,241 @@ def send_message_stream(
         stream=True,
         tools=tools,
         tool_choice=tool_choice,
+        timeout=timeout,
+        cache=cache,
     )
 
-    for chunk in stream_generator:
-        yield chunk
+    yield from stream_generator
+
+
+async def async_send_message_stream(
+    messages: List[Dict[str, str]],
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    tools: Optional[List[Dict[str, Any]]] = None,
+    tool_choice: Optional[Union[str, Dict[str, Any]]] = None,
+    timeout: Optional[float] = None,
+    cache: Optional[bool] = None,
+):
+    """异步发送消息到LLM并获取流式响应
+
+    参数与send_message_stream相同，需使用async for迭代。
+
+    Yields:
+        流式响应片段，包含内容和工具调用信息
+    """
+    client = get_async_llm_client()
+    stream_generator = await client.send_request(
+        messages=messages,
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True,
+        tools=tools,
+        tool_choice=tool_choice,
+        timeout=timeout,
+        cache=cache,
+    )
 
-    # 移除不需要的返回语句，因为response未定义
-    for chunk in stream_generator:
+    async for chunk in stream_generator:
         yield chunk
 
 
+class StreamAccumulator:
+    """流式响应累加器，将流式片段拼接为与parse_response相同格式的结果，并记录首token耗时"""
+
+    def __init__(self):
+        """初始化累加器"""
+        self.start_time = time.monotonic()
+        self.first_token_time = None
+        self.end_time = None
+        self.content_parts = []
+        self.tool_calls = {}
+        self.finish_reason = None
+
+    def add(self, chunk: Dict[str, Any]) -> str:
+        """添加一个流式片段
+
+        Args:
+            chunk: _parse_stream_chunk解析后的片段
+
+        Returns:
+            本片段新增的文本内容
+        """
+        content = chunk.get("content") or ""
+        tool_call_deltas = chunk.get("tool_calls") or []
+
+        if (content or tool_call_deltas) and self.first_token_time is None:
+            self.first_token_time = time.monotonic()
+
+        if content:
+            self.content_parts.append(content)
+
+        # 工具调用按index增量拼接
+        for delta in tool_call_deltas:
+            index = delta.get("index", 0)
+            tool_call = self.tool_calls.setdefault(
+                index, {"id": None, "type": "function", "function": {"name": "", "arguments": ""}}
+            )
+            if delta.get("id"):
+                tool_call["id"] = delta["id"]
+            function = delta.get("function") or {}
+            tool_call["function"]["name"] += function.get("name") or ""
+            tool_call["function"]["arguments"] += function.get("arguments") or ""
+
+        if chunk.get("finish_reason"):
+            self.finish_reason = chunk["finish_reason"]
+
+        return content
+
+    @property
+    def content(self) -> str:
+        """当前已收到的完整文本"""
+        return "".join(self.content_parts)
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        """首token耗时（秒）"""
+        if self.first_token_time is None:
+            return None
+        return self.first_token_time - self.start_time
+
+    def stats(self) -> Dict[str, Any]:
+        """流式响应统计信息"""
+        end_time = self.end_time or time.monotonic()
+        return {
+            "time_to_first_token": self.time_to_first_token,
+            "total_time": end_time - self.start_time,
+            "content_length": len(self.content),
+            "finish_reason": self.finish_reason,
+        }
+
+    def result(self) -> Dict[str, Any]:
+        """结束累加并返回与parse_response格式相同的结果"""
+        self.end_time = time.monotonic()
+        return {
+            "content": self.content,
+            "tool_calls": [self.tool_calls[i] for i in sorted(self.tool_calls)],
+        }
+
+
+class StreamingJSONFields:
+    """增量解析流式输出中的顶层JSON对象
+
+    每当顶层对象的一个字段值完整闭合时即返回该字段，调用方无需等待整个响应结束。
+    JSON之前的内容（如```json标记）会被忽略。
+    """
+
+    def __init__(self):
+        """初始化解析器"""
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.closed = False
+        self.fields = {}
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+
+    def feed(self, text: str) -> Dict[str, Any]:
+        """追加文本并返回本次新闭合的字段
+
+        Args:
+            text: 新收到的文本
+
+        Returns:
+            新闭合的字段字典
+        """
+        if self.closed or not text:
+            return {}
+
+        self.buffer += text
+        completed = {}
+
+        while self.pos < len(self.buffer) and not self.closed:
+            char = self.buffer[self.pos]
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                    # 顶层的键读取完毕
+                    if self.depth == 1 and self._key_start is not None:
+                        self._key = self.buffer[self._key_start : self.pos + 1]
+                        self._key_start = None
+            elif char == '"':
+                self.in_string = True
+                if self.depth == 1 and self._key is None and self._value_start is None:
+                    self._key_start = self.pos
+            elif char in "{[":
+                self.depth += 1
+            elif char == ":" and self.depth == 1 and self._key is not None and self._value_start is None:
+                self._value_start = self.pos + 1
+            elif char in ",}]":
+                if self.depth == 1 and char in ",}" and self._value_start is not None:
+                    self._complete_field(self.buffer[self._value_start : self.pos], completed)
+                if char in "}]":
+                    self.depth -= 1
+                    if self.depth == 0 and char == "}":
+                        self.closed = True
+
+            self.pos += 1
+
+        return completed
+
+    def _complete_field(self, raw_value: str, completed: Dict[str, Any]):
+        """解析一个闭合的顶层字段"""
+        try:
+            key = json.loads(self._key)
+            value = json.loads(raw_value.strip())
+            self.fields[key] = value
+            completed[key] = value
+        except (JSONDecodeError, TypeError):
+            # 无法独立解析的字段交给完整解析处理
+            pass
+        finally:
+            self._key = None
+            self._value_start = None
+
+
+async def async_send_message(
+    messages: List[Dict[str, str]],
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    tools: Optional[List[Dict[str, Any]]] = None,
+    tool_choice: Optional[Union[str, Dict[str, Any]]] = None,
+    timeout: Optional[float] = None,
+    cache: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """异步发送消息到LLM
+
+    参数与send_message相同，需在事件循环中await调用。
+
+    Returns:
+        解析后的响应字典，包含内容和工具调用信息
+    """
+    client = get_async_llm_client()
+    response = await client.send_request(
+        messages=messages,
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        tools=tools,
+        tool_choice=tool_choice,
+        timeout=timeout,
+        cache=cache,
+    )
+
+    return client.parse_response(response)
+
+
 def parse_json_response(response: Dict[str, Any]) -> Dict[str, Any]:
     try:
         # 移除错误的Unicode转义处理
@@ -0,0 +1,228 @@
+"""内存文件读缓存模块
+
+MemoryManager读取的文件（history.json、细化文档等）在一次工作流中会被反复读取，
+该模块在进程内缓存这些文件的内容：
+- 写穿透：通过MemoryManager保存的文件直接更新缓存，下一次读取不需要访问磁盘
+- 版本失效：通过ACC.fileio写入的文件被替换后，监听器会使对应的缓存条目失效；
+  正在读取或写入的文件记录版本号，读写期间文件被替换时不缓存可能过期的内容
+- 修改时间校验：为了发现其他进程或绕过fileio的修改，距离上次校验超过revalidate_interval秒的
+  条目在读取前会stat一次，修改时间或大小变化时重新读取
+缓存总大小超过上限时按最近使用顺序淘汰（LRU）。
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from ACC import fileio
+from ACC.config import get_memory_cache_config
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry:
+    """缓存的一个文件"""
+
+    __slots__ = ("content", "mtime_ns", "size", "checked_at")
+
+    def __init__(self, content: str, mtime_ns: int, size: int, checked_at: float):
+        self.content = content
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.checked_at = checked_at
+
+
+class MemoryCache:
+    """内存文件的写穿透读缓存（线程安全）"""
+
+    def __init__(self, revalidate_interval: float = 1.0, max_size_mb: float = 32):
+        """初始化缓存
+
+        Args:
+            revalidate_interval: 两次按修改时间校验之间的最小间隔（秒），0表示每次读取都校验
+            max_size_mb: 缓存内容的总大小上限（MB，按字符数估算）
+        """
+        self.revalidate_interval = revalidate_interval
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        # 正在读取或写入的文件：路径 -> [进行中的操作数, 版本号]，文件被替换时版本号增加，
+        # 操作全部结束后删除，因此只记录缓存实际处理的文件
+        self._pending: Dict[str, List[int]] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "revalidations": 0, "invalidations": 0, "writes": 0}
+        fileio.add_write_listener(self.invalidate)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "MemoryCache":
+        """根据[memory_cache]配置创建缓存"""
+        return cls(
+            revalidate_interval=config.get("revalidate_interval", 1.0),
+            max_size_mb=config.get("max_size_mb", 32),
+        )
+
+    def read(self, path: str) -> str:
+        """读取文件内容，优先使用缓存
+
+        Args:
+            path: 文件的绝对路径
+
+        Returns:
+            文件内容
+
+        Raises:
+            FileNotFoundError: 文件不存在
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and now - entry.checked_at < self.revalidate_interval:
+                self._entries.move_to_end(path)
+                self._stats["hits"] += 1
+                return entry.content
+            version = self._begin(path)
+
+        # 需要校验或重新读取时在锁外访问磁盘
+        try:
+            info = os.stat(path)
+            if entry is not None and entry.mtime_ns == info.st_mtime_ns and entry.size == info.st_size:
+                with self._lock:
+                    if self._entries.get(path) is entry:
+                        entry.checked_at = now
+                        self._entries.move_to_end(path)
+                        self._stats["hits"] += 1
+                        self._stats["revalidations"] += 1
+                        return entry.content
+
+            with open(path, "r", encoding="utf-8") as f:
+                content = f.read()
+            with self._lock:
+                self._stats["misses"] += 1
+                # 读取期间文件被替换时不缓存读到的内容，下一次读取重新加载
+                if self._pending[path][1] == version:
+                    self._store(path, CacheEntry(content, info.st_mtime_ns, info.st_size, now))
+            return content
+        finally:
+            with self._lock:
+                self._end(path)
+
+    def write(self, path: str, content: str):
+        """原子写入文件并更新缓存（写穿透）
+
+        Args:
+            path: 文件的绝对路径
+            content: 文件内容
+        """
+        with self._lock:
+            version = self._begin(path)
+        try:
+            fileio.atomic_write(path, content)
+            try:
+                info = os.stat(path)
+            except OSError:
+                return
+            with self._lock:
+                # atomic_write自身的通知使版本号加1，版本号还有其他变化说明写入后文件又被替换，
+                # 此时stat到的可能是其他写入者的文件，不能与content一起缓存
+                if self._pending[path][1] == version + 1:
+                    self._stats["writes"] += 1
+                    self._store(path, CacheEntry(content, info.st_mtime_ns, info.st_size, time.monotonic()))
+        finally:
+            with self._lock:
+                self._end(path)
+
+    def invalidate(self, path: str):
+        """使文件的缓存失效（文件被替换或删除后调用）"""
+        with self._lock:
+            pending = self._pending.get(path)
+            if pending is not None:
+                pending[1] += 1
+            entry = self._entries.pop(path, None)
+            if entry is not None:
+                self._size -= len(entry.content)
+                self._stats["invalidations"] += 1
+
+    def invalidate_prefix(self, directory: str):
+        """使目录下所有文件的缓存失效"""
+        prefix = os.path.join(directory, "")
+        with self._lock:
+            paths = {path for path in (*self._pending, *self._entries) if path.startswith(prefix)}
+        for path in paths:
+            self.invalidate(path)
+
+    def _begin(self, path: str) -> int:
+        """登记一次读取或写入，返回文件当前的版本号（调用者需持有锁）"""
+        pending = self._pending.setdefault(path, [0, 0])
+        pending[0] += 1
+        return pending[1]
+
+    def _end(self, path: str):
+        """结束一次读取或写入，没有进行中的操作时不再记录版本号（调用者需持有锁）"""
+        pending = self._pending[path]
+        pending[0] -= 1
+        if pending[0] == 0:
+            del self._pending[path]
+
+    def _store(self, path: str, entry: CacheEntry):
+        """保存条目并按LRU淘汰（调用者需持有锁）"""
+        old = self._entries.pop(path, None)
+        if old is not None:
+            self._size -= len(old.content)
+        if len(entry.content) > self.max_size:
+            return
+        self._entries[path] = entry
+        self._size += len(entry.content)
+        while self._size > self.max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted.content)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            for pending in self._pending.values():
+                pending[1] += 1
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计信息"""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "size": self._size,
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+            }
+
+    def close(self):
+        """停止监听文件写入并清空缓存"""
+        fileio.remove_write_listener(self.invalidate)
+        self.clear()
+
+
+# 全局内存文件缓存
+_memory_cache: Optional[MemoryCache] = None
+_cache_loaded = False
+_cache_lock = threading.Lock()
+
+
+def get_memory_cache() -> Optional[MemoryCache]:
+    """获取内存文件缓存实例
+
+    Returns:
+        缓存实例，未启用缓存时返回None
+    """
+    global _memory_cache, _cache_loaded
+
+    with _cache_lock:
+        if not _cache_loaded:
+            config = get_memory_cache_config()
+            if config.get("enabled", True):
+                _memory_cache = MemoryCache.from_config(config)
+            _cache_loaded = True
+
+    return _memory_cache
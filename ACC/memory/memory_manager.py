@@ -2,6 +2,7 @@
 
 该模块提供了内存管理功能，包括保存和读取AI生成的文件、记录运行状态等。
 所有需要持久化存储的数据都应通过该模块进行管理。
+文件路径相对于当前内存会话的根目录（见ACC.memory.session），未设置会话时为MEMORY_DIR。
 """
 
 import json
@@ -11,9 +12,15 @@ import shutil  # 添加缺失的shutil模块导入
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
+from ACC.fileio import atomic_write
+from ACC.memory.memory_cache import get_memory_cache
+from ACC.memory.operation_history import get_operation_history_store
+from ACC.memory.planning_store import get_planning_store
+from ACC.memory.session import current_session
+
 logger = logging.getLogger(__name__)
 
-# 内存目录路径
+# 内存目录路径（默认会话的根目录）
 MEMORY_DIR = os.path.join(
     os.path.dirname(os.path.abspath(__file__)),  # 直接指向ACC/memory目录
 )
@@ -27,6 +34,11 @@ if not os.path.exists(MEMORY_DIR):
 class MemoryManager:
     """内存管理器，负责管理ACC的内存"""
 
+    @staticmethod
+    def memory_dir() -> str:
+        """当前内存会话的根目录"""
+        return current_session().root
+
     @staticmethod
     def save_file(filename: str, content: str) -> str:
         """保存文件到内存目录
@@ -38,15 +50,16 @@ class MemoryManager:
         Returns:
             文件完整路径
         """
-        file_path = os.path.join(MEMORY_DIR, filename)
+        file_path = os.path.abspath(os.path.join(MemoryManager.memory_dir(), filename))
 
         try:
-            # 确保目录存在
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-
-            # 写入文件
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(content)
+            # 原子写入（自动创建目录），读取者不会看到写了一半的文件；
+            # 启用缓存时由缓存写入（写穿透），下一次读取直接使用刚写入的内容
+            cache = get_memory_cache()
+            if cache is not None:
+                cache.write(file_path, content)
+            else:
+                atomic_write(file_path, content)
 
             logger.debug(f"保存文件成功: {file_path}")
             return file_path
@@ -64,20 +77,22 @@ class MemoryManager:
         Returns:
             文件内容
         """
-        file_path = os.path.join(MEMORY_DIR, filename)
+        file_path = os.path.abspath(os.path.join(MemoryManager.memory_dir(), filename))
 
         try:
-            # 检查文件是否存在
-            if not os.path.exists(file_path):
-                logger.error(f"文件不存在: {file_path}")
-                raise FileNotFoundError(f"文件不存在: {file_path}")
-
-            # 读取文件
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            logger.info(f"读取文件成功: {file_path}")
+            cache = get_memory_cache()
+            if cache is not None:
+                # 缓存命中时不访问磁盘，文件不存在时由stat抛出FileNotFoundError
+                content = cache.read(file_path)
+            else:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    content = f.read()
+
+            logger.debug(f"读取文件成功: {file_path}")
             return content
+        except FileNotFoundError:
+            logger.error(f"文件不存在: {file_path}")
+            raise FileNotFoundError(f"文件不存在: {file_path}")
         except Exception as e:
             logger.error(f"读取文件失败: {e}")
             raise
@@ -85,32 +100,20 @@ class MemoryManager:
     @staticmethod
     def clean_operation_generalization_directory():
         """清空操作解释目录"""
-        # 修正路径，确保在ACC/memory目录下
-        operation_gen_dir = os.path.join(MEMORY_DIR, "operation_generalization")
-        if os.path.exists(operation_gen_dir):
-            for file in os.listdir(operation_gen_dir):
-                file_path = os.path.join(operation_gen_dir, file)
-                if os.path.isfile(file_path):
-                    os.remove(file_path)
-            logger.info("清空操作解释目录完成")
-        else:
-            os.makedirs(operation_gen_dir, exist_ok=True)
-            logger.info(f"创建操作解释目录: {operation_gen_dir}")
+        # 通过历史记录存储清空，同时丢弃其缓存和打开的文件句柄
+        get_operation_history_store().clear()
+        logger.info("清空操作解释目录完成")
 
     @staticmethod
     def clean_operation_directory():
         """清空操作目录"""
-        operation_dir = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-            "memory",
-            "todo",
-            "operation",
-        )
+        operation_dir = os.path.join(MemoryManager.memory_dir(), "todo", "operation")
         if os.path.exists(operation_dir):
             for file in os.listdir(operation_dir):
                 file_path = os.path.join(operation_dir, file)
                 if os.path.isfile(file_path):
                     os.remove(file_path)
+            MemoryManager._invalidate_cache(operation_dir)
             logger.info("清空操作目录完成")
 
     @staticmethod
@@ -181,13 +184,17 @@ class MemoryManager:
             文件名列表
         """
         try:
-            if not os.path.exists(MEMORY_DIR):
+            memory_dir = MemoryManager.memory_dir()
+            if not os.path.exists(memory_dir):
                 return []
 
             files = []
-            for root, _, filenames in os.walk(MEMORY_DIR):
+            for root, dirs, filenames in os.walk(memory_dir):
+                # 默认会话的根目录下包含其他会话的目录，不属于当前会话
+                if root == memory_dir and "sessions" in dirs:
+                    dirs.remove("sessions")
                 for filename in filenames:
-                    rel_path = os.path.relpath(os.path.join(root, filename), MEMORY_DIR)
+                    rel_path = os.path.relpath(os.path.join(root, filename), memory_dir)
                     files.append(rel_path)
 
             return files
@@ -199,7 +206,9 @@ class MemoryManager:
     @staticmethod
     def clean_todo_directory():
         """清空ACC模块的todo目录"""
-        todo_dir = os.path.join(MEMORY_DIR, "todo")
+        # 同时清空内存中的规划任务（planning.json/planning.md位于todo目录）
+        get_planning_store().reset()
+        todo_dir = os.path.join(MemoryManager.memory_dir(), "todo")
         if os.path.exists(todo_dir):
             for filename in os.listdir(todo_dir):
                 file_path = os.path.join(todo_dir, filename)
@@ -208,28 +217,43 @@ class MemoryManager:
                         os.unlink(file_path)
                 except Exception as e:
                     logger.error(f"删除文件失败 {file_path}: {e}")
+            MemoryManager._invalidate_cache(todo_dir)
             logger.info(f"已清空TODO目录: {todo_dir}")
 
     @staticmethod
     def clean_refinement_directory():
         """清空细化目录"""
-        refinement_dir = os.path.join(MEMORY_DIR, "todo", "refinement")
+        refinement_dir = os.path.join(MemoryManager.memory_dir(), "todo", "refinement")
         if os.path.exists(refinement_dir):
             shutil.rmtree(refinement_dir)
+        MemoryManager._invalidate_cache(refinement_dir)
         os.makedirs(refinement_dir, exist_ok=True)
 
     @staticmethod
     def clean_history_file():
         """清空历史记录文件"""
-        file_path = os.path.join(MEMORY_DIR, "history.json")
+        file_path = os.path.join(MemoryManager.memory_dir(), "history.json")
         try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write("[]")
+            # 通过fileio替换文件时缓存会自动失效
+            atomic_write(file_path, "[]")
             logger.info(f"已清空历史记录文件: {file_path}")
         except Exception as e:
             logger.error(f"清空历史记录文件失败: {e}")
             raise
 
+    @staticmethod
+    def _invalidate_cache(directory: str):
+        """删除目录中的文件后，使这些文件的缓存失效"""
+        cache = get_memory_cache()
+        if cache is not None:
+            cache.invalidate_prefix(os.path.abspath(directory))
+
+    @staticmethod
+    def cache_stats() -> Optional[Dict[str, Any]]:
+        """内存文件缓存的统计信息（命中、未命中、失效次数等），未启用缓存时返回None"""
+        cache = get_memory_cache()
+        return cache.stats() if cache is not None else None
+
 
 # 创建全局内存管理器实例
 _memory_manager = None
@@ -0,0 +1,309 @@
+"""操作历史记录存储模块
+
+每个任务的操作历史保存为operation_generalization目录下的一个JSONL文件（如1_1.jsonl），
+每条消息一行，只追加不重写：
+- 追加时只写入新增的消息，写入后立即flush，fsync按批次进行
+- 每个任务的历史在内存中缓存，并记录已读取到的文件偏移，读取时只解析新增的部分
+- 通过文件的inode、修改时间和已读取部分末尾的字节发现文件被替换或重写，此时重新加载
+- OperateAgent和SumupAgent通过同一个存储实例读写，每个内存会话有各自的实例
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ACC.memory.session import current_session
+
+logger = logging.getLogger(__name__)
+
+# 操作历史记录目录
+OPERATION_HISTORY_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "operation_generalization"
+)
+
+HISTORY_FILE_SUFFIX = ".jsonl"
+
+# 记录已读取部分末尾的字节数，用于发现文件被原地重写
+TAIL_CHECK_BYTES = 64
+
+
+class OperationHistoryStore:
+    """追加写的操作历史记录存储"""
+
+    def __init__(
+        self,
+        directory: str = OPERATION_HISTORY_DIR,
+        fsync_batch: int = 16,
+        fsync_interval: float = 1.0,
+    ):
+        """初始化操作历史记录存储
+
+        Args:
+            directory: 历史记录目录
+            fsync_batch: 累计多少次追加后执行一次fsync
+            fsync_interval: 距离上次fsync超过多少秒时执行fsync
+        """
+        self.directory = directory
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.RLock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._offsets: Dict[str, int] = {}
+        # 已读取的文件的(st_dev, st_ino, st_mtime_ns)，以及已读取部分末尾的字节
+        self._stamps: Dict[str, Tuple[int, int, int]] = {}
+        self._tails: Dict[str, bytes] = {}
+        self._files: Dict[str, Any] = {}
+        self._unsynced: Dict[str, int] = {}
+        self._last_sync = time.monotonic()
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def _key(task_number) -> str:
+        """统一任务编号格式"""
+        return str(task_number).strip()
+
+    def path(self, task_number) -> str:
+        """获取任务的历史记录文件路径，例如：1.1 -> 1_1.jsonl"""
+        file_name = self._key(task_number).replace(".", "_") + HISTORY_FILE_SUFFIX
+        return os.path.join(self.directory, file_name)
+
+    def _drop(self, key: str):
+        """丢弃任务的缓存状态并关闭文件句柄（调用方需持有锁）"""
+        handle = self._files.pop(key, None)
+        if handle is not None:
+            handle.close()
+        self._entries.pop(key, None)
+        self._offsets.pop(key, None)
+        self._stamps.pop(key, None)
+        self._tails.pop(key, None)
+        self._unsynced.pop(key, None)
+
+    def _same_file(self, key: str, path: str, info: Optional[os.stat_result], offset: int) -> bool:
+        """文件是否仍是上次读取的文件，且已读取的部分没有变化（调用方需持有锁）"""
+        if info is None or info.st_size < offset:
+            return False
+        stamp = self._stamps.get(key)
+        if stamp is None:
+            return True
+        if (info.st_dev, info.st_ino) != stamp[:2]:
+            # 文件被替换（如被删除后重新创建）
+            return False
+        if info.st_mtime_ns == stamp[2] or offset == 0:
+            return True
+        # 文件被修改过：追加不会改变已读取的部分，被截断后重新写入则通常会改变
+        tail = self._tails.get(key, b"")
+        try:
+            with open(path, "rb") as f:
+                f.seek(offset - len(tail))
+                return f.read(len(tail)) == tail
+        except OSError:
+            return False
+
+    def _remember(self, key: str, info: os.stat_result, data: bytes):
+        """记录文件的标识和已读取部分末尾的字节（调用方需持有锁）"""
+        self._stamps[key] = (info.st_dev, info.st_ino, info.st_mtime_ns)
+        if data:
+            self._tails[key] = (self._tails.get(key, b"") + data)[-TAIL_CHECK_BYTES:]
+
+    def _refresh(self, key: str) -> List[Dict[str, Any]]:
+        """从上次读取的偏移处增量读取文件（调用方需持有锁）
+
+        Returns:
+            任务的缓存历史记录列表
+        """
+        path = self.path(key)
+        try:
+            info = os.stat(path)
+        except OSError:
+            info = None
+
+        offset = self._offsets.get(key, 0)
+        if not self._same_file(key, path, info, offset):
+            # 文件被删除、截断、替换或重写，重新开始读取
+            if key in self._entries:
+                logger.debug(f"操作历史文件已被外部清理，重新加载: {path}")
+            self._drop(key)
+            offset = 0
+
+        entries = self._entries.setdefault(key, [])
+        self._offsets.setdefault(key, 0)
+        if info is None:
+            return entries
+        size = info.st_size
+        if size == offset:
+            self._remember(key, info, b"")
+            return entries
+
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read(size - offset)
+
+        # 只处理完整的行，未写完的行留到下次读取
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                logger.error(f"跳过损坏的操作历史记录行: {path}, 错误: {e}")
+        self._offsets[key] = offset + end
+        self._remember(key, info, data[:end])
+        return entries
+
+    def read(self, task_number) -> List[Dict[str, Any]]:
+        """读取任务的全部历史记录
+
+        Returns:
+            历史记录列表的副本，文件不存在时返回空列表
+        """
+        key = self._key(task_number)
+        with self._lock:
+            return list(self._refresh(key))
+
+    def read_since(self, task_number, start: int) -> List[Dict[str, Any]]:
+        """读取任务从第start条开始的历史记录"""
+        key = self._key(task_number)
+        with self._lock:
+            return self._refresh(key)[start:]
+
+    def count(self, task_number) -> int:
+        """任务已保存的历史记录条数"""
+        key = self._key(task_number)
+        with self._lock:
+            return len(self._refresh(key))
+
+    def exists(self, task_number) -> bool:
+        """任务是否有历史记录文件"""
+        return os.path.exists(self.path(task_number))
+
+    def append(self, task_number, records: List[Dict[str, Any]]):
+        """追加历史记录
+
+        Args:
+            task_number: 任务编号
+            records: 新增的消息列表
+        """
+        if not records:
+            return
+
+        key = self._key(task_number)
+        data = "".join(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in records
+        ).encode("utf-8")
+
+        with self._lock:
+            entries = self._refresh(key)
+
+            # 上次写入被中断时文件末尾会留下不完整的行，新记录如果接在后面会与其拼成一行，
+            # 偏移也会指向记录中间，因此先截断到最后一个完整行
+            path = self.path(key)
+            offset = self._offsets[key]
+            try:
+                torn = os.path.getsize(path) > offset
+            except OSError:
+                torn = False
+            if torn:
+                logger.warning(f"截断操作历史文件末尾不完整的记录: {path}")
+                os.truncate(path, offset)
+
+            handle = self._files.get(key)
+            if handle is None:
+                handle = open(path, "ab")
+                self._files[key] = handle
+            handle.write(data)
+            handle.flush()
+
+            entries.extend(records)
+            self._offsets[key] += len(data)
+            self._remember(key, os.fstat(handle.fileno()), data)
+            self._unsynced[key] = self._unsynced.get(key, 0) + 1
+
+            if (
+                sum(self._unsynced.values()) >= self.fsync_batch
+                or time.monotonic() - self._last_sync >= self.fsync_interval
+            ):
+                self.sync()
+
+    def save(self, task_number, history: List[Dict[str, Any]]):
+        """保存任务的完整历史记录，只追加尚未保存的部分
+
+        history应为已保存历史记录的延续；如果比已保存的记录短，则重写整个文件。
+        """
+        key = self._key(task_number)
+        with self._lock:
+            saved = len(self._refresh(key))
+            if len(history) < saved:
+                logger.warning(f"任务 {key} 的操作历史比已保存的记录短，重写历史文件")
+                self.clear(key)
+                saved = 0
+            self.append(key, history[saved:])
+
+    def sync(self):
+        """将所有未同步的追加写入磁盘"""
+        with self._lock:
+            for key in list(self._unsynced):
+                handle = self._files.get(key)
+                if handle is not None:
+                    os.fsync(handle.fileno())
+            self._unsynced.clear()
+            self._last_sync = time.monotonic()
+
+    def clear(self, task_number=None):
+        """清空历史记录
+
+        Args:
+            task_number: 任务编号，为None时清空所有任务
+        """
+        with self._lock:
+            if task_number is None:
+                for key in list(self._files):
+                    self._drop(key)
+                self._entries.clear()
+                self._offsets.clear()
+                self._stamps.clear()
+                self._tails.clear()
+                for file_name in os.listdir(self.directory):
+                    file_path = os.path.join(self.directory, file_name)
+                    if os.path.isfile(file_path):
+                        os.remove(file_path)
+                return
+
+            key = self._key(task_number)
+            self._drop(key)
+            path = self.path(key)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def tasks(self) -> List[str]:
+        """列出所有有历史记录的任务编号"""
+        task_numbers = []
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith(HISTORY_FILE_SUFFIX):
+                task_numbers.append(file_name[: -len(HISTORY_FILE_SUFFIX)].replace("_", "."))
+        return task_numbers
+
+    def close(self):
+        """同步并关闭所有文件句柄"""
+        with self._lock:
+            self.sync()
+            for key in list(self._files):
+                self._files.pop(key).close()
+
+
+def get_operation_history_store() -> OperationHistoryStore:
+    """获取当前会话的操作历史记录存储实例（进程退出时由会话注册表关闭）
+
+    Returns:
+        操作历史记录存储实例
+    """
+    session = current_session()
+    return session.resource(
+        "operation_history_store",
+        lambda: OperationHistoryStore(session.path("operation_generalization")),
+    )
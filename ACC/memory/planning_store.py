@@ -0,0 +1,320 @@
+"""规划任务存储模块
+
+规划Agent生成的planning.md解析后保存为结构化的任务图（todo/planning.json），
+任务状态的查询和更新都在内存中完成，不再反复读取和正则改写planning.md：
+- 按任务编号O(1)查询和更新状态，所有读写由同一把锁保护，可供并行任务同时使用
+- 每次更新后原子写入planning.json，并重新渲染planning.md供查看
+- 提示词中需要的planning.md内容由render_markdown()从内存渲染
+- 每个内存会话有各自的存储实例，文件位于会话目录的todo子目录中
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Union
+
+from ACC.fileio import AtomicBatch
+from ACC.memory.session import current_session
+
+logger = logging.getLogger(__name__)
+
+TODO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "todo")
+PLANNING_JSON_PATH = os.path.join(TODO_DIR, "planning.json")
+PLANNING_MD_PATH = os.path.join(TODO_DIR, "planning.md")
+
+# 任务行，例如 "- [ ] 1.1 描述"
+TASK_LINE_PATTERN = re.compile(r"^\s*-\s*\[( |x|X)\]\s*(\d+\.\d+)\s*(.*)$")
+
+# 依赖标注，例如 "(依赖: 1.1, 1.2)"、"（依赖：无）"、"(depends: 1.1)"
+DEPENDENCY_PATTERN = re.compile(
+    r"[（(]\s*(?:依赖|depends(?:\s+on)?)\s*[:：]\s*([^）)]*)[）)]", re.IGNORECASE
+)
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class PlanTask:
+    """planning.md中的一个任务"""
+
+    def __init__(
+        self,
+        number: str,
+        description: str,
+        depends_on: Optional[List[str]] = None,
+        status: str = PENDING,
+        depends_declared: bool = False,
+        error: Optional[str] = None,
+    ):
+        """初始化任务
+
+        Args:
+            number: 任务编号，如"1.1"
+            description: 任务描述（不含依赖标注）
+            depends_on: 依赖的任务编号列表
+            status: 任务状态
+            depends_declared: 依赖是否在planning.md中显式标注
+            error: 任务失败时的错误信息
+        """
+        self.number = number
+        self.description = description
+        self.depends_on = depends_on or []
+        self.status = status
+        self.depends_declared = depends_declared
+        self.error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可序列化的字典"""
+        return {
+            "number": self.number,
+            "description": self.description,
+            "depends_on": self.depends_on,
+            "status": self.status,
+            "depends_declared": self.depends_declared,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlanTask":
+        """从字典创建任务"""
+        return cls(
+            data["number"],
+            data.get("description", ""),
+            data.get("depends_on", []),
+            data.get("status", PENDING),
+            data.get("depends_declared", False),
+            data.get("error"),
+        )
+
+    def render(self) -> str:
+        """渲染为planning.md中的任务行"""
+        line = f"- [{'x' if self.status == COMPLETED else ' '}] {self.number} {self.description}".rstrip()
+        if self.depends_declared:
+            line += f" (依赖: {', '.join(self.depends_on) or '无'})"
+        return line
+
+    def __repr__(self) -> str:
+        return f"PlanTask({self.number!r}, status={self.status!r}, depends_on={self.depends_on!r})"
+
+
+def parse_planning_markdown(content: str):
+    """解析planning.md内容
+
+    未标注依赖的任务默认依赖列表中的前一个任务。
+
+    Args:
+        content: planning.md内容
+
+    Returns:
+        (任务列表, 行模板)，行模板中非任务行为原始文本，任务行为{"task": 编号}
+    """
+    tasks = []
+    lines: List[Union[str, Dict[str, str]]] = []
+    previous = None
+    for line in content.splitlines():
+        match = TASK_LINE_PATTERN.match(line)
+        if not match:
+            lines.append(line)
+            continue
+
+        checked, number, description = match.groups()
+        dependency_match = DEPENDENCY_PATTERN.search(description)
+        if dependency_match:
+            depends_on = re.findall(r"\d+\.\d+", dependency_match.group(1))
+            description = DEPENDENCY_PATTERN.sub("", description)
+        else:
+            depends_on = [previous] if previous else []
+
+        tasks.append(
+            PlanTask(
+                number,
+                description.strip(),
+                depends_on,
+                COMPLETED if checked.lower() == "x" else PENDING,
+                depends_declared=dependency_match is not None,
+            )
+        )
+        lines.append({"task": number})
+        previous = number
+    return tasks, lines
+
+
+class PlanningStore:
+    """结构化的规划任务存储（线程安全）"""
+
+    def __init__(self, path: str = PLANNING_JSON_PATH, markdown_path: str = PLANNING_MD_PATH):
+        """初始化规划任务存储
+
+        Args:
+            path: 任务图JSON文件路径
+            markdown_path: 渲染出的planning.md路径
+        """
+        self.path = path
+        self.markdown_path = markdown_path
+        # 调度器需要在同一把锁下完成"检查并标记"，因此锁是公开的
+        self.lock = threading.RLock()
+        self._tasks: Dict[str, PlanTask] = {}
+        self._order: List[str] = []
+        self._lines: List[Union[str, Dict[str, str]]] = []
+        self._rendered: Optional[str] = None
+        self.load()
+
+    def load(self) -> bool:
+        """从planning.json加载任务图
+
+        Returns:
+            是否加载成功
+        """
+        with self.lock:
+            self._reset()
+            if not os.path.exists(self.path):
+                return False
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._set(
+                    [PlanTask.from_dict(task) for task in data.get("tasks", [])],
+                    data.get("lines", []),
+                )
+                return True
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"加载规划任务失败: {e}")
+                self._reset()
+                return False
+
+    def load_markdown(self, content: str):
+        """用planning.md内容替换当前任务图并保存
+
+        Args:
+            content: planning.md内容
+        """
+        tasks, lines = parse_planning_markdown(content)
+        with self.lock:
+            self._set(tasks, lines)
+            self.save()
+        logger.info(f"已解析规划任务，共 {len(self._order)} 个任务")
+
+    def _reset(self):
+        self._tasks = {}
+        self._order = []
+        self._lines = []
+        self._rendered = None
+
+    def _set(self, tasks: List[PlanTask], lines: List[Union[str, Dict[str, str]]]):
+        """设置任务和行模板，并清理重复编号和不存在的依赖（调用方需持有锁）"""
+        self._reset()
+        for task in tasks:
+            if task.number in self._tasks:
+                logger.warning(f"任务编号重复，忽略后出现的任务: {task.number}")
+                continue
+            self._tasks[task.number] = task
+            self._order.append(task.number)
+
+        seen = set()
+        for line in lines:
+            if isinstance(line, dict):
+                if line.get("task") not in self._tasks or line["task"] in seen:
+                    continue
+                seen.add(line["task"])
+            self._lines.append(line)
+
+        for task in self._tasks.values():
+            unknown = [n for n in task.depends_on if n not in self._tasks or n == task.number]
+            if unknown:
+                logger.warning(f"任务 {task.number} 的依赖不存在，已忽略: {unknown}")
+                task.depends_on = [n for n in task.depends_on if n not in unknown]
+
+    def reset(self):
+        """清空内存中的任务图（文件由MemoryManager清理）"""
+        with self.lock:
+            self._reset()
+
+    def save(self):
+        """原子写入planning.json，并重新渲染planning.md"""
+        with self.lock:
+            self._rendered = None
+            data = {
+                "tasks": [self._tasks[number].to_dict() for number in self._order],
+                "lines": self._lines,
+            }
+            # 两个文件一起原子写入，避免读到写了一半的文件
+            with AtomicBatch() as batch:
+                batch.write(self.path, json.dumps(data, ensure_ascii=False, indent=2))
+                batch.write(self.markdown_path, self.render_markdown())
+
+    def render_markdown(self) -> str:
+        """渲染planning.md内容（结果在任务状态变化前会被缓存）"""
+        with self.lock:
+            if self._rendered is None:
+                self._rendered = "\n".join(
+                    self._tasks[line["task"]].render() if isinstance(line, dict) else line
+                    for line in self._lines
+                )
+            return self._rendered
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, number) -> bool:
+        return str(number) in self._tasks
+
+    def get(self, number: str) -> Optional[PlanTask]:
+        """按编号获取任务"""
+        return self._tasks.get(str(number))
+
+    def status(self, number: str) -> Optional[str]:
+        """按编号获取任务状态"""
+        task = self._tasks.get(str(number))
+        return task.status if task else None
+
+    @property
+    def tasks(self) -> List[PlanTask]:
+        """按planning.md中顺序排列的任务列表"""
+        with self.lock:
+            return [self._tasks[number] for number in self._order]
+
+    def set_status(self, number: str, status: str, error: Optional[str] = None, save: bool = True) -> bool:
+        """更新任务状态
+
+        Args:
+            number: 任务编号
+            status: 新状态
+            error: 失败时的错误信息
+            save: 是否立即保存
+
+        Returns:
+            任务是否存在
+        """
+        with self.lock:
+            task = self._tasks.get(str(number))
+            if task is None:
+                logger.warning(f"任务不存在: {number}")
+                return False
+            task.status = status
+            task.error = error
+            self._rendered = None
+            if save:
+                self.save()
+            return True
+
+    def all_completed(self) -> bool:
+        """是否所有任务都已完成"""
+        with self.lock:
+            return all(task.status == COMPLETED for task in self._tasks.values())
+
+
+def get_planning_store() -> PlanningStore:
+    """获取当前会话的规划任务存储实例
+
+    Returns:
+        规划任务存储实例
+    """
+    session = current_session()
+    return session.resource(
+        "planning_store",
+        lambda: PlanningStore(session.path("todo", "planning.json"), session.path("todo", "planning.md")),
+    )
@@ -0,0 +1,307 @@
+"""内存会话模块
+
+每个会话拥有独立的内存目录，同一进程中的多个工作流可以并发执行，互不清空对方的状态：
+- 默认会话的根目录就是ACC/memory，与单用户运行时的目录结构相同
+- 命名会话的根目录为ACC/memory/sessions/<会话ID>，其中的目录结构与默认会话相同
+- 当前会话保存在ContextVar中，由session_scope设置；线程池任务通过contextvars.copy_context传递，
+  asyncio任务自动继承。MemoryManager、规划任务存储、操作历史记录存储都按当前会话解析路径
+- 超过有效期未使用、且没有工作流正在使用的会话会被清理（删除目录），
+  包括之前的进程遗留在sessions目录中的会话
+"""
+
+import atexit
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from ACC.config import get_memory_session_config
+from ACC.memory.memory_cache import get_memory_cache
+
+logger = logging.getLogger(__name__)
+
+# 默认会话的根目录（ACC/memory）
+MEMORY_ROOT = os.path.dirname(os.path.abspath(__file__))
+# 命名会话所在的目录
+SESSIONS_DIR = os.path.join(MEMORY_ROOT, "sessions")
+
+DEFAULT_SESSION_ID = "default"
+
+# 会话ID只能包含字母、数字、下划线和连字符，避免被解析为其他路径
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def new_session_id() -> str:
+    """生成新的会话ID"""
+    return uuid.uuid4().hex
+
+
+class MemorySession:
+    """一个内存会话：会话根目录，以及在该目录上创建的存储实例"""
+
+    def __init__(self, session_id: str, root: str):
+        """初始化会话
+
+        Args:
+            session_id: 会话ID
+            root: 会话根目录
+        """
+        self.session_id = session_id
+        self.root = root
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        # 正在使用该会话的session_scope数量，大于0时不会过期
+        self.active = 0
+        self.closed = False
+        self._resources: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    @property
+    def is_default(self) -> bool:
+        return self.session_id == DEFAULT_SESSION_ID
+
+    def path(self, *parts: str) -> str:
+        """会话根目录下的路径"""
+        return os.path.join(self.root, *parts)
+
+    def resource(self, name: str, factory: Callable[[], Any]) -> Any:
+        """获取会话内的单例资源（如规划任务存储），不存在时调用factory创建"""
+        with self._lock:
+            if name not in self._resources:
+                self._resources[name] = factory()
+            return self._resources[name]
+
+    def touch(self):
+        """记录最近使用时间（同时更新目录的修改时间，供其他进程判断是否过期）"""
+        self.last_used = time.time()
+        try:
+            os.utime(self.root)
+        except OSError:
+            pass
+
+    def close(self, remove: bool = False):
+        """关闭会话中的资源
+
+        Args:
+            remove: 是否删除会话目录（默认会话的目录不会被删除）
+        """
+        with self._lock:
+            resources = list(self._resources.values())
+            self._resources.clear()
+            self.closed = True
+        for resource in resources:
+            close = getattr(resource, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    logger.warning(f"关闭会话资源失败: {e}")
+
+        cache = get_memory_cache()
+        if cache is not None:
+            cache.invalidate_prefix(self.root)
+
+        if remove and not self.is_default:
+            shutil.rmtree(self.root, ignore_errors=True)
+            logger.info(f"已删除会话目录: {self.root}")
+
+
+class SessionManager:
+    """会话注册表（线程安全）"""
+
+    def __init__(
+        self,
+        sessions_dir: str = SESSIONS_DIR,
+        ttl: Optional[float] = 86400,
+        cleanup_interval: float = 600,
+    ):
+        """初始化会话注册表
+
+        Args:
+            sessions_dir: 命名会话所在的目录
+            ttl: 会话未使用多久（秒）后过期，None表示不过期
+            cleanup_interval: 两次过期清理之间的最小间隔（秒）
+        """
+        self.sessions_dir = sessions_dir
+        self.ttl = ttl
+        self.cleanup_interval = cleanup_interval
+        self.default = MemorySession(DEFAULT_SESSION_ID, MEMORY_ROOT)
+        self._sessions: Dict[str, MemorySession] = {}
+        self._lock = threading.Lock()
+        self._last_cleanup = 0.0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "SessionManager":
+        """根据[memory_session]配置创建会话注册表"""
+        ttl_hours = config.get("ttl_hours", 24)
+        return cls(
+            ttl=ttl_hours * 3600 if ttl_hours and ttl_hours > 0 else None,
+            cleanup_interval=config.get("cleanup_interval", 600),
+        )
+
+    def get(self, session_id: Optional[str] = None) -> MemorySession:
+        """获取会话，不存在时创建
+
+        Args:
+            session_id: 会话ID，为空时返回默认会话
+
+        Returns:
+            会话实例
+
+        Raises:
+            ValueError: 会话ID格式无效
+        """
+        if not session_id or session_id == DEFAULT_SESSION_ID:
+            return self.default
+        if not SESSION_ID_PATTERN.match(session_id):
+            raise ValueError(f"无效的会话ID: {session_id}")
+
+        self._maybe_expire()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or session.closed:
+                session = MemorySession(session_id, os.path.join(self.sessions_dir, session_id))
+                self._sessions[session_id] = session
+                logger.info(f"创建内存会话: {session_id}")
+            session.touch()
+            return session
+
+    def close(self, session_id: str, remove: bool = True) -> bool:
+        """关闭会话
+
+        Args:
+            session_id: 会话ID
+            remove: 是否删除会话目录
+
+        Returns:
+            会话是否存在
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        session.close(remove=remove)
+        return True
+
+    def sessions(self) -> List[Dict[str, Any]]:
+        """当前进程中的命名会话"""
+        with self._lock:
+            return [
+                {
+                    "session_id": session.session_id,
+                    "root": session.root,
+                    "active": session.active,
+                    "idle_seconds": round(time.time() - session.last_used, 1),
+                }
+                for session in self._sessions.values()
+            ]
+
+    def _maybe_expire(self):
+        """距离上次清理超过cleanup_interval时清理过期会话"""
+        if self.ttl is None or time.monotonic() - self._last_cleanup < self.cleanup_interval:
+            return
+        self._last_cleanup = time.monotonic()
+        self.expire()
+
+    def expire(self) -> List[str]:
+        """清理过期会话（未使用时间超过ttl且没有正在使用）
+
+        Returns:
+            被清理的会话ID列表
+        """
+        if self.ttl is None:
+            return []
+        deadline = time.time() - self.ttl
+        with self._lock:
+            expired = [
+                session for session in self._sessions.values()
+                if session.active == 0 and session.last_used < deadline
+            ]
+            for session in expired:
+                del self._sessions[session.session_id]
+            known = set(self._sessions)
+        removed = []
+        for session in expired:
+            session.close(remove=True)
+            removed.append(session.session_id)
+
+        # 之前的进程遗留的会话目录按目录修改时间判断
+        try:
+            with os.scandir(self.sessions_dir) as entries:
+                leftovers = [
+                    entry for entry in entries
+                    if entry.is_dir(follow_symlinks=False) and entry.name not in known
+                ]
+        except OSError:
+            leftovers = []
+        for entry in leftovers:
+            try:
+                if entry.stat(follow_symlinks=False).st_mtime >= deadline:
+                    continue
+            except OSError:
+                continue
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed.append(entry.name)
+
+        if removed:
+            logger.info(f"已清理 {len(removed)} 个过期的内存会话")
+        return removed
+
+    def shutdown(self):
+        """进程退出时关闭所有会话的资源（保留目录）"""
+        with self._lock:
+            sessions = [self.default, *self._sessions.values()]
+        for session in sessions:
+            session.close(remove=False)
+
+
+# 当前上下文使用的会话，未设置时使用默认会话
+_current_session: ContextVar[Optional[MemorySession]] = ContextVar("acc_memory_session", default=None)
+
+# 全局会话注册表
+_session_manager: Optional[SessionManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_session_manager() -> SessionManager:
+    """获取会话注册表实例
+
+    Returns:
+        会话注册表实例
+    """
+    global _session_manager
+
+    with _manager_lock:
+        if _session_manager is None:
+            _session_manager = SessionManager.from_config(get_memory_session_config())
+            atexit.register(_session_manager.shutdown)
+
+    return _session_manager
+
+
+def current_session() -> MemorySession:
+    """当前上下文使用的会话"""
+    session = _current_session.get()
+    return session if session is not None else get_session_manager().default
+
+
+@contextmanager
+def session_scope(session: MemorySession) -> Iterator[MemorySession]:
+    """在with块中把session设为当前会话，使用期间会话不会过期"""
+    token = _current_session.set(session)
+    with session._lock:
+        session.active += 1
+    try:
+        yield session
+    finally:
+        with session._lock:
+            session.active -= 1
+        session.touch()
+        _current_session.reset(token)
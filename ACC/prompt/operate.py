@@ -100,7 +100,9 @@ SYSTEM_PROMPT = f"""当前时间: {current_time}。当前操作系统: {current_
 - 如果需要使用工具，请在tool_name和tool_params中提供详细信息
 - 如果操作未成功完成或等待工具回复，请将success设置为false
 - 使用工具操作优先级：工具 > Bash代码 > Python代码
-- 如果谷歌搜索无法使用，请使用其他搜索引擎
+- 搜索网页时优先使用search_web工具，它会同时查询多个搜索引擎并合并结果，无需在某个搜索引擎不可用时再换一个重试
+- 查找文件时优先使用search_workspace工具（按文件名、glob模式或内容查找），不要逐层list_directory或执行find/grep命令
+- 安装依赖、编译、启动服务等耗时命令可以用execute_command的background=true在后台运行，先完成其他TODO项，再用action=wait或poll获取结果
 - 请确保所有当前步骤的所有操作均已完成后才可设置success为true
 """
 
@@ -55,14 +55,14 @@ SYSTEM_PROMPT = f"""当前时间: {current_time}。
     "task_structure": "<任务> TODO
 
 ## 1. <一级任务列表>
-- [ ] 1.1 <二级任务描述>
-- [ ] 1.2 <二级任务描述>
-- [ ] 1.3 <二级任务描述>
+- [ ] 1.1 <二级任务描述> (依赖: 无)
+- [ ] 1.2 <二级任务描述> (依赖: 无)
+- [ ] 1.3 <二级任务描述> (依赖: 1.1, 1.2)
 
 ## 2. <一级任务列表>
-- [ ] 2.1 <二级任务描述>
-- [ ] 2.2 <二级任务描述>
-- [ ] 2.3 <二级任务描述>
+- [ ] 2.1 <二级任务描述> (依赖: 1.3)
+- [ ] 2.2 <二级任务描述> (依赖: 2.1)
+- [ ] 2.3 <二级任务描述> (依赖: 2.1)
 ..."  // 注意：任务结构必须是Markdown格式的TODO列表，且只能将所有TODO放在同一个Markdown列表内。一级任务列表不可添加"[ ]"。
     }},
   "execution_plan": "执行计划的总体描述"
@@ -71,6 +71,7 @@ SYSTEM_PROMPT = f"""当前时间: {current_time}。
 注意：
 只能含有一个task_structure。
 请确保你的分析全面、任务分解合理，并考虑任务之间的依赖关系。
+每个二级任务末尾必须标注依赖的任务编号，如"(依赖: 1.1, 1.2)"；不依赖其他任务的标注"(依赖: 无)"。互不依赖的任务可以同时执行，未标注依赖的任务默认依赖前一个任务。
 只能包含有一级任务和二级任务，且二级任务必须在一级任务下，不可创建三级任务。
 信息优先级：数据源API的权威数据 > 网络搜索 > 模型内部知识
 使用工具操作优先级：工具 > Bash代码 > Python代码
@@ -0,0 +1,412 @@
+"""重试模块，负责LLM请求的重试、退避和超时控制
+
+该模块提供可复用的重试引擎，所有需要重试的操作都应通过该模块进行。
+- 单次请求的超时由传输层（socket读超时 / asyncio取消）负责，不再依赖额外线程
+- 重试间隔采用带抖动的指数退避，429/503响应会遵循服务端的Retry-After
+- 同一个工作流内的所有Agent共享一份重试预算，避免单个故障上游拖垮整个任务
+- 只重试传输层错误、超时和可重试的HTTP状态码，程序错误（如TypeError、解析错误）直接抛出
+- cancel()除了停止重试等待，还会中断正在进行的请求：同步请求通过cancellable登记的回调关闭连接，
+  异步请求直接取消当前尝试的任务
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# 可重试的HTTP状态码（请求超时、限流和服务端错误）
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+# 可重试的异常类型（连接失败、超时、连接中断），其他异常视为程序错误
+RETRYABLE_ERRORS: tuple = (
+    ConnectionError,
+    TimeoutError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+try:
+    import httpx
+
+    RETRYABLE_ERRORS += (httpx.TransportError,)
+except ImportError:
+    pass
+
+# 需要遵循Retry-After的HTTP状态码
+RETRY_AFTER_STATUS = {429, 503}
+
+# acall使用策略中的request_timeout作为单次尝试超时
+_POLICY_TIMEOUT = object()
+
+
+class RetryCancelledError(Exception):
+    """重试被取消"""
+
+
+class RetryBudgetExhaustedError(Exception):
+    """工作流的重试预算已用完"""
+
+
+class RetryBudget:
+    """重试预算，在一个工作流的所有Agent之间共享"""
+
+    def __init__(self, max_retries: Optional[int] = None):
+        """初始化重试预算
+
+        Args:
+            max_retries: 允许的重试总次数，None表示不限制
+        """
+        self.max_retries = max_retries
+        self.used = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RetryBudget":
+        """根据[llm]配置创建重试预算"""
+        return cls(config.get("retry_budget", 20))
+
+    @property
+    def remaining(self) -> Optional[int]:
+        """剩余可用的重试次数"""
+        if self.max_retries is None:
+            return None
+        return max(self.max_retries - self.used, 0)
+
+    def try_acquire(self) -> bool:
+        """申请一次重试
+
+        Returns:
+            是否申请成功
+        """
+        with self._lock:
+            if self.max_retries is not None and self.used >= self.max_retries:
+                return False
+            self.used += 1
+            return True
+
+    def reset(self):
+        """重置预算（每次执行工作流时调用）"""
+        with self._lock:
+            self.used = 0
+
+
+class RetryPolicy:
+    """重试策略"""
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        max_retry_after: float = 120.0,
+        request_timeout: float = 180.0,
+    ):
+        """初始化重试策略
+
+        Args:
+            max_attempts: 最大尝试次数（包含第一次）
+            base_delay: 指数退避的基础等待时间（秒）
+            max_delay: 退避等待时间上限（秒）
+            max_retry_after: 服务端Retry-After的最大遵循时间（秒）
+            request_timeout: 单次请求超时时间（秒）
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.request_timeout = request_timeout
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RetryPolicy":
+        """根据[llm]配置创建重试策略"""
+        return cls(
+            max_attempts=config.get("max_retries", 5),
+            base_delay=config.get("retry_base_delay", 1.0),
+            max_delay=config.get("retry_max_delay", 30.0),
+            max_retry_after=config.get("retry_max_retry_after", 120.0),
+            request_timeout=config.get("read_timeout", 180.0),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """计算第attempt次失败后的退避时间（指数退避 + 抖动）
+
+        Args:
+            attempt: 已失败的次数，从1开始
+
+        Returns:
+            等待秒数
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        # 在[delay/2, delay]之间取随机值，避免多个请求同时重试
+        return random.uniform(delay / 2, delay)
+
+
+def get_status_code(error: BaseException) -> Optional[int]:
+    """从异常中提取HTTP状态码（兼容requests和httpx）"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    return getattr(response, "status_code", None)
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """从429/503响应中解析Retry-After头
+
+    Args:
+        error: 请求异常
+
+    Returns:
+        需要等待的秒数，没有Retry-After时返回None
+    """
+    if get_status_code(error) not in RETRY_AFTER_STATUS:
+        return None
+
+    value = error.response.headers.get("Retry-After")
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    # Retry-After也可以是HTTP日期格式
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        logger.warning(f"无法解析Retry-After: {value}")
+        return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """判断异常是否值得重试（传输层错误、超时，或可重试的HTTP状态码）"""
+    if isinstance(error, (RetryCancelledError, RetryBudgetExhaustedError)):
+        return False
+    status = get_status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return isinstance(error, RETRYABLE_ERRORS)
+
+
+# 当前上下文中正在执行尝试的重试引擎，供cancellable登记中断回调
+_current_engine: ContextVar[Optional["RetryEngine"]] = ContextVar("acc_retry_engine", default=None)
+
+
+@contextmanager
+def cancellable(abort: Callable[[], None]) -> Iterator[None]:
+    """在with块中把abort登记到当前的重试引擎，引擎被cancel()时调用abort中断请求
+
+    abort会在调用cancel()的线程中执行，应能打断阻塞在其他线程中的读取（如关闭底层socket）。
+    不在重试引擎中执行时什么也不做。
+
+    Args:
+        abort: 中断当前请求的回调
+    """
+    engine = _current_engine.get()
+    if engine is None:
+        yield
+        return
+    engine._track(abort)
+    try:
+        yield
+    finally:
+        engine._untrack(abort)
+
+
+class RetryEngine:
+    """重试引擎，同时支持同步函数和协程函数"""
+
+    def __init__(
+        self,
+        name: str = "",
+        policy: Optional[RetryPolicy] = None,
+        budget: Optional[RetryBudget] = None,
+    ):
+        """初始化重试引擎
+
+        Args:
+            name: 名称，用于日志
+            policy: 重试策略，默认使用默认参数
+            budget: 共享的重试预算，默认不限制
+        """
+        self.name = name
+        self.policy = policy or RetryPolicy()
+        self.budget = budget
+        self._cancelled = threading.Event()
+        # 正在进行的请求的中断回调
+        self._aborts = set()
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """取消后续的重试，并中断正在进行的请求"""
+        self._cancelled.set()
+        with self._lock:
+            aborts = list(self._aborts)
+        for abort in aborts:
+            self._abort(abort)
+
+    def _track(self, abort: Callable[[], None]):
+        """登记正在进行的请求，已取消时立即中断"""
+        with self._lock:
+            self._aborts.add(abort)
+        if self.cancelled:
+            self._abort(abort)
+
+    def _untrack(self, abort: Callable[[], None]):
+        """请求结束后移除中断回调"""
+        with self._lock:
+            self._aborts.discard(abort)
+
+    def _abort(self, abort: Callable[[], None]):
+        """调用中断回调，忽略其中的异常"""
+        try:
+            abort()
+        except Exception as e:
+            logger.debug(f"[{self.name}] 中断请求失败: {e}")
+
+    def reset(self):
+        """清除取消状态"""
+        self._cancelled.clear()
+
+    @property
+    def cancelled(self) -> bool:
+        """是否已取消"""
+        return self._cancelled.is_set()
+
+    def _next_delay(self, attempt: int, error: BaseException) -> float:
+        """处理一次失败，返回下一次重试前需要等待的时间
+
+        Args:
+            attempt: 已失败的次数
+            error: 本次失败的异常
+
+        Returns:
+            等待秒数
+
+        Raises:
+            原异常: 不可重试、次数用尽或预算用尽时抛出
+        """
+        if not is_retryable(error):
+            logger.error(f"[{self.name}] 操作失败且不可重试: {error}")
+            raise error
+
+        if attempt >= self.policy.max_attempts:
+            logger.error(f"[{self.name}] 重试 {self.policy.max_attempts} 次后仍然失败")
+            raise error
+
+        if self.budget is not None and not self.budget.try_acquire():
+            logger.error(f"[{self.name}] 工作流重试预算已用完 (共 {self.budget.max_retries} 次)")
+            raise RetryBudgetExhaustedError(f"工作流重试预算已用完: {error}") from error
+
+        delay = self.policy.backoff(attempt)
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.policy.max_retry_after))
+            logger.info(f"[{self.name}] 服务端要求 {retry_after:.1f} 秒后重试")
+
+        logger.warning(
+            f"[{self.name}] 操作失败 (尝试 {attempt}/{self.policy.max_attempts}): {error}，"
+            f"{delay:.1f} 秒后重试..."
+        )
+        return delay
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """同步执行并重试
+
+        单次请求的超时应由func自身的传输层超时控制（如requests的timeout参数）。
+        func中用cancellable登记的请求会在cancel()时被中断。
+
+        Args:
+            func: 要执行的函数
+            *args: 函数参数
+            **kwargs: 函数关键字参数
+
+        Returns:
+            函数执行结果
+        """
+        attempt = 0
+        while True:
+            if self.cancelled:
+                raise RetryCancelledError(f"[{self.name}] 操作已取消")
+
+            attempt += 1
+            token = _current_engine.set(self)
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                # 被cancel()中断的请求会以各种传输层错误结束，统一按取消处理
+                if self.cancelled:
+                    raise RetryCancelledError(f"[{self.name}] 操作已取消") from e
+                delay = self._next_delay(attempt, e)
+            finally:
+                _current_engine.reset(token)
+
+            # 可被cancel()提前唤醒的等待
+            if self._cancelled.wait(delay):
+                raise RetryCancelledError(f"[{self.name}] 操作已取消")
+
+    async def acall(
+        self, func: Callable[..., Any], *args, attempt_timeout: Any = _POLICY_TIMEOUT, **kwargs
+    ) -> Any:
+        """异步执行并重试，func为协程函数
+
+        每次尝试都受request_timeout限制，超时或cancel()会取消正在进行的请求并关闭其连接。
+
+        Args:
+            func: 要执行的协程函数
+            *args: 函数参数
+            attempt_timeout: 单次尝试的总超时，默认为策略的request_timeout，
+                None表示只依赖传输层读超时（用于耗时较长的流式响应）
+            **kwargs: 函数关键字参数
+
+        Returns:
+            协程执行结果
+        """
+        if attempt_timeout is _POLICY_TIMEOUT:
+            attempt_timeout = self.policy.request_timeout
+
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            if self.cancelled:
+                raise RetryCancelledError(f"[{self.name}] 操作已取消")
+
+            attempt += 1
+            # 每次尝试在单独的任务中执行，cancel()可能在其他线程中调用，通过事件循环取消该任务
+            task = asyncio.ensure_future(asyncio.wait_for(func(*args, **kwargs), timeout=attempt_timeout))
+            abort = lambda task=task: loop.call_soon_threadsafe(task.cancel)
+            self._track(abort)
+            try:
+                return await task
+            except asyncio.CancelledError:
+                if self.cancelled and task.cancelled():
+                    raise RetryCancelledError(f"[{self.name}] 操作已取消") from None
+                raise
+            except asyncio.TimeoutError:
+                error = TimeoutError(f"请求超时 (超过 {attempt_timeout} 秒)")
+                delay = self._next_delay(attempt, error)
+            except Exception as e:
+                if self.cancelled:
+                    raise RetryCancelledError(f"[{self.name}] 操作已取消") from e
+                delay = self._next_delay(attempt, e)
+            finally:
+                self._untrack(abort)
+
+            # 分段等待，以便及时响应cancel()
+            deadline = time.monotonic() + delay
+            while not self.cancelled:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(min(remaining, 0.5))
@@ -0,0 +1,93 @@
+"""任务调度模块，按依赖关系调度规划任务
+
+planning.md中的二级任务可以在末尾标注依赖，例如：
+    - [ ] 1.1 搜索A (依赖: 无)
+    - [ ] 1.2 搜索B (依赖: 无)
+    - [ ] 2.1 汇总A和B (依赖: 1.1, 1.2)
+未标注依赖的任务默认依赖列表中的前一个任务，与原来逐个执行的行为一致。
+依赖均已完成的任务即可执行，互不依赖的任务可由工作流并行执行。
+任务及其状态保存在PlanningStore中，调度器只负责选择下一批可执行的任务。
+"""
+
+import logging
+from typing import Dict, List
+
+from ACC.memory.planning_store import (
+    COMPLETED,
+    FAILED,
+    PENDING,
+    RUNNING,
+    PlanningStore,
+    PlanTask,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TaskScheduler:
+    """基于依赖关系的任务调度器（线程安全）"""
+
+    def __init__(self, store: PlanningStore):
+        """初始化调度器
+
+        执行中或失败的任务（上次运行中断时遗留）会重新置为待执行。
+
+        Args:
+            store: 规划任务存储
+        """
+        self.store = store
+        with store.lock:
+            for task in store.tasks:
+                if task.status in (RUNNING, FAILED):
+                    store.set_status(task.number, PENDING, save=False)
+
+    @property
+    def tasks(self) -> Dict[str, PlanTask]:
+        """任务编号到任务的映射"""
+        return {task.number: task for task in self.store.tasks}
+
+    def _is_ready(self, task: PlanTask) -> bool:
+        return task.status == PENDING and all(
+            self.store.status(n) == COMPLETED for n in task.depends_on
+        )
+
+    def take_ready(self, limit: int) -> List[str]:
+        """取出最多limit个可执行的任务并标记为执行中
+
+        Args:
+            limit: 最多取出的任务数
+
+        Returns:
+            任务编号列表，按planning.md中的顺序
+        """
+        taken = []
+        with self.store.lock:
+            for task in self.store.tasks:
+                if len(taken) >= limit:
+                    break
+                if self._is_ready(task):
+                    self.store.set_status(task.number, RUNNING, save=False)
+                    taken.append(task.number)
+        return taken
+
+    def complete(self, number: str):
+        """标记任务已完成"""
+        self.store.set_status(number, COMPLETED)
+
+    def fail(self, number: str, error: str):
+        """标记任务失败"""
+        self.store.set_status(number, FAILED, error=error)
+
+    @property
+    def failed(self) -> List[PlanTask]:
+        """失败的任务"""
+        return [task for task in self.store.tasks if task.status == FAILED]
+
+    @property
+    def pending(self) -> List[PlanTask]:
+        """尚未执行的任务"""
+        return [task for task in self.store.tasks if task.status == PENDING]
+
+    def all_completed(self) -> bool:
+        """是否所有任务都已完成"""
+        return self.store.all_completed()
@@ -13,6 +13,7 @@ from .file_operations.create_file import CreateFileTool
 from .file_operations.create_multiple_files import CreateMultipleFilesTool
 from .read_file import ReadFileTool
 from .list_directory import ListDirectoryTool
+from .search_workspace import SearchWorkspaceTool
 from .file_operations.delete_file import DeleteFileTool
 from .file_operations.delete_multiple_files import DeleteMultipleFilesTool
 from .system_info import SystemInfoTool
@@ -21,6 +22,7 @@ from .image_recognition import ImageRecognitionTool
 from .web_search.search_bing import SearchBingTool
 from .web_search.search_baidu import SearchBaiduTool
 from .web_search.search_google import SearchGoogleTool
+from .web_search.search_web import SearchWebTool
 
 # 导出所有工具类
 __all__ = [
@@ -30,6 +32,7 @@ __all__ = [
     "CreateMultipleFilesTool",
     "ReadFileTool",
     "ListDirectoryTool",
+    "SearchWorkspaceTool",
     "DeleteFileTool",
     "DeleteMultipleFilesTool",
     "SystemInfoTool",
@@ -38,6 +41,7 @@ __all__ = [
     "SearchBingTool",
     "SearchBaiduTool",
     "SearchGoogleTool",
+    "SearchWebTool",
 ]
 
 from .file_operations.create_file import CreateFileTool
@@ -50,6 +54,7 @@ ToolRegistry.register(CreateFileTool())
 ToolRegistry.register(CreateMultipleFilesTool())
 ToolRegistry.register(ReadFileTool())
 ToolRegistry.register(ListDirectoryTool())
+ToolRegistry.register(SearchWorkspaceTool())
 ToolRegistry.register(DeleteFileTool())
 ToolRegistry.register(DeleteMultipleFilesTool())
 ToolRegistry.register(SystemInfoTool())
@@ -58,5 +63,21 @@ ToolRegistry.register(ImageRecognitionTool())
 ToolRegistry.register(SearchBingTool())
 ToolRegistry.register(SearchBaiduTool())
 ToolRegistry.register(SearchGoogleTool())
+ToolRegistry.register(SearchWebTool())
+
+# 按配置在后台预热搜索工具使用的浏览器池和Python内核
+try:
+    from ACC.config import get_python_interpreter_config, get_search_config
+    from .python_kernel import get_kernel_pool
+    from .web_search.browser_pool import get_browser_pool
+
+    if get_search_config().get("browser_prewarm", True):
+        get_browser_pool().warm_in_background()
+    if get_python_interpreter_config().get("prewarm", False):
+        get_kernel_pool().warm_in_background()
+except Exception as e:
+    import logging
+
+    logging.getLogger(__name__).warning(f"预热工具资源失败: {e}")
 
 __all__ = ["BaseTool", "ToolRegistry", "execute_tool", "register_all_tools"]
@@ -0,0 +1,200 @@
+"""后台命令任务模块
+
+execute_command工具以background方式启动的命令在后台运行，调用方拿到任务编号后可以：
+- poll：读取上次读取之后新产生的输出，不等待
+- wait：在期限内等待命令结束
+- cancel：终止命令的整个进程组
+
+任务表按工作流划分：Workflow执行期间通过上下文变量绑定自己的任务表，
+工作流结束时仍在运行的任务会被终止。不在工作流中调用时使用进程全局的任务表。
+"""
+
+import atexit
+import contextvars
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from ACC.tool.command_runner import RunningCommand
+
+logger = logging.getLogger(__name__)
+
+
+class CommandJob:
+    """一个后台运行的命令"""
+
+    def __init__(self, job_id: str, command: str, working_dir: str, running: RunningCommand, encoding: str = "utf-8"):
+        """初始化后台任务
+
+        Args:
+            job_id: 任务编号
+            command: 命令内容
+            working_dir: 执行目录
+            running: 已启动的命令
+            encoding: 输出编码
+        """
+        self.job_id = job_id
+        self.command = command
+        self.working_dir = working_dir
+        self.running = running
+        self.encoding = encoding
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        self.cancelled = False
+        # 增量读取的位置（已产生的字节数）
+        self._stdout_offset = 0
+        self._stderr_offset = 0
+        self._lock = threading.Lock()
+
+    @property
+    def status(self) -> str:
+        """任务状态：running、completed、failed或cancelled"""
+        exit_code = self.running.returncode
+        if exit_code is None:
+            return "running"
+        if self.finished is None:
+            self.finished = time.time()
+        if self.cancelled:
+            return "cancelled"
+        return "completed" if exit_code == 0 else "failed"
+
+    def read_new_output(self) -> Dict[str, str]:
+        """读取上次读取之后新产生的标准输出和标准错误"""
+        with self._lock:
+            stdout, self._stdout_offset = self.running.stdout.read(self._stdout_offset, self.encoding)
+            stderr, self._stderr_offset = self.running.stderr.read(self._stderr_offset, self.encoding)
+        return {"stdout": stdout, "stderr": stderr}
+
+    def snapshot(self, include_output: bool = True) -> Dict[str, Any]:
+        """任务当前状态，include_output为True时附带新产生的输出"""
+        status = self.status
+        info = {
+            "job_id": self.job_id,
+            "job_status": status,
+            "exit_code": self.running.returncode,
+            "command": self.command,
+            "working_dir": self.working_dir,
+            "pid": self.running.pid,
+            "elapsed": round((self.finished or time.time()) - self.started, 2),
+        }
+        if include_output:
+            info.update(self.read_new_output())
+            if self.running.stdout.truncated or self.running.stderr.truncated:
+                info["output_truncated"] = True
+        return info
+
+
+class JobTable:
+    """后台任务表（线程安全）"""
+
+    def __init__(self, name: str = "default"):
+        """初始化任务表
+
+        Args:
+            name: 任务表名称，用于日志
+        """
+        self.name = name
+        self._jobs: Dict[str, CommandJob] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start(self, command: str, working_dir: str, running: RunningCommand, encoding: str = "utf-8") -> CommandJob:
+        """登记一个已启动的命令"""
+        with self._lock:
+            job_id = f"job_{next(self._ids)}"
+            job = CommandJob(job_id, command, working_dir, running, encoding)
+            self._jobs[job_id] = job
+        logger.info(f"后台任务 {job_id} 已启动 (pid: {running.pid}): {command}")
+        return job
+
+    def get(self, job_id: str) -> CommandJob:
+        """获取任务
+
+        Raises:
+            KeyError: 任务不存在
+        """
+        with self._lock:
+            if job_id not in self._jobs:
+                raise KeyError(f"后台任务不存在: {job_id}")
+            return self._jobs[job_id]
+
+    def poll(self, job_id: str) -> Dict[str, Any]:
+        """立即返回任务状态和新产生的输出"""
+        return self.get(job_id).snapshot()
+
+    def wait(self, job_id: str, timeout: float) -> Dict[str, Any]:
+        """等待任务结束，最多等待timeout秒，返回任务状态和新产生的输出"""
+        job = self.get(job_id)
+        job.running.wait(timeout)
+        return job.snapshot()
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        """终止任务，返回任务状态和终止前新产生的输出"""
+        job = self.get(job_id)
+        if job.running.returncode is None:
+            job.cancelled = True
+            logger.info(f"正在终止后台任务 {job_id}: {job.command}")
+            job.running.kill()
+        return job.snapshot()
+
+    def list(self) -> List[Dict[str, Any]]:
+        """所有任务的状态（不含输出）"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.snapshot(include_output=False) for job in jobs]
+
+    def close(self):
+        """终止所有仍在运行的任务并清空任务表"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+            self._jobs.clear()
+        for job in jobs:
+            if job.running.returncode is None:
+                logger.info(f"任务表 {self.name} 关闭，终止后台任务 {job.job_id}: {job.command}")
+                job.cancelled = True
+                job.running.kill()
+
+
+# 不在工作流中调用时使用的全局任务表
+_default_table: Optional[JobTable] = None
+_table_lock = threading.Lock()
+
+# 当前工作流绑定的任务表
+_current_table: contextvars.ContextVar[Optional[JobTable]] = contextvars.ContextVar(
+    "acc_job_table", default=None
+)
+
+
+def get_job_table() -> JobTable:
+    """获取当前上下文的任务表
+
+    Returns:
+        当前工作流的任务表；不在工作流中时返回全局任务表
+    """
+    global _default_table
+
+    table = _current_table.get()
+    if table is not None:
+        return table
+
+    with _table_lock:
+        if _default_table is None:
+            _default_table = JobTable()
+            atexit.register(_default_table.close)
+
+    return _default_table
+
+
+@contextmanager
+def job_table_scope(table: JobTable):
+    """在with块内（包括通过copy_context或asyncio.to_thread派生的线程）绑定任务表，
+    退出时终止其中仍在运行的任务"""
+    token = _current_table.set(table)
+    try:
+        yield table
+    finally:
+        _current_table.reset(token)
+        table.close()
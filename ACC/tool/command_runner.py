@@ -0,0 +1,235 @@
+"""命令进程管理模块
+
+execute_command工具使用的子进程封装：
+- 子进程运行在独立的进程组中，超时或取消时终止整个进程组（包括命令启动的子进程）
+- 标准输出和标准错误由后台线程边产生边读取，不会等到进程结束才一次性读入内存
+- 输出只保留开头和结尾各一部分（总字节数有上限），中间部分被省略，避免超大日志占满内存和提示词
+- 增量读取只返回完整的字符，被读取边界截断的多字节字符留到下一次读取
+"""
+
+import codecs
+import logging
+import os
+import signal
+import subprocess
+import threading
+from typing import List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# 每次从管道读取的字节数
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class BoundedOutput:
+    """有上限的输出缓冲区，保留开头和结尾（线程安全）
+
+    位置均为从输出开头算起的绝对字节偏移，total为已产生的总字节数；
+    closed表示输出已结束，此时末尾不完整的字符也会被解码（以替换字符表示）。
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024):
+        """初始化输出缓冲区
+
+        Args:
+            max_bytes: 保留的最大字节数，开头和结尾各占一半
+        """
+        self.head_limit = max_bytes // 2
+        self.tail_limit = max_bytes - self.head_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def write(self, data: bytes):
+        """追加输出"""
+        with self._lock:
+            self.total += len(data)
+            if len(self.head) < self.head_limit:
+                room = self.head_limit - len(self.head)
+                self.head += data[:room]
+                data = data[room:]
+            if data:
+                self.tail += data
+                if len(self.tail) > self.tail_limit:
+                    del self.tail[: len(self.tail) - self.tail_limit]
+
+    def close(self):
+        """标记输出已结束"""
+        with self._lock:
+            self.closed = True
+
+    @property
+    def truncated(self) -> bool:
+        """是否有被省略的输出"""
+        return self.total > len(self.head) + len(self.tail)
+
+    def getvalue(self, start: int = 0, encoding: str = "utf-8") -> str:
+        """读取从start开始的输出并解码，被省略的部分以标记代替
+
+        Args:
+            start: 起始偏移，用于增量读取（传入上次读取时的total）
+            encoding: 输出编码
+        """
+        return self.read(start, encoding)[0]
+
+    def read(self, start: int = 0, encoding: str = "utf-8") -> Tuple[str, int]:
+        """与getvalue相同，同时返回读取到的结束位置，作为下次增量读取的start
+
+        输出未结束时，末尾不完整的多字节字符不会被解码，返回的结束位置停在该字符之前。
+        """
+        with self._lock:
+            head = bytes(self.head[start:]) if start < len(self.head) else b""
+            tail_start = self.total - len(self.tail)
+            omitted = max(tail_start - max(start, len(self.head)), 0)
+            tail = bytes(self.tail[max(start - tail_start, 0):])
+            end = max(self.total, start)
+            final = self.closed
+
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        if omitted:
+            # 开头部分的结尾和结尾部分的开头都可能截断在字符中间，不完整的字节计入省略的部分
+            text = decoder.decode(head)
+            omitted += len(decoder.getstate()[0])
+            decoder.reset()
+            skip = _continuation_bytes(tail, encoding)
+            omitted += skip
+            text += f"\n...[输出过长，已省略中间 {omitted} 字节]...\n"
+            text += decoder.decode(tail[skip:], final)
+        else:
+            text = decoder.decode(head + tail, final)
+        if not final:
+            end -= len(decoder.getstate()[0])
+        return text, end
+
+
+def _continuation_bytes(data: bytes, encoding: str) -> int:
+    """UTF-8数据开头属于上一个字符的后续字节数（其他编码无法判断，返回0）"""
+    if codecs.lookup(encoding).name != "utf-8":
+        return 0
+    count = 0
+    while count < min(len(data), 3) and data[count] & 0xC0 == 0x80:
+        count += 1
+    return count
+
+
+class RunningCommand:
+    """正在运行的命令"""
+
+    def __init__(
+        self,
+        args: Union[str, List[str]],
+        cwd: str,
+        env: dict,
+        shell: bool = False,
+        max_output_bytes: int = 64 * 1024,
+    ):
+        """启动命令，并在后台读取输出
+
+        Args:
+            args: 命令参数
+            cwd: 工作目录
+            env: 环境变量
+            shell: 是否通过shell执行
+            max_output_bytes: 标准输出和标准错误各自保留的最大字节数
+        """
+        kwargs = {}
+        if os.name == "posix":
+            kwargs["start_new_session"] = True
+        else:
+            kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+
+        self.process = subprocess.Popen(
+            args,
+            shell=shell,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cwd,
+            env=env,
+            **kwargs,
+        )
+        self.stdout = BoundedOutput(max_output_bytes)
+        self.stderr = BoundedOutput(max_output_bytes)
+        self._readers = [
+            threading.Thread(target=self._pump, args=(self.process.stdout, self.stdout), daemon=True),
+            threading.Thread(target=self._pump, args=(self.process.stderr, self.stderr), daemon=True),
+        ]
+        for reader in self._readers:
+            reader.start()
+
+    @staticmethod
+    def _pump(stream, output: BoundedOutput):
+        """持续读取管道直到关闭"""
+        try:
+            while True:
+                chunk = stream.read1(READ_CHUNK_SIZE) if hasattr(stream, "read1") else stream.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                output.write(chunk)
+        except (OSError, ValueError):
+            pass
+        finally:
+            output.close()
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    @property
+    def returncode(self) -> Optional[int]:
+        """退出码，仍在运行时为None"""
+        return self.process.poll()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        """等待命令结束并读完输出
+
+        Returns:
+            退出码，超时时返回None
+        """
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return None
+        self._join_readers(5)
+        return self.process.returncode
+
+    def _join_readers(self, timeout: float):
+        # 命令启动的后台子进程可能继续持有管道，不无限等待
+        for reader in self._readers:
+            reader.join(timeout)
+
+    def kill(self, grace: float = 2.0):
+        """终止整个进程组：先发送SIGTERM，grace秒后仍未退出则发送SIGKILL"""
+        if os.name == "posix":
+            # 使用独立会话启动，进程组号即为进程号
+            try:
+                os.killpg(self.process.pid, signal.SIGTERM)
+                self.process.wait(timeout=grace)
+            except (ProcessLookupError, subprocess.TimeoutExpired):
+                pass
+            # 进程组中的其他进程可能仍在运行
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        else:
+            # Windows下终止进程树
+            subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(self.process.pid)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+
+        if self.process.poll() is None:
+            self.process.kill()
+        try:
+            self.process.wait(timeout=grace)
+        except subprocess.TimeoutExpired:
+            logger.warning(f"无法终止进程: {self.process.pid}")
+        self._join_readers(1)
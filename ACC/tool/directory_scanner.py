@@ -0,0 +1,262 @@
+"""目录扫描模块
+
+list_directory工具使用的目录扫描函数：
+- 基于os.scandir，文件类型直接使用目录项中缓存的信息，只有需要大小和修改时间时才调用stat
+- 支持递归深度、包含/排除的glob模式，以及按.gitignore规则忽略文件
+- 扫描结果排序后按偏移分页，游标即下一页的起始偏移
+"""
+
+import fnmatch
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+IS_WINDOWS = os.name == "nt"
+
+# Windows隐藏文件属性
+FILE_ATTRIBUTE_HIDDEN = 2
+
+SORT_KEYS = ("name", "size", "mtime", "type")
+
+
+def _translate(pattern: str) -> str:
+    """把gitignore的glob模式转换为正则表达式（不含锚定）"""
+    parts, i = [], 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            parts.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i + 1)
+            if end < 0:
+                parts.append(re.escape("["))
+                i += 1
+            else:
+                body = pattern[i + 1:end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append(f"[{body}]")
+                i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(parts)
+
+
+class GitIgnore:
+    """一个.gitignore文件中的规则，路径相对于该文件所在的目录"""
+
+    def __init__(self, lines: Sequence[str]):
+        """解析规则
+
+        Args:
+            lines: .gitignore文件的各行
+        """
+        self.rules: List[Tuple["re.Pattern[str]", bool, bool]] = []
+        for line in lines:
+            line = line.rstrip("\n").rstrip("\r")
+            if not line.endswith("\\ "):
+                line = line.rstrip(" ")
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            # 包含斜杠（末尾的除外）的模式相对于.gitignore所在目录，否则匹配任意层级
+            anchored = "/" in line
+            line = line.lstrip("/")
+            prefix = "^" if anchored else "^(?:.*/)?"
+            try:
+                regex = re.compile(prefix + _translate(line) + "$")
+            except re.error:
+                continue
+            self.rules.append((regex, negate, dir_only))
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["GitIgnore"]:
+        """读取目录中的.gitignore，不存在时返回None"""
+        try:
+            with open(os.path.join(directory, ".gitignore"), encoding="utf-8", errors="replace") as f:
+                ignore = cls(f.readlines())
+        except OSError:
+            return None
+        return ignore if ignore.rules else None
+
+    def match(self, relative_path: str, is_dir: bool) -> Optional[bool]:
+        """判断路径是否被忽略
+
+        Returns:
+            True表示忽略，False表示被!规则重新包含，None表示没有匹配的规则
+        """
+        result = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(relative_path):
+                result = not negate
+        return result
+
+
+class ScanEntry:
+    """扫描到的一个目录项"""
+
+    __slots__ = ("name", "path", "relative_path", "type", "is_hidden", "size", "mtime")
+
+    def __init__(self, entry: os.DirEntry, relative_path: str, with_stat: bool):
+        self.name = entry.name
+        self.path = entry.path
+        self.relative_path = relative_path
+        if entry.is_symlink():
+            self.type = "symlink"
+        elif entry.is_dir():
+            self.type = "directory"
+        else:
+            self.type = "file"
+        self.size: Optional[int] = None
+        self.mtime: Optional[float] = None
+
+        # Windows下stat信息已缓存在目录项中，类Unix系统只在需要时调用stat
+        info = None
+        if with_stat or IS_WINDOWS:
+            try:
+                info = entry.stat(follow_symlinks=False)
+            except OSError:
+                pass
+        if info is not None:
+            self.size = info.st_size if self.type == "file" else None
+            self.mtime = info.st_mtime
+        if IS_WINDOWS:
+            self.is_hidden = bool(info and getattr(info, "st_file_attributes", 0) & FILE_ATTRIBUTE_HIDDEN)
+        else:
+            self.is_hidden = entry.name.startswith(".")
+
+    def to_dict(self, with_stat: bool) -> Dict[str, Any]:
+        result = {
+            "name": self.name,
+            "absolute_path": self.path,
+            "relative_path": self.relative_path,
+            "type": self.type,
+            "is_hidden": self.is_hidden,
+        }
+        if with_stat:
+            if self.size is not None:
+                result["size"] = self.size
+            if self.mtime is not None:
+                result["mtime"] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.mtime))
+        return result
+
+
+def _matches_any(patterns: Sequence[str], name: str, relative_path: str) -> bool:
+    """glob模式匹配文件名或相对路径"""
+    return any(
+        fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(relative_path, pattern) for pattern in patterns
+    )
+
+
+def scan(
+    root: str,
+    depth: int = 1,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    respect_gitignore: bool = True,
+    show_hidden: bool = True,
+    with_stat: bool = True,
+) -> Iterator[ScanEntry]:
+    """扫描目录
+
+    Args:
+        root: 目录路径
+        depth: 递归深度，1表示只列出root中的直接子项，0表示不限制
+        include: 只返回匹配这些glob模式的文件（目录始终会被遍历）
+        exclude: 排除匹配这些glob模式的文件和目录
+        respect_gitignore: 是否按.gitignore规则忽略（同时忽略.git目录）
+        show_hidden: 是否包含隐藏文件
+        with_stat: 是否获取大小和修改时间
+    """
+    # 栈中每项为(目录路径, 相对路径, 层级, 适用的.gitignore列表[(相对于root的目录前缀, 规则)])
+    root_ignores: List[Tuple[str, GitIgnore]] = []
+    if respect_gitignore:
+        ignore = GitIgnore.load(root)
+        if ignore is not None:
+            root_ignores.append(("", ignore))
+    stack = [(root, "", 1, root_ignores)]
+
+    while stack:
+        directory, relative_dir, level, ignores = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                children = list(entries)
+        except OSError as e:
+            logger.debug(f"无法读取目录 {directory}: {e}")
+            continue
+
+        for entry in children:
+            relative_path = f"{relative_dir}{entry.name}"
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                is_dir = False
+
+            if respect_gitignore:
+                if is_dir and entry.name == ".git":
+                    continue
+                ignored = None
+                for prefix, ignore in ignores:
+                    verdict = ignore.match(relative_path[len(prefix):], is_dir)
+                    if verdict is not None:
+                        ignored = verdict
+                if ignored:
+                    continue
+            if exclude and _matches_any(exclude, entry.name, relative_path):
+                continue
+
+            item = ScanEntry(entry, relative_path, with_stat)
+            if item.is_hidden and not show_hidden:
+                continue
+
+            if not include or (not is_dir and _matches_any(include, entry.name, relative_path)):
+                yield item
+
+            if is_dir and (depth <= 0 or level < depth):
+                child_ignores = ignores
+                if respect_gitignore:
+                    ignore = GitIgnore.load(entry.path)
+                    if ignore is not None:
+                        child_ignores = ignores + [(relative_path + "/", ignore)]
+                stack.append((entry.path, relative_path + "/", level + 1, child_ignores))
+
+
+def sort_entries(entries: List[ScanEntry], sort: str = "name", reverse: bool = False) -> List[ScanEntry]:
+    """排序：name按相对路径，type为目录在前，size和mtime缺失的排在最后"""
+    if sort == "size":
+        key = lambda e: (e.size is None, e.size or 0, e.relative_path)
+    elif sort == "mtime":
+        key = lambda e: (e.mtime is None, e.mtime or 0, e.relative_path)
+    elif sort == "type":
+        key = lambda e: (e.type != "directory", e.relative_path.lower())
+    else:
+        key = lambda e: e.relative_path.lower()
+    return sorted(entries, key=key, reverse=reverse)
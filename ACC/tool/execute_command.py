@@ -5,7 +5,6 @@
 """
 
 import os
-import subprocess
 import platform
 import logging
 import shlex
@@ -13,7 +12,10 @@ import locale
 from pathlib import Path  # 添加 Path 导入
 from typing import Dict, Any, Optional
 
+from ACC.config import get_execute_command_config
 from ACC.tool.base import BaseTool
+from ACC.tool.command_jobs import get_job_table
+from ACC.tool.command_runner import RunningCommand
 
 logger = logging.getLogger(__name__)
 
@@ -35,11 +37,18 @@ class ExecuteCommandTool(BaseTool):
             **kwargs: 工具参数，包括：
                 command: 要执行的命令
                 working_dir: 执行目录的绝对路径（新增参数）
-                timeout: 命令执行超时时间（秒），默认30秒
+                timeout: 命令执行超时时间（秒），默认30秒；wait操作时为最长等待时间
+                background: 为True时在后台启动命令并立即返回任务编号job_id
+                action: 后台任务操作，poll（读取新输出）、wait（等待结束）、cancel（终止）或list（列出任务）
+                job_id: poll、wait、cancel操作的任务编号
 
         Returns:
             执行结果字典
         """
+        action = kwargs.get("action")
+        if action:
+            return self._job_action(action, kwargs.get("job_id"), kwargs.get("timeout", 30))
+
         # 从kwargs中提取参数
         command = kwargs.get("command")
         
@@ -89,47 +98,56 @@ class ExecuteCommandTool(BaseTool):
 
             logger.info(f"在目录 {abs_working_dir} 执行命令: {command}")
 
-            process = subprocess.Popen(
-                args,
-                shell=shell,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                cwd=abs_working_dir,
-                env=env,
-                text=True,
-                encoding=encoding,
-                errors="replace",
+            # 边执行边读取输出，只保留开头和结尾
+            max_output_bytes = int(get_execute_command_config().get("max_output_kb", 64) * 1024)
+            running = RunningCommand(
+                args, cwd=abs_working_dir, env=env, shell=shell, max_output_bytes=max_output_bytes
             )
 
+            if kwargs.get("background"):
+                # 后台任务：登记到当前工作流的任务表后立即返回
+                job = get_job_table().start(command, abs_working_dir, running, encoding)
+                result = job.snapshot()
+                result.update(
+                    status="success",
+                    message=f"命令已在后台启动，任务编号 {job.job_id}，可通过action=poll/wait/cancel查看输出或终止",
+                )
+                return result
+
             # 等待命令执行完成，设置超时时间
-            stdout, stderr = process.communicate(timeout=timeout)
-            exit_code = process.returncode
+            exit_code = running.wait(timeout)
+            if exit_code is None:
+                # 超时后终止整个进程组，并返回已产生的输出
+                logger.warning(f"命令执行超时（超过{timeout}秒），正在终止: {command}")
+                running.kill()
+                stderr = running.stderr.getvalue(encoding=encoding)
+                return {
+                    "status": "error",
+                    "message": f"命令执行超时（超过{timeout}秒），已终止命令，以下为超时前的输出",
+                    "exit_code": -1,
+                    "stdout": running.stdout.getvalue(encoding=encoding),
+                    "stderr": (stderr + "\n" if stderr else "") + "Command timed out",
+                    "command": command,
+                    "working_dir": abs_working_dir,  # 返回绝对路径
+                    "timed_out": True,
+                }
 
             # 构建返回结果
             result = {
                 "status": "success" if exit_code == 0 else "error",
                 "message": "命令执行成功" if exit_code == 0 else "命令执行失败",
                 "exit_code": exit_code,
-                "stdout": stdout,
-                "stderr": stderr,
+                "stdout": running.stdout.getvalue(encoding=encoding),
+                "stderr": running.stderr.getvalue(encoding=encoding),
                 "command": command,
             }
+            if running.stdout.truncated or running.stderr.truncated:
+                result["output_truncated"] = True
 
             # 在返回结果中添加工作目录信息
             result["working_dir"] = abs_working_dir
             return result
 
-        except subprocess.TimeoutExpired:
-            # 在超时错误返回中添加目录信息
-            return {
-                "status": "error",
-                "message": f"命令执行超时（超过{timeout}秒）",
-                "exit_code": -1,
-                "stdout": "",
-                "stderr": "Command timed out",
-                "command": command,
-                "working_dir": abs_working_dir,  # 返回绝对路径
-            }
         except Exception as e:
             # 在异常返回中添加目录信息
             return {
@@ -141,3 +159,46 @@ class ExecuteCommandTool(BaseTool):
                 "command": command,
                 "working_dir": abs_working_dir,  # 返回绝对路径
             }
+
+    def _job_action(self, action: str, job_id: Optional[str], timeout: float) -> Dict[str, Any]:
+        """执行后台任务操作
+
+        Args:
+            action: poll、wait、cancel或list
+            job_id: 任务编号
+            timeout: wait操作的最长等待时间（秒）
+
+        Returns:
+            任务状态和新产生的输出
+        """
+        table = get_job_table()
+        if action == "list":
+            jobs = table.list()
+            return {"status": "success", "message": f"共有 {len(jobs)} 个后台任务", "jobs": jobs}
+
+        if action not in ("poll", "wait", "cancel"):
+            return {"status": "error", "message": f"不支持的后台任务操作: {action}"}
+        if not job_id:
+            return {"status": "error", "message": f"{action}操作缺少必要参数: job_id"}
+
+        try:
+            if action == "poll":
+                result = table.poll(job_id)
+            elif action == "wait":
+                result = table.wait(job_id, timeout)
+            else:
+                result = table.cancel(job_id)
+        except KeyError as e:
+            return {"status": "error", "message": str(e.args[0]), "job_id": job_id}
+
+        job_status = result["job_status"]
+        if job_status == "running":
+            message = "任务仍在运行" if action == "poll" else f"等待 {timeout} 秒后任务仍在运行"
+        elif job_status == "cancelled":
+            message = "任务已终止"
+        elif job_status == "completed":
+            message = "任务执行成功"
+        else:
+            message = f"任务执行失败，退出码 {result['exit_code']}"
+        result.update(status="error" if job_status == "failed" else "success", message=message)
+        return result
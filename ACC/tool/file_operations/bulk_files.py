@@ -0,0 +1,367 @@
+"""批量文件操作模块
+
+create_multiple_files和delete_multiple_files工具使用的批量文件引擎：
+- 文件在线程池中并行写入或删除，每个父目录只创建一次
+- 事务模式下，所有文件先写入同目录下的临时文件，全部成功后再依次重命名为目标文件；
+  任意一个文件失败时撤销已完成的操作（恢复被覆盖的文件、删除新建的文件和目录），
+  不会留下写了一半的目录树
+- 事务模式的删除先把文件重命名为临时文件，全部成功后再真正删除，失败时全部改回原名
+"""
+
+import logging
+import os
+import shutil
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ACC import fileio
+
+logger = logging.getLogger(__name__)
+
+# 并行处理文件的线程数
+BULK_WORKERS = 8
+
+IS_WINDOWS = os.name == "nt"
+
+
+def _display(path: Path) -> str:
+    """统一显示格式（使用正斜杠）"""
+    return path.as_posix()
+
+
+def _error(path: Path, message: str, error_type: str) -> Dict[str, Any]:
+    return {
+        "file_path": _display(path),
+        "status": "error",
+        "message": message,
+        "error_type": error_type,
+    }
+
+
+def _os_error(path: Path, e: OSError, action: str) -> Dict[str, Any]:
+    """把OSError转换为单个文件的结果"""
+    if isinstance(e, PermissionError):
+        hint = "请使用管理员权限" if IS_WINDOWS else "请使用sudo"
+        return _error(path, f"权限不足 ({hint}): {e}", "permission_denied")
+    return _error(path, f"{action}失败: {e}", "os_error")
+
+
+def _map(func: Callable, items: List, max_workers: int) -> List:
+    """并行执行，结果与items顺序一致"""
+    if len(items) <= 1 or max_workers <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, len(items)), thread_name_prefix="bulk-file"
+    ) as pool:
+        return list(pool.map(func, items))
+
+
+def _temp_path(path: Path, suffix: str) -> Path:
+    """目标文件所在目录中的临时文件名（同一文件系统，保证重命名是原子的）"""
+    return Path(fileio.temp_path(str(path), suffix))
+
+
+def _discard(path: Path):
+    """删除临时文件，忽略错误"""
+    try:
+        path.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"删除临时文件失败: {path}: {e}")
+
+
+def _make_writable(path: Path):
+    # Windows下处理只读属性
+    if IS_WINDOWS:
+        path.chmod(path.stat().st_mode | stat.S_IWRITE)
+
+
+class BulkFileEngine:
+    """批量文件引擎"""
+
+    def __init__(self, max_workers: int = BULK_WORKERS):
+        """初始化批量文件引擎
+
+        Args:
+            max_workers: 并行处理文件的线程数
+        """
+        self.max_workers = max_workers
+
+    def _make_parents(self, paths: List[Path]) -> Tuple[List[Path], Dict[Path, str]]:
+        """为所有文件创建父目录，每个目录只创建一次
+
+        Returns:
+            新建的目录列表（由浅到深），以及创建失败的目录及其错误信息
+        """
+        created, failed = [], {}
+        for parent in sorted({path.parent for path in paths}, key=lambda p: len(p.parts)):
+            if parent.is_dir():
+                continue
+            missing = [parent, *[p for p in parent.parents if not p.exists()]]
+            try:
+                parent.mkdir(parents=True, exist_ok=True)
+                created.extend(reversed(missing))
+            except OSError as e:
+                failed[parent] = str(e)
+        return created, failed
+
+    @staticmethod
+    def _remove_dirs(dirs: List[Path]):
+        """由深到浅删除新建的空目录"""
+        for directory in reversed(dirs):
+            try:
+                directory.rmdir()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _resolve(raw_paths: List[str]) -> List[Optional[Path]]:
+        """解析路径，无法解析的路径为None"""
+        resolved = []
+        for raw in raw_paths:
+            try:
+                resolved.append(Path(raw).expanduser().resolve() if raw else None)
+            except (OSError, RuntimeError):
+                resolved.append(None)
+        return resolved
+
+    def create_files(self, files: List[Dict[str, Any]], transactional: bool = False) -> Tuple[List[Dict[str, Any]], bool]:
+        """批量创建文件
+
+        Args:
+            files: 文件列表，每项包含path、content和可选的overwrite
+            transactional: 是否使用事务模式
+
+        Returns:
+            (每个文件的结果（与files顺序一致）, 事务模式下是否已回滚)
+        """
+        paths = self._resolve([info.get("path", "") for info in files])
+        results: List[Optional[Dict[str, Any]]] = [None] * len(files)
+        seen = set()
+        pending = []
+        for index, (info, path) in enumerate(zip(files, paths)):
+            if path is None:
+                results[index] = _error(Path(info.get("path", "")), "无效的文件路径", "invalid_path")
+            elif path in seen:
+                results[index] = _error(path, f"文件在列表中重复出现: {_display(path)}", "duplicate_path")
+            elif path.exists() and not info.get("overwrite", False):
+                results[index] = _error(path, f"文件已存在: {_display(path)}", "file_exists")
+            elif path.exists() and not path.is_file():
+                results[index] = _error(path, f"不是文件: {_display(path)}", "not_a_file")
+            else:
+                seen.add(path)
+                pending.append(index)
+
+        if transactional and len(pending) < len(files):
+            # 事务模式下只要有文件无法创建就不做任何修改
+            return self._abort(results, paths, "其他文件无法创建，未做任何修改"), True
+
+        created_dirs, failed_dirs = self._make_parents([paths[i] for i in pending])
+        for index in list(pending):
+            parent = paths[index].parent
+            if parent in failed_dirs:
+                results[index] = _error(paths[index], f"创建目录失败: {failed_dirs[parent]}", "os_error")
+                pending.remove(index)
+
+        if transactional:
+            if failed_dirs:
+                self._remove_dirs(created_dirs)
+                return self._abort(results, paths, "其他文件无法创建，已回滚"), True
+            rolled_back = self._create_transactional(files, paths, pending, results)
+            if rolled_back:
+                self._remove_dirs(created_dirs)
+            return results, rolled_back
+
+        def write(index: int) -> Dict[str, Any]:
+            path = paths[index]
+            try:
+                # 非事务模式不逐个fsync，但每个文件仍是原子替换的
+                fileio.atomic_write(path, files[index].get("content", ""), fsync=False)
+            except OSError as e:
+                return _os_error(path, e, "创建文件")
+            return {"file_path": _display(path), "status": "success", "message": f"文件创建成功: {_display(path)}"}
+
+        for index, result in zip(pending, _map(write, pending, self.max_workers)):
+            results[index] = result
+        logger.info(f"批量创建文件完成，共 {len(files)} 个")
+        return results, False
+
+    def _create_transactional(
+        self,
+        files: List[Dict[str, Any]],
+        paths: List[Path],
+        pending: List[int],
+        results: List[Optional[Dict[str, Any]]],
+    ) -> bool:
+        """先并行写入临时文件，全部成功后再依次重命名，失败时回滚
+
+        Returns:
+            是否已回滚
+        """
+        def stage(index: int) -> Tuple[Optional[Path], Optional[Dict[str, Any]]]:
+            path = paths[index]
+            temp = None
+            try:
+                temp = _temp_path(path, ".tmp")
+                fileio.write_file(temp, files[index].get("content", ""), exclusive=True)
+                if path.exists():
+                    # 覆盖已有文件时保留原来的权限
+                    shutil.copymode(path, temp)
+                return temp, None
+            except OSError as e:
+                if temp is not None:
+                    _discard(temp)
+                return None, _os_error(path, e, "写入临时文件")
+
+        staged = dict(zip(pending, _map(stage, pending, self.max_workers)))
+        failures = {index: error for index, (_, error) in staged.items() if error}
+        temps = {index: temp for index, (temp, _) in staged.items() if temp}
+
+        # 重命名为目标文件，被覆盖的文件先保留一份备份
+        committed: List[Tuple[int, Optional[Path]]] = []
+        if not failures:
+            for index in pending:
+                path = paths[index]
+                backup = None
+                try:
+                    if path.exists():
+                        backup = _temp_path(path, ".bak")
+                        self._backup(path, backup)
+                    fileio.replace(temps[index], path)
+                    del temps[index]
+                    committed.append((index, backup))
+                except OSError as e:
+                    if backup is not None:
+                        _discard(backup)
+                    failures[index] = _os_error(path, e, "重命名临时文件")
+                    break
+
+        if failures:
+            # 回滚：恢复被覆盖的文件，删除新建的文件和剩余的临时文件
+            for index, backup in reversed(committed):
+                try:
+                    if backup is not None:
+                        os.replace(backup, paths[index])
+                    else:
+                        paths[index].unlink(missing_ok=True)
+                except OSError as e:
+                    logger.error(f"回滚文件失败: {_display(paths[index])}: {e}")
+            for temp in temps.values():
+                _discard(temp)
+            logger.warning(f"事务模式批量创建文件失败，已回滚 {len(committed)} 个已写入的文件")
+            for index in pending:
+                results[index] = failures.get(index) or _error(
+                    paths[index], "其他文件创建失败，已回滚", "rolled_back"
+                )
+            return True
+
+        for index, backup in committed:
+            if backup is not None:
+                _discard(backup)
+            results[index] = {
+                "file_path": _display(paths[index]),
+                "status": "success",
+                "message": f"文件创建成功: {_display(paths[index])}",
+            }
+        logger.info(f"事务模式批量创建文件完成，共 {len(pending)} 个")
+        return False
+
+    @staticmethod
+    def _backup(path: Path, backup: Path):
+        """备份将被覆盖的文件：优先使用硬链接，不支持时复制"""
+        try:
+            os.link(path, backup)
+        except OSError:
+            shutil.copy2(path, backup)
+
+    @staticmethod
+    def _abort(results: List[Optional[Dict[str, Any]]], paths: List[Optional[Path]], message: str) -> List[Dict[str, Any]]:
+        """事务中止时，为没有错误的文件填写结果"""
+        return [
+            result or _error(path, message, "rolled_back")
+            for result, path in zip(results, paths)
+        ]
+
+    def delete_files(self, raw_paths: List[str], transactional: bool = False) -> Tuple[List[Dict[str, Any]], bool]:
+        """批量删除文件
+
+        Args:
+            raw_paths: 文件路径列表
+            transactional: 是否使用事务模式
+
+        Returns:
+            (每个文件的结果（与raw_paths顺序一致）, 事务模式下是否已回滚)
+        """
+        paths = self._resolve(raw_paths)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(raw_paths)
+        seen = set()
+        pending = []
+        for index, (raw, path) in enumerate(zip(raw_paths, paths)):
+            if path is None:
+                results[index] = _error(Path(raw or ""), f"路径处理失败: {raw}", "invalid_path")
+            elif path in seen:
+                results[index] = _error(path, f"文件在列表中重复出现: {_display(path)}", "duplicate_path")
+            elif not path.exists():
+                results[index] = _error(path, f"文件不存在: {_display(path)}", "file_not_found")
+            elif not path.is_file():
+                results[index] = _error(path, f"不是文件: {_display(path)}", "not_a_file")
+            else:
+                seen.add(path)
+                pending.append(index)
+
+        if transactional:
+            if len(pending) < len(raw_paths):
+                return self._abort(results, paths, "其他文件无法删除，未做任何修改"), True
+            return self._delete_transactional(paths, pending, results)
+
+        def delete(index: int) -> Dict[str, Any]:
+            path = paths[index]
+            try:
+                _make_writable(path)
+                path.unlink()
+            except OSError as e:
+                return _os_error(path, e, "删除文件")
+            return {"file_path": _display(path), "status": "success", "message": f"文件删除成功: {_display(path)}"}
+
+        for index, result in zip(pending, _map(delete, pending, self.max_workers)):
+            results[index] = result
+        logger.info(f"批量删除文件完成，共 {len(raw_paths)} 个")
+        return results, False
+
+    def _delete_transactional(
+        self, paths: List[Path], pending: List[int], results: List[Optional[Dict[str, Any]]]
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """先把文件重命名为临时文件，全部成功后再删除，失败时全部改回原名"""
+        moved: List[Tuple[int, Path]] = []
+        failure = None
+        for index in pending:
+            path = paths[index]
+            try:
+                _make_writable(path)
+                trash = _temp_path(path, ".del")
+                os.replace(path, trash)
+                moved.append((index, trash))
+            except OSError as e:
+                failure = (index, _os_error(path, e, "删除文件"))
+                break
+
+        if failure is not None:
+            for index, trash in reversed(moved):
+                try:
+                    os.replace(trash, paths[index])
+                except OSError as e:
+                    logger.error(f"回滚文件失败: {_display(paths[index])}: {e}")
+            logger.warning(f"事务模式批量删除文件失败，已恢复 {len(moved)} 个文件")
+            results[failure[0]] = failure[1]
+            return self._abort(results, paths, "其他文件删除失败，已回滚"), True
+
+        _map(lambda item: _discard(item[1]), moved, self.max_workers)
+        for index in pending:
+            results[index] = {
+                "file_path": _display(paths[index]),
+                "status": "success",
+                "message": f"文件删除成功: {_display(paths[index])}",
+            }
+        logger.info(f"事务模式批量删除文件完成，共 {len(pending)} 个")
+        return results, False
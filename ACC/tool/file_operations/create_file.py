@@ -2,6 +2,7 @@ import logging
 from pathlib import Path
 from typing import Dict, Any
 
+from ACC.fileio import atomic_write
 from ACC.tool.base import BaseTool, ToolRegistry
 
 logger = logging.getLogger(__name__)
@@ -34,8 +35,8 @@ class CreateFileTool(BaseTool):
                     "file_path": display_path,
                 }
 
-            # 通用文件写入（已处理编码）
-            path.write_text(content, encoding="utf-8")
+            # 通用文件写入（已处理编码），原子替换
+            atomic_write(path, content)
 
             # Linux权限处理
             if Path('/').exists() and not path.parent.is_dir():  # 检查是否为Unix系统
@@ -1,10 +1,9 @@
 import logging
 import os
-from pathlib import Path
 from typing import Dict, Any, List
 
 from ACC.tool.base import BaseTool, ToolRegistry
-from .create_file import CreateFileTool
+from .bulk_files import BulkFileEngine
 
 logger = logging.getLogger(__name__)
 
@@ -17,39 +16,28 @@ class CreateMultipleFilesTool(BaseTool):
             description="创建多个文本文件（跨平台支持，自动处理路径差异）"
         )
 
-    def execute(self, files: List[Dict[str, str]]) -> Dict[str, Any]:
-        results = []
-        success_count = 0
-        error_count = 0
-
-        for file_info in files:
-            # 从文件信息中获取覆盖标志，默认为False
-            overwrite = file_info.get("overwrite", False)
-            
-            result = CreateFileTool().execute(
-                file_path=file_info.get("path", ""),
-                content=file_info.get("content", ""),
-                overwrite=overwrite
-            )
-            
-            # 使用标准化后的路径
-            normalized_path = result.get("file_path", file_info.get("path"))
-            
-            # 使用 Path 处理路径，确保跨平台兼容性
-            path = Path(normalized_path)
-            display_path = str(path.as_posix())  # 统一使用正斜杠
-            
-            results.append({
-                "file_path": display_path,
-                "status": result.get("status"),
-                "message": result.get("message"),
-                "error_type": result.get("error_type")
-            })
-            
-            if result.get("status") == "success":
-                success_count += 1
-            else:
-                error_count += 1
+    def execute(self, files: List[Dict[str, str]], transactional: bool = False) -> Dict[str, Any]:
+        """批量创建文件
+
+        Args:
+            files: 文件列表，每项包含path、content和可选的overwrite
+            transactional: 为True时要么全部创建成功，要么不做任何修改
+        """
+        # 文件在线程池中并行写入，每个父目录只创建一次
+        results, rolled_back = BulkFileEngine().create_files(files, transactional)
+
+        success_count = sum(1 for result in results if result.get("status") == "success")
+        error_count = len(results) - success_count
+        # 事务回滚时只统计本身出错的文件，不包括被一并回滚的文件
+        failed_count = sum(1 for result in results if result.get("error_type") not in (None, "rolled_back"))
+
+        if rolled_back:
+            return {
+                "status": "error",
+                "message": f"创建失败: {failed_count}个文件无法创建，事务已回滚，未做任何修改",
+                "results": results,
+                "platform": os.name
+            }
 
         return {
             "status": "success" if error_count == 0 else "partial_success",
@@ -59,4 +47,4 @@ class CreateMultipleFilesTool(BaseTool):
         }
 
 # 注册工具
-ToolRegistry.register(CreateMultipleFilesTool())
\ No newline at end of file
+ToolRegistry.register(CreateMultipleFilesTool())
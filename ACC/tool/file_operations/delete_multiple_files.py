@@ -3,7 +3,7 @@ from typing import Dict, Any, List
 from pathlib import Path
 
 from ACC.tool.base import BaseTool, ToolRegistry
-from .delete_file import DeleteFileTool
+from .bulk_files import BulkFileEngine
 
 logger = logging.getLogger(__name__)
 
@@ -16,40 +16,30 @@ class DeleteMultipleFilesTool(BaseTool):
             description="跨平台批量删除文件（支持Windows/Linux路径规范）"
         )
 
-    def execute(self, file_paths: List[str]) -> Dict[str, Any]:
-        results = []
-        success_count = 0
-        error_count = 0
-
-        for raw_path in file_paths:
-            try:
-                # 使用 Path 统一处理路径
-                path = Path(raw_path).expanduser().resolve()
-                
-                # 统一路径显示格式（使用正斜杠）
-                display_path = str(path.as_posix())
-                
-                # 执行删除操作
-                result = DeleteFileTool().execute(str(path))
-                result["file_path"] = display_path  # 返回标准化后的显示路径
-            except Exception as e:
-                result = {
-                    "status": "error",
-                    "message": f"路径处理失败: {str(e)}",
-                    "file_path": raw_path
-                }
-            
-            results.append(result)
-            if result["status"] == "success":
-                success_count += 1
-            else:
-                error_count += 1
+    def execute(self, file_paths: List[str], transactional: bool = False) -> Dict[str, Any]:
+        """批量删除文件
+
+        Args:
+            file_paths: 文件路径列表
+            transactional: 为True时要么全部删除成功，要么不做任何修改
+        """
+        # 文件在线程池中并行删除
+        results, rolled_back = BulkFileEngine().delete_files(file_paths, transactional)
+
+        success_count = sum(1 for result in results if result["status"] == "success")
+        error_count = len(results) - success_count
+        # 事务回滚时只统计本身出错的文件，不包括被一并回滚的文件
+        failed_count = sum(1 for result in results if result.get("error_type") not in (None, "rolled_back"))
 
         return {
-            "status": "completed",
-            "message": f"删除完成: {success_count}成功/{error_count}失败",
+            "status": "error" if rolled_back else "completed",
+            "message": (
+                f"删除失败: {failed_count}个文件无法删除，事务已回滚，未做任何修改"
+                if rolled_back
+                else f"删除完成: {success_count}成功/{error_count}失败"
+            ),
             "results": results,
             "platform": Path().absolute().drive and "nt" or "posix"  # 更准确的平台判断
         }
 
-ToolRegistry.register(DeleteMultipleFilesTool())
\ No newline at end of file
+ToolRegistry.register(DeleteMultipleFilesTool())
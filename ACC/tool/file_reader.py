@@ -0,0 +1,163 @@
+"""文件分段读取模块
+
+read_file工具使用的读取函数，所有函数都直接在字节内容上按需扫描，不把整个文件解码为字符串：
+- 大文件通过内存映射读取，只有实际访问的部分会被读入内存
+- 支持按行号范围、开头/结尾若干行、字节偏移读取，以及按正则表达式过滤行
+- 行号从1开始，以换行符分隔
+"""
+
+import mmap
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple, Union
+
+# 扫描换行符时每次处理的字节数
+SCAN_CHUNK_SIZE = 1024 * 1024
+
+Buffer = Union[bytes, mmap.mmap]
+
+
+@contextmanager
+def open_buffer(path: Path, mmap_threshold: int) -> Iterator[Buffer]:
+    """打开文件内容，大于mmap_threshold字节的文件使用内存映射"""
+    with open(path, "rb") as f:
+        size = path.stat().st_size
+        if size == 0 or size < mmap_threshold:
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def decode(data: bytes) -> str:
+    """按UTF-8解码，与文本模式读取一样把\\r\\n转换为\\n"""
+    return data.decode("utf-8", errors="replace").replace("\r\n", "\n")
+
+
+def _count_newlines(data: Buffer, start: int = 0, end: int = None) -> int:
+    """统计区间内的换行符数量（mmap没有count方法，分块统计）"""
+    end = len(data) if end is None else end
+    total = 0
+    for pos in range(start, end, SCAN_CHUNK_SIZE):
+        total += data[pos:min(pos + SCAN_CHUNK_SIZE, end)].count(b"\n")
+    return total
+
+
+def count_lines(data: Buffer) -> int:
+    """文件的行数（最后一行没有换行符时也计为一行）"""
+    size = len(data)
+    if size == 0:
+        return 0
+    return _count_newlines(data) + (data[size - 1:size] != b"\n")
+
+
+def advance_lines(data: Buffer, pos: int, count: int) -> int:
+    """从pos开始跳过count行，返回下一行的起始位置（不足count行时返回文件末尾）"""
+    size = len(data)
+    while count > 0 and pos < size:
+        chunk = data[pos:pos + SCAN_CHUNK_SIZE]
+        newlines = chunk.count(b"\n")
+        if newlines < count:
+            count -= newlines
+            pos += len(chunk)
+            continue
+        index = -1
+        for _ in range(count):
+            index = chunk.find(b"\n", index + 1)
+        return pos + index + 1
+    return min(pos, size)
+
+
+def tail_start(data: Buffer, count: int) -> int:
+    """最后count行的起始位置"""
+    end = len(data)
+    if end and data[end - 1:end] == b"\n":
+        end -= 1
+    pos = end
+    for _ in range(count):
+        index = data.rfind(b"\n", 0, pos)
+        if index < 0:
+            return 0
+        pos = index
+    return min(pos + 1, len(data))
+
+
+def clip(data: Buffer, start: int, end: int, max_bytes: int) -> int:
+    """限制[start, end)的长度不超过max_bytes，尽量在行尾截断，返回新的end"""
+    if end - start <= max_bytes:
+        return end
+    cut = data.rfind(b"\n", start, start + max_bytes)
+    return cut + 1 if cut >= start else start + max_bytes
+
+
+def lines_in(chunk: bytes) -> int:
+    """一段内容包含的行数"""
+    return chunk.count(b"\n") + (bool(chunk) and not chunk.endswith(b"\n"))
+
+
+def _line_bounds(data: Buffer, pos: int) -> Tuple[int, int]:
+    """pos所在行的起止位置（不含换行符）"""
+    start = data.rfind(b"\n", 0, pos) + 1
+    end = data.find(b"\n", pos)
+    return start, len(data) if end < 0 else end
+
+
+def grep(
+    data: Buffer, pattern: "re.Pattern[bytes]", context: int = 0, max_matches: int = 100
+) -> Tuple[List[Tuple[int, bool, bytes]], int, bool]:
+    """查找匹配正则表达式的行
+
+    Args:
+        data: 文件内容
+        pattern: 已编译的字节串正则表达式
+        context: 每个匹配行前后附带的行数
+        max_matches: 最多返回的匹配行数
+
+    Returns:
+        ([(行号, 是否为匹配行, 行内容)], 匹配行数, 是否还有更多匹配)
+    """
+    lines: Dict[int, Tuple[bool, bytes]] = {}
+    matched = 0
+    line_number, counted_to = 1, 0
+    pos = 0
+    size = len(data)
+
+    while pos <= size:
+        match = pattern.search(data, pos)
+        if match is None:
+            return _sorted_lines(lines), matched, False
+        if matched >= max_matches:
+            return _sorted_lines(lines), matched, True
+
+        start, end = _line_bounds(data, match.start())
+        line_number += _count_newlines(data, counted_to, start)
+        counted_to = start
+        lines[line_number] = (True, data[start:end])
+        matched += 1
+
+        if context:
+            before_end, number = start, line_number
+            for _ in range(context):
+                if before_end == 0:
+                    break
+                before_start = data.rfind(b"\n", 0, before_end - 1) + 1
+                number -= 1
+                lines.setdefault(number, (False, data[before_start:before_end - 1]))
+                before_end = before_start
+            after_start, number = end + 1, line_number
+            for _ in range(context):
+                if after_start >= size:
+                    break
+                _, after_end = _line_bounds(data, after_start)
+                number += 1
+                lines.setdefault(number, (False, data[after_start:after_end]))
+                after_start = after_end + 1
+
+        # 同一行只记录一次，从下一行继续查找
+        pos = end + 1
+    return _sorted_lines(lines), matched, False
+
+
+def _sorted_lines(lines: Dict[int, Tuple[bool, bytes]]) -> List[Tuple[int, bool, bytes]]:
+    return [(number, is_match, text.rstrip(b"\r")) for number, (is_match, text) in sorted(lines.items())]
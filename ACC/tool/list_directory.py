@@ -2,17 +2,36 @@
 
 该模块提供了列出目录内容的工具，允许AI获取目录中的文件和子目录列表。
 所有目录列表操作都应通过该工具进行，以确保安全性和一致性。
+支持递归、glob过滤、.gitignore规则、排序和分页，单次返回的条目数有上限。
 """
 
+import itertools
 import logging
 import os
 from pathlib import Path  # 添加 Path 导入
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Union
 
 from ACC.tool.base import BaseTool, ToolRegistry
+from ACC.tool.directory_scanner import SORT_KEYS, scan, sort_entries
 
 logger = logging.getLogger(__name__)
 
+# 每页默认和最多返回的条目数
+DEFAULT_LIMIT = 200
+MAX_LIMIT = 1000
+
+# 单次扫描最多遍历的条目数，避免不限深度时遍历整个磁盘
+MAX_SCAN_ENTRIES = 100000
+
+
+def _patterns(value: Union[str, List[str], None]) -> List[str]:
+    """glob模式参数可以是字符串（逗号分隔）或列表"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [pattern.strip() for pattern in value if pattern and pattern.strip()]
+
 
 class ListDirectoryTool(BaseTool):
     """列出目录内容工具"""
@@ -23,16 +42,51 @@ class ListDirectoryTool(BaseTool):
             description="列出指定绝对路径的目录内容"
         )
 
-    def execute(self, path: str) -> Dict[str, Any]:
+    def execute(
+        self,
+        path: Optional[str] = None,
+        directory_path: Optional[str] = None,
+        depth: int = 1,
+        include: Union[str, List[str], None] = None,
+        exclude: Union[str, List[str], None] = None,
+        respect_gitignore: bool = True,
+        show_hidden: bool = True,
+        sort: str = "name",
+        reverse: bool = False,
+        limit: int = DEFAULT_LIMIT,
+        cursor: Optional[str] = None,
+        details: bool = True,
+    ) -> Dict[str, Any]:
         """执行列出目录内容操作（支持Windows/Linux）
         
         Args:
-            path: 支持以下格式：
+            path: 支持以下格式（也可以使用directory_path参数）：
                 - Windows绝对路径 (C:\\Users\\user)
                 - Linux绝对路径 (/home/user)
                 - 网络路径 (\\\\server\\share)
                 - 支持 ~ 扩展用户目录
+            depth: 递归深度，1表示只列出直接子项，0表示不限制
+            include: 只列出匹配这些glob模式的文件，如"*.py"
+            exclude: 排除匹配这些glob模式的文件和目录
+            respect_gitignore: 是否按.gitignore规则忽略文件（同时忽略.git目录）
+            show_hidden: 是否列出隐藏文件
+            sort: 排序方式：name、size、mtime或type（目录在前）
+            reverse: 是否倒序
+            limit: 每页返回的条目数
+            cursor: 上一页返回的next_cursor
+            details: 是否返回大小和修改时间
         """
+        path = path or directory_path
+        if not path:
+            return {"status": "error", "message": "缺少必要参数: path", "platform": os.name}
+        if sort not in SORT_KEYS:
+            return {"status": "error", "message": f"不支持的排序方式: {sort}，可选: {', '.join(SORT_KEYS)}", "platform": os.name}
+        try:
+            offset = int(cursor) if cursor else 0
+        except (TypeError, ValueError):
+            return {"status": "error", "message": f"无效的分页游标: {cursor}", "platform": os.name}
+        limit = min(max(int(limit), 1), MAX_LIMIT)
+
         try:
             # 使用 Path 处理路径
             path_obj = Path(path).expanduser().resolve()
@@ -49,39 +103,41 @@ class ListDirectoryTool(BaseTool):
             if os.name != 'nt' and not os.access(path_obj, os.R_OK):
                 return {"status": "error", "message": f"无目录访问权限: {path_obj}"}
 
-            files = []
-            directories = []
-            hidden_files = []
-            hidden_dirs = []
-
-            for item in path_obj.iterdir():
-                # 跨平台隐藏文件判断
-                if os.name == 'nt':
-                    is_hidden = bool(item.stat().st_file_attributes & 2)  # FILE_ATTRIBUTE_HIDDEN
-                else:
-                    is_hidden = item.name.startswith('.')
-                
-                entry = {
-                    "name": item.name,
-                    "absolute_path": str(item),
-                    "is_hidden": is_hidden
-                }
-
-                if item.is_file():
-                    (hidden_files if is_hidden else files).append(entry)
-                elif item.is_dir():
-                    (hidden_dirs if is_hidden else directories).append(entry)
-
-            logger.info(f"列出目录成功: {path_obj}")
-            return {
+            with_stat = details or sort in ("size", "mtime")
+            scanned = scan(
+                str(path_obj),
+                depth=int(depth),
+                include=_patterns(include),
+                exclude=_patterns(exclude),
+                respect_gitignore=respect_gitignore,
+                show_hidden=show_hidden,
+                with_stat=with_stat,
+            )
+            entries = list(itertools.islice(scanned, MAX_SCAN_ENTRIES + 1))
+            scan_truncated = len(entries) > MAX_SCAN_ENTRIES
+            entries = sort_entries(entries[:MAX_SCAN_ENTRIES], sort, reverse)
+
+            page = entries[offset:offset + limit]
+            result = {
                 "status": "success",
                 "path": str(path_obj),
-                "files": files,
-                "directories": directories,
-                "hidden_files": hidden_files,
-                "hidden_directories": hidden_dirs,
+                "total": len(entries),
+                "returned": len(page),
+                "entries": [entry.to_dict(details) for entry in page],
                 "platform": os.name
             }
+            if offset + limit < len(entries):
+                result["next_cursor"] = str(offset + limit)
+                result["message"] = (
+                    f"共 {len(entries)} 项，本页为第 {offset + 1}-{offset + len(page)} 项，"
+                    f"使用cursor=\"{offset + limit}\"获取下一页"
+                )
+            if scan_truncated:
+                result["scan_truncated"] = True
+                result["message"] = f"条目超过 {MAX_SCAN_ENTRIES} 个，只扫描了部分内容，请减小depth或使用include/exclude缩小范围"
+
+            logger.info(f"列出目录成功: {path_obj}")
+            return result
         except Exception as e:
             logger.error(f"目录列表错误: {str(e)}")
             return {
@@ -92,4 +148,4 @@ class ListDirectoryTool(BaseTool):
 
 
 # 注册工具
-ToolRegistry.register(ListDirectoryTool())
\ No newline at end of file
+ToolRegistry.register(ListDirectoryTool())
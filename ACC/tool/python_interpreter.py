@@ -1,27 +1,28 @@
 """Python解释器工具
 
-该模块提供了临时执行Python脚本的工具，允许AI执行Python代码。
-工具会在examples目录下创建临时文件，执行后返回结果，并自动清理。
+该模块提供了执行Python代码的工具，允许AI执行Python代码。
+代码在常驻的Python内核进程中执行（见python_kernel模块），同一命名空间中定义的变量、
+导入的模块和加载的数据在后续调用中仍然可用。
 """
 
+import codecs
+import locale
 import logging
-import os
-import subprocess
-import tempfile
-import uuid
 import re
-import chardet
-import sys
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from chardet.universaldetector import UniversalDetector
 
 from ACC.tool.base import BaseTool
+from ACC.memory.session import current_session
+from ACC.tool.python_kernel import KernelError, get_kernel_pool, reset_session_namespaces, session_namespace
 
 logger = logging.getLogger(__name__)
 
-# 修改路径生成方式，使用Path对象增强跨平台兼容性
-from pathlib import Path
+# 编码检测最多读取的字节数，以及每次送入检测器的字节数
+DETECT_SAMPLE_SIZE = 64 * 1024
+DETECT_CHUNK_SIZE = 4 * 1024
 
-EXAMPLES_DIR = Path(__file__).resolve().parent.parent.parent / "examples"
 
 def add_encoding_handling(code: str) -> str:
     # 统一处理不同平台的路径分隔符
@@ -40,6 +41,65 @@ def add_encoding_handling(code: str) -> str:
     )
     return code
 
+
+def decode_output(byte_data: bytes, total_size: Optional[int] = None) -> str:
+    """解码输出
+
+    内核进程强制使用UTF-8输出，绝大多数情况下直接按UTF-8严格解码即可；
+    只有解码失败时（如子进程输出了其他编码）才用chardet检测编码，且只检测开头的一部分。
+
+    Args:
+        byte_data: 输出内容
+        total_size: 截断前的总字节数，大于len(byte_data)时表示输出被截断
+    """
+    if not byte_data:
+        return ""
+    truncated = total_size is not None and total_size > len(byte_data)
+
+    try:
+        # 截断处可能正好切断一个多字节字符，此时丢弃末尾不完整的字节
+        text = codecs.getincrementaldecoder("utf-8")("strict").decode(byte_data, final=not truncated)
+    except UnicodeDecodeError:
+        encoding = detect_encoding(byte_data)
+        logger.debug(f"输出不是UTF-8编码，按检测到的编码解码: {encoding}")
+        try:
+            text = byte_data.decode(encoding, errors="replace")
+        except LookupError:
+            text = byte_data.decode("utf-8", errors="replace")
+
+    if truncated:
+        text += f"\n...[输出过长，已截断：共 {total_size} 字节，仅显示前 {len(byte_data)} 字节]"
+    return text
+
+
+def detect_encoding(byte_data: bytes) -> str:
+    """检测编码，最多读取DETECT_SAMPLE_SIZE字节，检测器有把握时提前结束"""
+    detector = UniversalDetector()
+    sample = memoryview(byte_data)[:DETECT_SAMPLE_SIZE]
+    for start in range(0, len(sample), DETECT_CHUNK_SIZE):
+        detector.feed(bytes(sample[start:start + DETECT_CHUNK_SIZE]))
+        if detector.done:
+            break
+    detector.close()
+
+    encoding = detector.result.get("encoding")
+    if encoding:
+        logger.debug(f"检测到编码: {encoding}，置信度: {detector.result.get('confidence')}")
+        return encoding
+    # 检测失败时使用系统默认编码
+    return locale.getpreferredencoding(False) or "utf-8"
+
+
+class _SessionNamespaces:
+    """内存会话关闭时清空该会话在内核中的命名空间"""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+
+    def close(self):
+        reset_session_namespaces(self.session_id)
+
+
 class PythonInterpreterTool(BaseTool):
     """Python解释器工具"""
 
@@ -47,130 +107,72 @@ class PythonInterpreterTool(BaseTool):
         """初始化Python解释器工具"""
         super().__init__(
             name="python_interpreter",
-            description="临时执行Python脚本并返回输出结果（脚本将在examples目录下创建并在执行后删除）"
+            description="执行Python代码并返回输出结果，同一命名空间（默认为当前任务）中定义的变量和导入的模块在后续调用中仍然可用；每次执行都以工作空间为当前目录，对当前目录、环境变量和sys.stdout的修改不会保留到下一次执行"
         )
 
-    def execute(self, code: str) -> Dict[str, Any]:
-        """执行Python脚本
+    def execute(self, code: str, namespace: str = "default", reset: bool = False, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """执行Python代码
 
         Args:
             code: Python代码内容
+            namespace: 命名空间，同一命名空间的多次执行共享变量
+            reset: 执行前是否清空命名空间中的变量
+            timeout: 超时时间（秒），默认使用配置中的timeout
 
         Returns:
             执行结果字典，包含输出内容或错误信息
         """
         # 添加编码处理
         processed_code = add_encoding_handling(code)
-        
-        # 生成唯一的临时文件名
-        temp_filename = f"temp_script_{uuid.uuid4().hex}.py"
-        temp_filepath = EXAMPLES_DIR / temp_filename  # 使用Path对象替代os.path.join
-        
-        try:
-            # 跨平台目录创建
-            EXAMPLES_DIR.mkdir(parents=True, exist_ok=True)
-            
-            # 统一使用Path对象进行文件操作
-            with temp_filepath.open("w", encoding="utf-8") as f:
-                f.write(processed_code)
-
-            # 设置环境变量
-            env = os.environ.copy()
-            env["PYTHONIOENCODING"] = "utf-8"
-            
-            # 执行Python脚本（删除重复的run调用）
-            result = subprocess.run(
-                [sys.executable, str(temp_filepath)],
-                capture_output=True,
-                env=env,
-                text=False  # 使用二进制模式，让 chardet 正确检测编码
-            )
-            
-            logger.info(f"临时Python脚本已创建: {temp_filepath}")
-
-            # 执行Python脚本部分
-            import locale
-            import sys
-            
-            # 获取系统默认编码
-            system_encoding = locale.getpreferredencoding()
-            logger.debug(f"系统默认编码: {system_encoding}")
-            
-            # 执行Python脚本，设置适当的编码环境
-            env = os.environ.copy()
-            env["PYTHONIOENCODING"] = "utf-8"
-            
-            result = subprocess.run(
-                [sys.executable, temp_filepath],
-                capture_output=True,
-                env=env
-            )
-
-            # 准备返回结果
-            stdout_bytes = result.stdout
-            stderr_bytes = result.stderr
-            return_code = result.returncode
-
-            # 检测并解码输出
-            def decode_output(byte_data):
-                if not byte_data:
-                    return ""
-                try:
-                    # 使用chardet检测编码
-                    detected = chardet.detect(byte_data)
-                    encoding = detected['encoding'] if detected['encoding'] else 'utf-8'
-                    logger.debug(f"检测到编码: {encoding}，置信度: {detected['confidence']}")
-                    
-                    # 使用检测到的编码解码
-                    return byte_data.decode(encoding)
-                except Exception as e:
-                    logger.error(f"解码输出时出错: {e}")
-                    # 尝试使用系统默认编码
-                    try:
-                        import locale
-                        system_encoding = locale.getpreferredencoding()
-                        logger.debug(f"尝试使用系统默认编码: {system_encoding}")
-                        return byte_data.decode(system_encoding, errors='replace')
-                    except Exception:
-                        # 最后使用替换模式的UTF-8
-                        return byte_data.decode('utf-8', errors='replace')
-
-            # 解码标准输出和错误输出
-            output = decode_output(stdout_bytes)
-            error = decode_output(stderr_bytes)
-
-            if return_code == 0:
-                logger.info("Python脚本执行成功")
-                return {
-                    "status": "success",
-                    "output": output,
-                    "return_code": return_code
-                }
-            else:
-                logger.error(f"Python脚本执行失败: {error}")
-                return {
-                    "status": "error",
-                    "error": error,
-                    "output": output,
-                    "return_code": return_code
-                }
+        pool = get_kernel_pool()
+        # 命名空间按内存会话隔离，会话结束时清空
+        session = current_session()
+        session.resource("python_namespaces", lambda: _SessionNamespaces(session.session_id))
+        scoped_namespace = session_namespace(session.session_id, namespace)
 
+        try:
+            if reset:
+                pool.reset(scoped_namespace)
+            result = pool.execute(processed_code, scoped_namespace, timeout)
+        except KernelError as e:
+            logger.error(f"Python代码执行失败: {e}")
+            return {
+                "status": "error",
+                "error": str(e),
+                "namespace": namespace
+            }
         except Exception as e:
-            logger.exception(f"执行Python脚本时发生错误: {str(e)}")
+            logger.exception(f"执行Python代码时发生错误: {str(e)}")
+            return {
+                "status": "error",
+                "error": str(e),
+                "namespace": namespace
+            }
+
+        # 解码标准输出和错误输出
+        output = decode_output(result["stdout"], result.get("stdout_size"))
+        error = decode_output(result["stderr"], result.get("stderr_size"))
+        return_code = result["return_code"]
+
+        if return_code == 0 and not result.get("timed_out"):
+            logger.info("Python代码执行成功")
+            return {
+                "status": "success",
+                "output": output,
+                "return_code": return_code,
+                "namespace": namespace
+            }
+        else:
+            logger.error(f"Python代码执行失败: {error}")
             return {
                 "status": "error",
-                "error": str(e)
+                "error": error,
+                "output": output,
+                "return_code": return_code,
+                "namespace": namespace
             }
-        finally:
-            # 清理临时文件（统一使用 Path）
-            try:
-                if temp_filepath.exists():
-                    temp_filepath.unlink()
-                    logger.info(f"临时Python脚本已删除: {temp_filepath}")
-            except Exception as e:
-                logger.error(f"删除临时Python脚本时发生错误: {str(e)}")
 
 
 # 注册工具
 from ACC.tool.base import ToolRegistry
-ToolRegistry.register(PythonInterpreterTool())
\ No newline at end of file
+ToolRegistry.register(PythonInterpreterTool())
@@ -0,0 +1,377 @@
+"""Python内核池模块
+
+python_interpreter工具的代码在常驻的内核进程中执行，而不是每次调用都启动新的解释器：
+- 内核进程预先启动，并可预先导入常用模块（如numpy、pandas）
+- 每个命名空间（默认每个任务一个）固定分配给一个内核，同一任务的后续步骤可以复用已加载的数据；
+  命名空间名称带有内存会话ID前缀，不同会话互不影响，任务或会话结束时清空
+- 执行超时时先中断代码，中断无效时重启内核；内核崩溃（如超出内存上限）后自动重启
+- 内核进程的地址空间（RLIMIT_AS，包括只预留未使用的虚拟内存）可用memory_limit_mb限制（仅类Unix系统），默认不限制
+- 每次执行都从工作空间目录开始，执行后恢复当前目录、环境变量和sys.stdout/sys.stderr；
+  同一内核中的命名空间共享sys.modules，对已导入模块的修改会影响该内核上的其他命名空间
+"""
+
+import atexit
+import base64
+import itertools
+import json
+import logging
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ACC.config import get_python_interpreter_config
+from ACC.tool.workspace_index import default_workspace_root
+
+logger = logging.getLogger(__name__)
+
+WORKER_PATH = Path(__file__).resolve().parent / "python_kernel_worker.py"
+
+# 超时后等待代码响应中断的时间（秒）
+INTERRUPT_GRACE = 2.0
+
+
+class KernelError(Exception):
+    """内核执行失败（超时或崩溃），内核已重启"""
+
+
+class PythonKernel:
+    """单个常驻的Python内核进程"""
+
+    def __init__(
+        self,
+        memory_limit_mb: int = 0,
+        preload: Optional[List[str]] = None,
+        max_output_bytes: int = 1024 * 1024,
+        cwd: Optional[str] = None,
+    ):
+        """初始化内核（不会立即启动进程）
+
+        Args:
+            memory_limit_mb: 地址空间上限（MB），0表示不限制
+            preload: 启动时预先导入的模块
+            max_output_bytes: 单次执行捕获的标准输出和标准错误的字节上限
+            cwd: 每次执行开始时的工作目录，None表示使用内核进程启动时的目录
+        """
+        self.options = {
+            "memory_limit_mb": memory_limit_mb,
+            "preload": preload or [],
+            "max_output_bytes": max_output_bytes,
+            "cwd": cwd,
+        }
+        self.lock = threading.Lock()
+        self.namespaces = set()
+        self._process: Optional[subprocess.Popen] = None
+        self._responses: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._ids = itertools.count(1)
+
+    @property
+    def alive(self) -> bool:
+        """内核进程是否在运行"""
+        return self._process is not None and self._process.poll() is None
+
+    def start(self, timeout: float = 60):
+        """启动内核进程并等待其就绪（调用方需持有lock）"""
+        env = os.environ.copy()
+        env["PYTHONIOENCODING"] = "utf-8"
+
+        start = time.monotonic()
+        self._responses = queue.Queue()
+        self._process = subprocess.Popen(
+            [sys.executable, "-u", str(WORKER_PATH), json.dumps(self.options)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            # 独立的进程组，终端的Ctrl+C不会直接中断内核
+            start_new_session=os.name == "posix",
+        )
+        threading.Thread(
+            target=self._read_responses,
+            args=(self._process, self._responses),
+            name="python-kernel-reader",
+            daemon=True,
+        ).start()
+
+        try:
+            ready = self._wait_response(None, timeout)
+        except queue.Empty:
+            ready = None
+        if ready is None:
+            self.stop()
+            raise KernelError("Python内核启动失败")
+        logger.info(f"Python内核已启动 (pid: {ready.get('pid')}，耗时 {time.monotonic() - start:.2f} 秒)")
+
+    @staticmethod
+    def _read_responses(process: subprocess.Popen, responses: queue.Queue):
+        """后台读取内核返回的结果，进程退出时放入None"""
+        for line in process.stdout:
+            try:
+                responses.put(json.loads(line))
+            except json.JSONDecodeError:
+                logger.debug(f"忽略内核的非JSON输出: {line[:200]!r}")
+        responses.put(None)
+
+    def _wait_response(self, request_id: Optional[int], timeout: float) -> Optional[Dict[str, Any]]:
+        """等待指定请求的结果
+
+        Returns:
+            结果字典；内核退出时返回None
+
+        Raises:
+            queue.Empty: 超时
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            response = self._responses.get(timeout=max(deadline - time.monotonic(), 0))
+            # 跳过已超时请求迟到的结果
+            if response is None or response.get("id") == request_id:
+                return response
+
+    def stop(self):
+        """终止内核进程及其启动的子进程，命名空间随之丢失（调用方需持有lock）"""
+        if self._process is not None:
+            if os.name == "posix":
+                # 内核在独立的进程组中运行，终止整个进程组，包括用户代码启动的子进程
+                try:
+                    os.killpg(self._process.pid, signal.SIGKILL)
+                except OSError:
+                    pass
+            elif self._process.poll() is None:
+                self._process.kill()
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                pass
+            for stream in (self._process.stdin, self._process.stdout):
+                try:
+                    stream.close()
+                except Exception:
+                    pass
+        self._process = None
+        self.namespaces.clear()
+
+    def _send(self, request: Dict[str, Any]) -> int:
+        """发送请求，返回请求编号"""
+        request["id"] = next(self._ids)
+        self._process.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+        self._process.stdin.flush()
+        return request["id"]
+
+    def _restart(self, reason: str):
+        """重启内核"""
+        logger.warning(f"{reason}，正在重启Python内核")
+        self.stop()
+        self.start()
+
+    def execute(self, code: str, namespace: str, timeout: float) -> Dict[str, Any]:
+        """在指定命名空间中执行代码
+
+        Args:
+            code: Python代码
+            namespace: 命名空间名称
+            timeout: 超时时间（秒）
+
+        Returns:
+            包含return_code、stdout、stderr（字节）、stdout_size、stderr_size（截断前的字节数）、truncated的字典
+
+        Raises:
+            KernelError: 执行超时或内核崩溃，命名空间已丢失
+        """
+        with self.lock:
+            if not self.alive:
+                self.stop()
+                self.start()
+
+            try:
+                request_id = self._send({"op": "exec", "code": code, "namespace": namespace})
+                self.namespaces.add(namespace)
+                response = self._wait_response(request_id, timeout)
+            except queue.Empty:
+                response = self._interrupt(request_id)
+                if response is None:
+                    self._restart(f"代码执行超过 {timeout} 秒且无法中断")
+                    raise KernelError(f"代码执行超时（{timeout}秒），内核已重启，之前定义的变量已丢失")
+                notice = f"\n代码执行超时（{timeout}秒），已中断\n".encode("utf-8")
+                response["stderr"] = base64.b64encode(base64.b64decode(response["stderr"]) + notice).decode("ascii")
+                response["stderr_size"] = response.get("stderr_size", 0) + len(notice)
+                response["timed_out"] = True
+            except OSError as e:
+                response = None
+                logger.debug(f"向内核发送请求失败: {e}")
+
+            if response is None:
+                self._restart("Python内核意外退出")
+                raise KernelError("Python内核意外退出（可能超出内存上限或调用了os._exit），内核已重启，之前定义的变量已丢失")
+
+        response["stdout"] = base64.b64decode(response["stdout"])
+        response["stderr"] = base64.b64decode(response["stderr"])
+        return response
+
+    def _interrupt(self, request_id: int) -> Optional[Dict[str, Any]]:
+        """超时后发送中断信号，代码响应中断时命名空间得以保留
+
+        Returns:
+            被中断的执行结果；无法中断时返回None
+        """
+        if os.name != "posix" or not self.alive:
+            return None
+        try:
+            self._process.send_signal(signal.SIGINT)
+            return self._wait_response(request_id, INTERRUPT_GRACE)
+        except (queue.Empty, OSError):
+            return None
+
+    def reset(self, namespace: str):
+        """清空命名空间中的变量"""
+        with self.lock:
+            if namespace not in self.namespaces or not self.alive:
+                self.namespaces.discard(namespace)
+                return
+            try:
+                request_id = self._send({"op": "reset", "namespace": namespace})
+                self._wait_response(request_id, INTERRUPT_GRACE)
+            except (queue.Empty, OSError):
+                self._restart("重置命名空间无响应")
+            self.namespaces.discard(namespace)
+
+
+class KernelPool:
+    """Python内核池（线程安全）"""
+
+    def __init__(
+        self,
+        size: int = 2,
+        timeout: float = 300,
+        memory_limit_mb: int = 0,
+        preload: Optional[List[str]] = None,
+        max_output_kb: int = 1024,
+        cwd: Optional[str] = None,
+    ):
+        """初始化内核池
+
+        Args:
+            size: 内核进程数量
+            timeout: 默认的单次执行超时时间（秒）
+            memory_limit_mb: 每个内核的地址空间上限（MB），0表示不限制
+            preload: 启动时预先导入的模块
+            max_output_kb: 单次执行捕获的输出上限（KB）
+            cwd: 每次执行开始时的工作目录
+        """
+        self.timeout = timeout
+        self.kernels = [
+            PythonKernel(memory_limit_mb, preload, max_output_kb * 1024, cwd) for _ in range(max(size, 1))
+        ]
+        self._assignments: Dict[str, PythonKernel] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "KernelPool":
+        """根据[python_interpreter]配置创建内核池"""
+        return cls(
+            size=config.get("kernels", 2),
+            timeout=config.get("timeout", 300),
+            memory_limit_mb=config.get("memory_limit_mb", 0),
+            preload=config.get("preload", []),
+            max_output_kb=config.get("max_output_kb", 1024),
+            cwd=default_workspace_root(),
+        )
+
+    def _kernel_for(self, namespace: str) -> PythonKernel:
+        """获取命名空间所在的内核，新命名空间分配给命名空间最少的内核"""
+        with self._lock:
+            kernel = self._assignments.get(namespace)
+            if kernel is None or namespace not in kernel.namespaces:
+                kernel = min(self.kernels, key=lambda k: len(k.namespaces))
+                self._assignments[namespace] = kernel
+            return kernel
+
+    def execute(self, code: str, namespace: str = "default", timeout: Optional[float] = None) -> Dict[str, Any]:
+        """在命名空间中执行代码，见PythonKernel.execute"""
+        return self._kernel_for(namespace).execute(code, namespace, timeout or self.timeout)
+
+    def reset(self, namespace: str):
+        """清空命名空间中的变量"""
+        with self._lock:
+            kernel = self._assignments.pop(namespace, None)
+        if kernel is not None:
+            kernel.reset(namespace)
+
+    def reset_prefix(self, prefix: str):
+        """清空名称以prefix开头的所有命名空间"""
+        with self._lock:
+            names = [name for name in self._assignments if name.startswith(prefix)]
+        for name in names:
+            self.reset(name)
+
+    def warm(self):
+        """启动所有尚未运行的内核"""
+        for kernel in self.kernels:
+            with kernel.lock:
+                if not kernel.alive:
+                    try:
+                        kernel.start()
+                    except KernelError as e:
+                        logger.error(f"预热Python内核失败: {e}")
+
+    def warm_in_background(self):
+        """在后台线程中启动所有内核"""
+        threading.Thread(target=self.warm, name="python-kernel-warm", daemon=True).start()
+
+    def close(self):
+        """终止所有内核进程"""
+        for kernel in self.kernels:
+            with kernel.lock:
+                kernel.stop()
+
+
+# 全局内核池
+_kernel_pool: Optional[KernelPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_kernel_pool() -> KernelPool:
+    """获取Python内核池实例
+
+    Returns:
+        内核池实例
+    """
+    global _kernel_pool
+
+    with _pool_lock:
+        if _kernel_pool is None:
+            _kernel_pool = KernelPool.from_config(get_python_interpreter_config())
+            atexit.register(_kernel_pool.close)
+
+    return _kernel_pool
+
+
+def task_namespace(task_number: str) -> str:
+    """任务默认使用的命名空间名称"""
+    return f"task_{task_number}"
+
+
+def session_namespace(session_id: str, namespace: str) -> str:
+    """内存会话中的命名空间在内核中的实际名称"""
+    return f"{session_id}/{namespace}"
+
+
+def reset_namespace(name: str):
+    """清空命名空间（内核池尚未创建时不做任何事）
+
+    Args:
+        name: 命名空间在内核中的实际名称，见session_namespace
+    """
+    if _kernel_pool is not None:
+        _kernel_pool.reset(name)
+
+
+def reset_session_namespaces(session_id: str):
+    """清空内存会话的所有命名空间（内核池尚未创建时不做任何事）"""
+    if _kernel_pool is not None:
+        _kernel_pool.reset_prefix(session_namespace(session_id, ""))
@@ -0,0 +1,164 @@
+"""Python内核工作进程
+
+由python_kernel模块以独立进程启动（不导入ACC包），常驻执行python_interpreter工具提交的代码：
+- 通过标准输入接收请求、通过启动时复制的标准输出句柄返回结果，每行一个JSON
+- 每个命名空间（如一个任务）有独立的全局变量字典，同一命名空间的多次执行共享变量
+- 执行期间在文件描述符层面重定向标准输出和标准错误，子进程和C扩展的输出也会被捕获
+- 每次执行前切换到工作目录，执行后恢复sys.stdout/sys.stderr、当前目录和环境变量，
+  避免一次执行的修改影响之后的执行；sys.modules在同一内核的所有命名空间之间共享
+- 启动参数为JSON：memory_limit_mb（地址空间上限）、preload（预先导入的模块）、max_output_bytes、cwd（工作目录）
+"""
+
+import base64
+import json
+import os
+import sys
+import tempfile
+import traceback
+
+# 协议使用的函数的私有引用，用户代码修改json或base64模块后工作进程仍能正常通信
+_dumps = json.dumps
+_loads = json.loads
+_b64encode = base64.b64encode
+
+
+def _apply_memory_limit(limit_mb):
+    """限制进程的地址空间大小（仅支持类Unix系统）"""
+    if not limit_mb:
+        return
+    try:
+        import resource
+
+        limit = int(limit_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+def _read_capped(handle, max_bytes):
+    """读取捕获的输出，超过上限时截断，同时返回输出的总字节数"""
+    size = handle.seek(0, os.SEEK_END)
+    handle.seek(0)
+    return handle.read(max_bytes), size
+
+
+def _flush(stream):
+    """刷新输出流，忽略用户代码替换或关闭的流产生的错误"""
+    try:
+        stream.flush()
+    except Exception:
+        pass
+
+
+def _run(code, namespace, max_bytes, cwd=None):
+    """在命名空间中执行代码并捕获输出"""
+    stdout_stream, stderr_stream = sys.stdout, sys.stderr
+    environ = dict(os.environ)
+    stdout_stream.flush()
+    stderr_stream.flush()
+    if cwd:
+        try:
+            os.chdir(cwd)
+        except OSError:
+            pass
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        saved = os.dup(1), os.dup(2)
+        os.dup2(out.fileno(), 1)
+        os.dup2(err.fileno(), 2)
+        return_code = 0
+        try:
+            exec(compile(code, "<python_interpreter>", "exec"), namespace)
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                return_code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                return_code = 1
+        except BaseException:
+            # 去掉工作进程自身的调用帧，只显示用户代码中的位置
+            error_type, error, tb = sys.exc_info()
+            traceback.print_exception(error_type, error, tb.tb_next)
+            return_code = 1
+        finally:
+            # 用户代码可能替换了sys.stdout/sys.stderr（如用io.TextIOWrapper重新包装），
+            # 先刷新其缓冲区，再恢复为执行前的流
+            _flush(sys.stdout)
+            _flush(sys.stderr)
+            sys.stdout, sys.stderr = stdout_stream, stderr_stream
+            _flush(sys.stdout)
+            _flush(sys.stderr)
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            os.close(saved[0])
+            os.close(saved[1])
+            if dict(os.environ) != environ:
+                os.environ.clear()
+                os.environ.update(environ)
+            if cwd:
+                try:
+                    os.chdir(cwd)
+                except OSError:
+                    pass
+
+        stdout, stdout_size = _read_capped(out, max_bytes)
+        stderr, stderr_size = _read_capped(err, max_bytes)
+
+    return {
+        "return_code": return_code,
+        "stdout": _b64encode(stdout).decode("ascii"),
+        "stderr": _b64encode(stderr).decode("ascii"),
+        "stdout_size": stdout_size,
+        "stderr_size": stderr_size,
+        "truncated": stdout_size > max_bytes or stderr_size > max_bytes,
+    }
+
+
+def main():
+    options = json.loads(sys.argv[1]) if len(sys.argv) > 1 else {}
+    max_bytes = options.get("max_output_bytes", 1024 * 1024)
+    cwd = options.get("cwd")
+    if cwd:
+        os.makedirs(cwd, exist_ok=True)
+        os.chdir(cwd)
+
+    # 协议使用复制出的句柄，原来的0、1、2号描述符留给用户代码
+    requests = os.fdopen(os.dup(0), "r", encoding="utf-8")
+    responses = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+
+    _apply_memory_limit(options.get("memory_limit_mb"))
+    for module in options.get("preload", []):
+        try:
+            __import__(module)
+        except Exception:
+            pass
+
+    namespaces = {}
+    responses.write(_dumps({"ready": True, "pid": os.getpid()}) + "\n")
+
+    while True:
+        try:
+            line = requests.readline()
+            if not line:
+                break
+            request = _loads(line)
+            name = request.get("namespace", "default")
+
+            if request.get("op") == "reset":
+                namespaces.pop(name, None)
+                response = {"reset": True}
+            else:
+                namespace = namespaces.setdefault(name, {"__name__": "__main__", "__builtins__": __builtins__})
+                response = _run(request["code"], namespace, max_bytes, cwd)
+
+            response["id"] = request.get("id")
+            responses.write(_dumps(response) + "\n")
+        except KeyboardInterrupt:
+            # 执行结束后才收到的中断信号，忽略
+            continue
+
+
+if __name__ == "__main__":
+    main()
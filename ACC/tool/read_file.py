@@ -2,13 +2,27 @@
 
 该模块提供了读取文件的工具，允许AI读取文本文件内容。
 所有文件读取操作都应通过该工具进行，以确保安全性和一致性。
+支持按行号范围、开头/结尾若干行、字节偏移读取以及按正则表达式过滤行，
+结果中包含文件大小和总行数，便于分段读取大文件。
 """
 
 import logging
+import re
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
+from ACC.config import get_read_file_config
 from ACC.tool.base import BaseTool, ToolRegistry
+from ACC.tool.file_reader import (
+    advance_lines,
+    clip,
+    count_lines,
+    decode,
+    grep,
+    lines_in,
+    open_buffer,
+    tail_start,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +36,38 @@ class ReadFileTool(BaseTool):
             description="读取指定路径的文本文件内容（支持Windows/Linux路径格式）"
         )
 
-    def execute(self, file_path: str) -> Dict[str, Any]:
+    def execute(
+        self,
+        file_path: str,
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        head: Optional[int] = None,
+        tail: Optional[int] = None,
+        offset: Optional[int] = None,
+        length: Optional[int] = None,
+        pattern: Optional[str] = None,
+        ignore_case: bool = False,
+        context: int = 0,
+        max_matches: int = 100,
+    ) -> Dict[str, Any]:
+        """读取文件
+
+        Args:
+            file_path: 文件路径
+            start_line: 起始行号（从1开始）
+            end_line: 结束行号（包含）
+            head: 只读取开头的行数
+            tail: 只读取结尾的行数
+            offset: 按字节读取时的起始偏移
+            length: 按字节读取的字节数
+            pattern: 只返回匹配该正则表达式的行（带行号）
+            ignore_case: pattern是否忽略大小写
+            context: 每个匹配行前后附带的行数
+            max_matches: 最多返回的匹配行数
+
+        Returns:
+            读取结果字典，包含内容、文件大小（file_size）和总行数（line_count）
+        """
         try:
             # 使用Path处理路径
             path = Path(file_path).expanduser().resolve()
@@ -45,15 +90,32 @@ class ReadFileTool(BaseTool):
                     "message": f"无文件读取权限 ({'请使用sudo' if Path('/').exists() else '请检查权限'}): {display_path}"
                 }
 
-            # 读取文件
-            content = path.read_text(encoding="utf-8")
+            config = get_read_file_config()
+            max_bytes = int(config.get("max_output_kb", 256) * 1024)
+            mmap_threshold = int(config.get("mmap_threshold_mb", 4) * 1024 * 1024)
+
+            if pattern:
+                try:
+                    regex = re.compile(pattern.encode("utf-8"), re.MULTILINE | (re.IGNORECASE if ignore_case else 0))
+                except re.error as e:
+                    return {"status": "error", "message": f"无效的正则表达式: {e}"}
+
+            with open_buffer(path, mmap_threshold) as data:
+                result = {
+                    "status": "success",
+                    "message": f"文件读取成功: {display_path}",
+                    "file_size": len(data),
+                    "line_count": count_lines(data),
+                }
+                if pattern:
+                    result.update(self._grep(data, regex, context, max_matches, max_bytes))
+                elif offset is not None or length is not None:
+                    result.update(self._read_bytes(data, offset or 0, length, max_bytes))
+                else:
+                    result.update(self._read_lines(data, result["line_count"], start_line, end_line, head, tail, max_bytes))
 
             logger.info(f"读取文件成功: {display_path}")
-            return {
-                "status": "success",
-                "message": f"文件读取成功: {display_path}",
-                "content": content
-            }
+            return result
         except PermissionError as e:
             error_msg = f"权限不足 ({'请使用管理员权限' if not Path('/').exists() else '请使用sudo'}): {display_path}"
             logger.error(error_msg)
@@ -62,6 +124,71 @@ class ReadFileTool(BaseTool):
             logger.error(f"读取文件失败: {e}")
             return {"status": "error", "message": f"读取文件失败: {str(e)}"}
 
+    @staticmethod
+    def _read_lines(data, line_count: int, start_line, end_line, head, tail, max_bytes: int) -> Dict[str, Any]:
+        """按行读取，默认读取整个文件"""
+        if tail is not None:
+            start_line = max(line_count - max(int(tail), 0) + 1, 1)
+            start = tail_start(data, max(int(tail), 0))
+            end_line = line_count
+        else:
+            start_line = max(int(start_line or 1), 1)
+            start = advance_lines(data, 0, start_line - 1)
+            if head is not None:
+                end_line = start_line + max(int(head), 0) - 1
+        end = len(data) if end_line is None else advance_lines(data, start, int(end_line) - start_line + 1)
+
+        clipped = clip(data, start, end, max_bytes)
+        chunk = data[start:clipped]
+        returned = lines_in(chunk)
+        result = {
+            "content": decode(chunk),
+            "start_line": start_line,
+            "end_line": start_line + returned - 1,
+        }
+        if clipped < end:
+            result["truncated"] = True
+            result["message"] = f"内容超过 {max_bytes // 1024} KB，已截断，可从第 {start_line + returned} 行继续读取"
+        if start_line + returned <= line_count:
+            result["next_start_line"] = start_line + returned
+        return result
+
+    @staticmethod
+    def _read_bytes(data, offset: int, length: Optional[int], max_bytes: int) -> Dict[str, Any]:
+        """按字节偏移读取"""
+        offset = min(max(int(offset), 0), len(data))
+        end = len(data) if length is None else min(offset + max(int(length), 0), len(data))
+        clipped = min(end, offset + max_bytes)
+        result = {
+            "content": decode(data[offset:clipped]),
+            "offset": offset,
+            "next_offset": clipped,
+        }
+        if clipped < end:
+            result["truncated"] = True
+        return result
+
+    @staticmethod
+    def _grep(data, regex, context: int, max_matches: int, max_bytes: int) -> Dict[str, Any]:
+        """返回匹配的行，格式与grep -n相同：匹配行为"行号:内容"，上下文行为"行号-内容" """
+        lines, match_count, more = grep(data, regex, max(int(context), 0), max(int(max_matches), 1))
+        output, size = [], 0
+        for number, is_match, text in lines:
+            line = f"{number}{':' if is_match else '-'}{decode(text)}"
+            size += len(line) + 1
+            if size > max_bytes:
+                more = True
+                break
+            output.append(line)
+        result = {
+            "content": "\n".join(output),
+            "match_count": match_count,
+            "message": f"找到 {match_count} 个匹配行" + ("（还有更多匹配未显示）" if more else ""),
+        }
+        if more:
+            result["truncated"] = True
+        return result
+
 
 # 注册工具
-ToolRegistry.register(ReadFileTool())
\ No newline at end of file
+ToolRegistry.register(ReadFileTool())
@@ -0,0 +1,104 @@
+"""工作空间搜索工具
+
+该模块提供了在工作空间中查找文件的工具，按文件名、glob模式或文件内容查找。
+查询使用常驻内存的文件索引（见workspace_index模块），不需要每次遍历目录，
+可以代替反复调用list_directory、read_file或find/grep命令来定位文件。
+"""
+
+import logging
+import re
+from typing import Dict, Any, Optional
+
+from ACC.tool.base import BaseTool, ToolRegistry
+from ACC.tool.workspace_index import resolve_search_path
+
+logger = logging.getLogger(__name__)
+
+SEARCH_MODES = ("name", "glob", "content")
+
+
+class SearchWorkspaceTool(BaseTool):
+    """工作空间搜索工具"""
+
+    def __init__(self):
+        super().__init__(
+            name="search_workspace",
+            description="在工作空间（或其中的指定目录）中按文件名、glob模式或文件内容快速查找文件"
+        )
+
+    def execute(
+        self,
+        query: str,
+        mode: str = "name",
+        path: Optional[str] = None,
+        limit: int = 50,
+        case_sensitive: bool = False,
+        regex: bool = False,
+        glob: Optional[str] = None,
+        refresh: bool = False,
+    ) -> Dict[str, Any]:
+        """查找文件
+
+        Args:
+            query: 文件名（mode=name）、glob模式（mode=glob）或要查找的文本（mode=content）
+            mode: 查找方式：name、glob或content
+            path: 工作空间中要搜索的目录，默认为整个工作空间
+            limit: 最多返回的文件数（content模式为匹配行数）
+            case_sensitive: content模式是否区分大小写
+            regex: content模式下query是否为正则表达式
+            glob: content模式只搜索匹配该glob模式的文件
+            refresh: 是否在查询前强制检查文件变化
+
+        Returns:
+            查找结果字典
+        """
+        if not query:
+            return {"status": "error", "message": "缺少必要参数: query"}
+        if mode not in SEARCH_MODES:
+            return {"status": "error", "message": f"不支持的查找方式: {mode}，可选: {', '.join(SEARCH_MODES)}"}
+        limit = max(int(limit), 1)
+
+        try:
+            try:
+                index, prefix = resolve_search_path(path)
+            except ValueError as e:
+                return {"status": "error", "message": str(e)}
+            if refresh:
+                index.refresh(force=True)
+
+            if mode == "name":
+                result = index.find_name(query, limit, prefix)
+            elif mode == "glob":
+                result = index.find_glob(query, limit, prefix)
+            else:
+                try:
+                    result = index.search_content(query, limit, case_sensitive, regex, glob, prefix)
+                except re.error as e:
+                    return {"status": "error", "message": f"无效的正则表达式: {e}"}
+
+            if mode == "content":
+                message = f"在 {result['files_matched']} 个文件中找到匹配，返回 {len(result['matches'])} 行"
+                if result["unindexed"]:
+                    message += f"（其中 {result['unindexed']} 个未建立内容索引的文件已直接扫描）"
+                if result["skipped"]:
+                    message += f"，{result['skipped']} 个文件无法读取已跳过"
+            else:
+                message = f"找到 {result['total']} 个文件" + (
+                    f"，只返回前 {limit} 个" if result["total"] > limit else ""
+                )
+
+            logger.info(f"工作空间搜索完成 ({mode}): {query}")
+            return {
+                "status": "success",
+                "message": message,
+                "root": index.root,
+                **result,
+                "index": index.summary(),
+            }
+        except Exception as e:
+            logger.error(f"工作空间搜索失败: {e}")
+            return {"status": "error", "message": f"工作空间搜索失败: {str(e)}"}
+
+
+# 注册工具
+ToolRegistry.register(SearchWorkspaceTool())
@@ -0,0 +1,294 @@
+"""搜索工具基础类
+
+Bing、百度、谷歌搜索工具的流程相同，只有页面地址和元素选择器不同。
+该模块提供公共的搜索流程：
+- 优先直接请求搜索结果页并解析HTML（需要安装selectolax或lxml）
+- 请求被拦截、出现验证码或解析不到结果时，改用浏览器池中的浏览器搜索
+- 搜索结果对应的网页内容在归还浏览器后并发获取
+返回结果中的backend字段记录实际使用的方式（http或browser）；启用搜索缓存时，
+相同的搜索直接使用缓存的结果，cache字段记录本次搜索的缓存命中情况。
+"""
+
+import logging
+import re
+import traceback
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, quote_plus, urljoin, urlparse
+
+import requests
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from ACC.config import get_search_config
+from ACC.tool.base import BaseTool
+from ACC.tool.web_search import html_parser
+from ACC.tool.web_search.browser_pool import get_browser_pool, wait_for_page_ready
+from ACC.tool.web_search.page_fetcher import get_page_fetcher
+from ACC.tool.web_search.search_cache import get_search_cache
+
+logger = logging.getLogger(__name__)
+
+# 搜索引擎拦截请求时页面中常见的文本
+BLOCKED_PATTERN = re.compile(
+    r"captcha|unusual traffic|/sorry/|百度安全验证|安全验证|请输入验证码", re.IGNORECASE
+)
+
+
+class SearchEngineTool(BaseTool):
+    """基于浏览器的搜索工具基础类
+
+    子类需要设置以下类属性：
+        engine_name: 搜索引擎名称，用于日志和返回消息
+        home_url: 搜索首页地址
+        search_url: 搜索结果页地址模板，{query}为编码后的搜索内容
+        search_box: 搜索框定位方式，(By, 值)
+        results_container: 搜索结果容器定位方式，(By, 值)
+        result_selectors: 搜索结果条目的CSS选择器，按顺序尝试
+        title_selector: 标题元素的CSS选择器
+        link_selector: 链接元素的CSS选择器，为None时使用标题元素的链接
+        description_selectors: 描述元素的CSS选择器，按顺序尝试
+    """
+
+    engine_name = ""
+    home_url = ""
+    search_url = ""
+    search_box: Tuple[str, str] = (By.NAME, "q")
+    results_container: Tuple[str, str] = (By.TAG_NAME, "body")
+    result_selectors: List[str] = []
+    title_selector = "h3"
+    link_selector: Optional[str] = None
+    description_selectors: List[str] = []
+
+    def _submit_query(self, driver, query: str, timeout: int):
+        """在搜索首页输入并提交搜索内容，等待搜索结果出现"""
+        logger.info(f"正在访问{self.engine_name}搜索页面，搜索内容: {query}")
+        driver.get(self.home_url)
+
+        # 等待搜索框可用
+        search_box = WebDriverWait(driver, timeout).until(
+            EC.element_to_be_clickable(self.search_box)
+        )
+
+        # 清空搜索框并输入搜索内容
+        search_box.clear()
+        search_box.send_keys(query)
+
+        # 提交搜索
+        search_box.send_keys(Keys.RETURN)
+
+        # 等待搜索结果加载
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located(self.results_container)
+        )
+        wait_for_page_ready(driver, timeout)
+
+    def _find_result_elements(self, driver) -> list:
+        """按顺序尝试结果选择器，返回第一个有结果的选择器找到的元素"""
+        for selector in self.result_selectors:
+            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            if elements:
+                return elements
+        return []
+
+    def _extract_result(self, element) -> Dict[str, str]:
+        """从搜索结果条目中提取标题、链接和描述"""
+        title_element = element.find_element(By.CSS_SELECTOR, self.title_selector)
+        title = title_element.text
+
+        if self.link_selector:
+            url = element.find_element(By.CSS_SELECTOR, self.link_selector).get_attribute("href")
+        else:
+            url = title_element.get_attribute("href")
+
+        description = "无描述"
+        for selector in self.description_selectors:
+            found = element.find_elements(By.CSS_SELECTOR, selector)
+            if found:
+                description = found[0].text
+                break
+
+        return {"title": title, "url": url, "description": description}
+
+    def _clean_url(self, url: str) -> str:
+        """补全相对链接，并还原搜索引擎包装的跳转链接（如谷歌的/url?q=）"""
+        url = urljoin(self.home_url, url)
+        parsed = urlparse(url)
+        if parsed.netloc == urlparse(self.home_url).netloc and parsed.path == "/url":
+            target = parse_qs(parsed.query).get("q")
+            if target:
+                return target[0]
+        return url
+
+    def _parse_results(self, document, max_results: int) -> List[Dict[str, str]]:
+        """从HTTP获取的搜索结果页中提取搜索结果"""
+        elements = []
+        for selector in self.result_selectors:
+            elements = document.select(selector)
+            if elements:
+                break
+
+        search_results = []
+        for element in elements:
+            if len(search_results) >= max_results:
+                break
+            title_element = element.select_one(self.title_selector)
+            if title_element is None:
+                continue
+            link_element = element.select_one(self.link_selector) if self.link_selector else title_element
+            url = link_element.attr("href") if link_element is not None else None
+            if not url:
+                continue
+
+            description = "无描述"
+            for selector in self.description_selectors:
+                found = element.select_one(selector)
+                if found is not None:
+                    description = found.text
+                    break
+
+            search_results.append({
+                "title": title_element.text,
+                "url": self._clean_url(url),
+                "description": description,
+            })
+        return search_results
+
+    def _search_with_http(self, query: str, max_results: int, timeout: int) -> Optional[Tuple[List[Dict[str, str]], str, str]]:
+        """直接请求搜索结果页并解析
+
+        Returns:
+            (搜索结果, 页面标题, 页面URL)；被拦截或解析不到结果时返回None
+        """
+        url = self.search_url.format(query=quote_plus(query))
+        try:
+            response = get_page_fetcher().session.get(url, timeout=timeout)
+        except requests.RequestException as e:
+            logger.info(f"HTTP请求{self.engine_name}搜索结果页失败，改用浏览器: {e}")
+            return None
+
+        if response.status_code != 200 or BLOCKED_PATTERN.search(response.url + response.text[:5000]):
+            logger.info(f"{self.engine_name}拦截了HTTP请求（状态码 {response.status_code}），改用浏览器")
+            return None
+
+        document = html_parser.parse(response.text)
+        search_results = self._parse_results(document, max_results)
+        if not search_results:
+            logger.info(f"未能从{self.engine_name}搜索结果页解析出结果（可能需要JavaScript渲染），改用浏览器")
+            return None
+
+        title_element = document.select_one("title")
+        page_title = title_element.text if title_element is not None else ""
+        return search_results, page_title, response.url
+
+    def _search_with_browser(self, query: str, max_results: int, timeout: int) -> Tuple[List[Dict[str, str]], str, str]:
+        """使用浏览器池中的浏览器搜索
+
+        Returns:
+            (搜索结果, 页面标题, 页面URL)
+        """
+        with get_browser_pool().driver(timeout=timeout) as driver:
+            self._submit_query(driver, query, timeout)
+
+            # 先提取全部搜索结果的标题和链接，网页内容稍后获取
+            search_results = []
+            for element in self._find_result_elements(driver)[:max_results]:
+                try:
+                    search_results.append(self._extract_result(element))
+                except Exception as e:
+                    logger.warning(f"提取搜索结果时出错: {e}")
+
+            # 获取页面标题和URL
+            return search_results, driver.title, driver.current_url
+
+    def execute(self, query: str, max_results: int = 5, timeout: int = 30, fetch_content: bool = True) -> Dict[str, Any]:
+        """执行搜索操作"""
+        try:
+            cache = get_search_cache()
+            cached = cache.get_results(self.name, query, max_results) if cache else None
+            if cached is not None:
+                logger.info(f"使用缓存的{self.engine_name}搜索结果: {query}")
+                search_results, page_title, page_url = cached["results"], cached["page_title"], cached["page_url"]
+                backend = cached["backend"]
+            else:
+                found = None
+                if self.search_url and html_parser.available() and get_search_config().get("http_first", True):
+                    found = self._search_with_http(query, max_results, timeout)
+
+                if found is not None:
+                    backend = "http"
+                else:
+                    backend = "browser"
+                    found = self._search_with_browser(query, max_results, timeout)
+                search_results, page_title, page_url = found
+
+                if cache and search_results:
+                    cache.put_results(self.name, query, max_results, {
+                        "results": search_results,
+                        "page_title": page_title,
+                        "page_url": page_url,
+                        "backend": backend,
+                    })
+
+            # 浏览器已归还，需要浏览器渲染的网页可以使用它
+            contents = {}
+            page_stats: Dict[str, int] = {}
+            if fetch_content:
+                contents = get_page_fetcher().fetch_many(
+                    [result["url"] for result in search_results], deadline=timeout, stats=page_stats
+                )
+            for result in search_results:
+                result["page_content"] = contents.get(result["url"], "未获取网页内容")
+
+            logger.info(f"成功获取{self.engine_name}搜索结果，共{len(search_results)}条 (方式: {backend})")
+
+            tool_result = {
+                "status": "success",
+                "message": f"成功获取{self.engine_name}搜索结果，共{len(search_results)}条",
+                "query": query,
+                "page_title": page_title,
+                "page_url": page_url,
+                "results": search_results,
+                "backend": backend,
+            }
+            if cache:
+                tool_result["cache"] = {
+                    "query_hit": cached is not None,
+                    "page_hits": page_stats.get("hits", 0),
+                    "page_revalidated": page_stats.get("revalidated", 0),
+                    "page_misses": page_stats.get("misses", 0),
+                }
+            return tool_result
+
+        except TimeoutException:
+            logger.error(f"等待页面元素超时")
+            return {
+                "status": "error",
+                "message": "等待页面元素超时，请检查网络连接或增加超时时间",
+                "query": query,
+            }
+        except TimeoutError as e:
+            logger.error(f"获取浏览器超时: {e}")
+            return {
+                "status": "error",
+                "message": f"当前没有空闲的浏览器，请稍后重试: {str(e)}",
+                "query": query,
+            }
+        except WebDriverException as e:
+            logger.error(f"WebDriver错误: {e}")
+            return {
+                "status": "error",
+                "message": f"WebDriver错误: {str(e)}",
+                "query": query,
+            }
+        except Exception as e:
+            logger.error(f"执行{self.engine_name}搜索时发生错误: {e}")
+            logger.debug(f"异常堆栈: {traceback.format_exc()}")
+            return {
+                "status": "error",
+                "message": f"执行{self.engine_name}搜索失败: {str(e)}",
+                "query": query,
+            }
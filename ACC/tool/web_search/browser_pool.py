@@ -0,0 +1,303 @@
+"""浏览器池模块
+
+搜索工具共用一组预先启动的无头Chrome，避免每次搜索都冷启动浏览器：
+- 池中最多保持size个浏览器，取用时检查健康状态，异常的浏览器会被替换
+- 每个浏览器使用max_uses次后回收重建，避免长期运行导致内存增长
+- 不指定调试端口，由chromedriver为每个浏览器分配DevTools连接，并发启动不会冲突
+- 提供基于document.readyState的等待函数，替代固定的time.sleep
+"""
+
+import atexit
+import logging
+import os
+import platform
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support.ui import WebDriverWait
+
+from ACC.config import get_search_config
+
+logger = logging.getLogger(__name__)
+
+
+def get_chromedriver_path() -> str:
+    """获取当前平台的ChromeDriver路径"""
+    base_dir = Path(__file__).parent
+
+    if platform.system() == "Windows":
+        chromedriver_path = base_dir / "chromedriver" / "chromedriver-win64" / "chromedriver.exe"
+    else:  # Linux或其他系统
+        chromedriver_path = base_dir / "chromedriver" / "chromedriver-linux64" / "chromedriver"
+
+    logger.debug(f"ChromeDriver路径: {chromedriver_path}")
+    return str(chromedriver_path)  # 返回字符串路径，因为 Service 需要字符串
+
+
+def create_chrome_driver() -> webdriver.Chrome:
+    """启动一个新的Chrome浏览器
+
+    Returns:
+        WebDriver实例
+    """
+    # 设置跨平台Chrome选项
+    chrome_options = Options()
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--no-sandbox")  # 所有系统都需要
+    chrome_options.add_argument("--disable-dev-shm-usage")  # Linux专用
+    # 页面加载到DOM可用即返回，后续按需等待readyState
+    chrome_options.page_load_strategy = "eager"
+
+    # 根据系统设置不同参数
+    if platform.system() == "Linux":
+        chrome_options.add_argument("--headless=new")  # Linux无头模式
+        chrome_options.add_argument("--disable-gpu")
+    else:
+        chrome_options.add_argument("--disable-gpu")
+
+    chromedriver_path = get_chromedriver_path()
+
+    # Linux系统检查执行权限
+    if platform.system() == "Linux":
+        chromedriver = Path(chromedriver_path)
+        if chromedriver.exists() and not os.access(chromedriver, os.X_OK):
+            logger.warning("检测到Linux系统，正在尝试添加ChromeDriver执行权限")
+            chromedriver.chmod(0o755)
+
+    service = Service(executable_path=chromedriver_path)
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+
+    # 不使用隐式等待，所有等待都显式进行（否则查找不存在的元素会白白等待）
+    driver.implicitly_wait(0)
+    return driver
+
+
+def wait_for_page_ready(driver, timeout: float = 30) -> bool:
+    """等待页面加载完成（document.readyState为complete）
+
+    Args:
+        driver: WebDriver实例
+        timeout: 最长等待时间（秒）
+
+    Returns:
+        是否在超时前加载完成
+    """
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
+        return True
+    except TimeoutException:
+        logger.warning(f"等待页面加载完成超时 ({timeout}秒)，继续处理已加载的内容")
+        return False
+
+
+class BrowserPool:
+    """预热的浏览器池（线程安全）"""
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_uses: int = 20,
+        driver_factory: Callable[[], Any] = create_chrome_driver,
+    ):
+        """初始化浏览器池
+
+        Args:
+            size: 池中最多同时存在的浏览器数量
+            max_uses: 单个浏览器最多使用次数，超过后回收重建
+            driver_factory: 创建浏览器的函数
+        """
+        self.size = max(size, 1)
+        self.max_uses = max_uses
+        self.driver_factory = driver_factory
+
+        self._idle = []
+        self._uses: Dict[int, int] = {}
+        self._live = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "BrowserPool":
+        """根据[search]配置创建浏览器池"""
+        return cls(
+            size=config.get("browser_pool_size", 2),
+            max_uses=config.get("browser_max_uses", 20),
+        )
+
+    def _create(self):
+        """创建一个浏览器，失败时归还名额"""
+        start = time.monotonic()
+        try:
+            driver = self.driver_factory()
+        except Exception:
+            with self._cond:
+                self._live -= 1
+                self._cond.notify()
+            raise
+        self._uses[id(driver)] = 0
+        logger.info(f"已启动浏览器，耗时 {time.monotonic() - start:.2f} 秒")
+        return driver
+
+    def _discard(self, driver):
+        """关闭浏览器并归还名额"""
+        self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug(f"关闭浏览器时出错: {e}")
+        with self._cond:
+            self._live -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _is_healthy(driver) -> bool:
+        """检查浏览器是否仍可用"""
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def warm(self, count: Optional[int] = None):
+        """预先启动浏览器直到池中有count个（默认为size个）
+
+        Args:
+            count: 目标浏览器数量
+        """
+        target = min(count or self.size, self.size)
+        while True:
+            with self._cond:
+                if self._closed or self._live >= target:
+                    return
+                self._live += 1
+            try:
+                driver = self._create()
+            except Exception as e:
+                logger.error(f"预热浏览器失败: {e}")
+                return
+            with self._cond:
+                self._idle.append(driver)
+                self._cond.notify()
+
+    def warm_in_background(self, count: Optional[int] = None):
+        """在后台线程中预热浏览器"""
+        threading.Thread(
+            target=self.warm, args=(count,), name="browser-pool-warm", daemon=True
+        ).start()
+
+    def acquire(self, timeout: float = 60):
+        """取出一个可用的浏览器
+
+        Args:
+            timeout: 等待空闲浏览器的最长时间（秒）
+
+        Returns:
+            WebDriver实例
+
+        Raises:
+            TimeoutError: 超时仍没有可用的浏览器
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while not self._idle and self._live >= self.size:
+                    if self._closed:
+                        raise RuntimeError("浏览器池已关闭")
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"等待空闲浏览器超时 ({timeout}秒)")
+                    self._cond.wait(remaining)
+
+                if self._idle:
+                    driver = self._idle.pop()
+                else:
+                    driver = None
+                    self._live += 1
+
+            if driver is None:
+                return self._create()
+            if self._is_healthy(driver):
+                return driver
+            logger.warning("检测到浏览器已失效，正在替换")
+            self._discard(driver)
+
+    def release(self, driver, broken: bool = False):
+        """归还浏览器
+
+        Args:
+            driver: WebDriver实例
+            broken: 使用过程中是否发生了浏览器错误
+        """
+        uses = self._uses.get(id(driver), 0) + 1
+        self._uses[id(driver)] = uses
+
+        if broken or self._closed or uses >= self.max_uses:
+            if not broken and not self._closed:
+                logger.info(f"浏览器已使用 {uses} 次，回收重建")
+            # 在后台补回被关闭的浏览器，使池中浏览器数量保持不变
+            live = self._live
+            self._discard(driver)
+            if not self._closed:
+                self.warm_in_background(live)
+            return
+
+        with self._cond:
+            self._idle.append(driver)
+            self._cond.notify()
+
+    @contextmanager
+    def driver(self, timeout: float = 60):
+        """以上下文管理器的方式使用浏览器
+
+        Example:
+            with get_browser_pool().driver() as driver:
+                driver.get(url)
+        """
+        driver = self.acquire(timeout)
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = not self._is_healthy(driver)
+            raise
+        finally:
+            self.release(driver, broken)
+
+    def close(self):
+        """关闭池中所有空闲浏览器，使用中的浏览器在归还时关闭"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for driver in idle:
+            self._discard(driver)
+
+
+# 全局浏览器池
+_browser_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """获取浏览器池实例
+
+    Returns:
+        浏览器池实例
+    """
+    global _browser_pool
+
+    with _pool_lock:
+        if _browser_pool is None:
+            _browser_pool = BrowserPool.from_config(get_search_config())
+            atexit.register(_browser_pool.close)
+
+    return _browser_pool
@@ -0,0 +1,80 @@
+"""HTML解析模块
+
+为HTTP方式的搜索提供统一的CSS选择器接口，按以下顺序选择可用的解析库：
+- selectolax：速度最快
+- lxml（需要cssselect）
+两者都未安装时available()返回False，搜索工具直接使用浏览器。
+"""
+
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    try:
+        from selectolax.lexbor import LexborHTMLParser as _SelectolaxParser
+    except ImportError:  # 较早版本的selectolax没有lexbor后端
+        from selectolax.parser import HTMLParser as _SelectolaxParser
+
+    BACKEND = "selectolax"
+except ImportError:
+    _SelectolaxParser = None
+    try:
+        import cssselect  # noqa: F401  lxml的CSS选择器依赖cssselect
+        import lxml.html
+
+        BACKEND = "lxml"
+    except ImportError:
+        BACKEND = None
+
+
+def available() -> bool:
+    """是否有可用的HTML解析库"""
+    return BACKEND is not None
+
+
+class Node:
+    """HTML元素，封装不同解析库的元素对象"""
+
+    def __init__(self, node):
+        self._node = node
+
+    def select(self, selector: str) -> List["Node"]:
+        """按CSS选择器查找所有子元素"""
+        if BACKEND == "selectolax":
+            return [Node(node) for node in self._node.css(selector)]
+        return [Node(node) for node in self._node.cssselect(selector)]
+
+    def select_one(self, selector: str) -> Optional["Node"]:
+        """按CSS选择器查找第一个子元素"""
+        found = self.select(selector)
+        return found[0] if found else None
+
+    @property
+    def text(self) -> str:
+        """元素的文本内容，多个空白合并为一个空格"""
+        if BACKEND == "selectolax":
+            text = self._node.text(separator=" ")
+        else:
+            text = self._node.text_content()
+        return " ".join(text.split())
+
+    def attr(self, name: str) -> Optional[str]:
+        """获取元素属性"""
+        if BACKEND == "selectolax":
+            return self._node.attributes.get(name)
+        return self._node.get(name)
+
+
+def parse(html: str) -> Node:
+    """解析HTML文档
+
+    Raises:
+        RuntimeError: 没有可用的HTML解析库
+    """
+    if BACKEND == "selectolax":
+        return Node(_SelectolaxParser(html))
+    if BACKEND == "lxml":
+        return Node(lxml.html.document_fromstring(html))
+    raise RuntimeError("未安装HTML解析库（selectolax或lxml+cssselect）")
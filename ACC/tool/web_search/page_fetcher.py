@@ -0,0 +1,313 @@
+"""网页内容并发获取模块
+
+搜索工具需要获取每条搜索结果对应网页的内容，该模块并发获取多个网页：
+- 优先使用带连接池的HTTP请求直接获取网页，不需要启动浏览器
+- HTTP请求被拦截、失败或网页内容需要JavaScript渲染时，使用浏览器池中的浏览器获取
+- 启用搜索缓存时，网页内容会被缓存，过期后通过ETag/Last-Modified重新验证
+- 每个网页有单独的超时时间，全部网页有总的截止时间，超过截止时间时返回已获取的部分结果
+"""
+
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+
+from ACC.config import get_search_config
+from ACC.tool.web_search.browser_pool import get_browser_pool, wait_for_page_ready
+from ACC.tool.web_search.search_cache import SearchCache, get_search_cache
+
+logger = logging.getLogger(__name__)
+
+# 网页内容最多保留的字符数
+MAX_PAGE_CONTENT_LENGTH = 600
+
+# HTTP获取到的正文少于该字符数时，认为网页依赖JavaScript渲染
+MIN_HTTP_TEXT_LENGTH = 200
+
+# 模拟常见浏览器的请求头，部分网站会拦截默认的requests请求头
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+}
+
+# 表示网页需要JavaScript的提示文本
+JS_REQUIRED_PATTERN = re.compile(
+    r"enable javascript|javascript is (?:disabled|required)|请开启javascript|启用javascript",
+    re.IGNORECASE,
+)
+
+# 不提取文本的标签
+_SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg", "head"}
+
+
+class _TextExtractor(HTMLParser):
+    """提取HTML中的可见文本"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth and data.strip():
+            self.parts.append(data.strip())
+
+
+def extract_text(html: str) -> str:
+    """提取HTML中的可见文本，多个空白合并为一个空格"""
+    parser = _TextExtractor()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception as e:
+        logger.debug(f"解析HTML时出错: {e}")
+    return re.sub(r"\s+", " ", " ".join(parser.parts)).strip()
+
+
+def truncate_content(text: str, max_length: int = MAX_PAGE_CONTENT_LENGTH) -> str:
+    """截断网页内容"""
+    text = text.strip()
+    if len(text) > max_length:
+        text = text[:max_length] + "..."
+    return text or "网页内容为空"
+
+
+class PageFetcher:
+    """网页内容获取器（线程安全）"""
+
+    def __init__(
+        self,
+        max_workers: int = 5,
+        page_timeout: float = 10,
+        pool_maxsize: int = 10,
+        cache: Optional[SearchCache] = None,
+    ):
+        """初始化网页内容获取器
+
+        Args:
+            max_workers: 同时获取的最大网页数
+            page_timeout: 单个网页的超时时间（秒）
+            pool_maxsize: HTTP连接池大小
+            cache: 网页内容缓存，为None时不使用缓存
+        """
+        self.max_workers = max(max_workers, 1)
+        self.page_timeout = page_timeout
+        self.cache = cache
+        self._stats_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(DEFAULT_HEADERS)
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "PageFetcher":
+        """根据[search]配置创建网页内容获取器"""
+        return cls(
+            max_workers=config.get("fetch_workers", 5),
+            page_timeout=config.get("page_timeout", 10),
+            cache=get_search_cache(),
+        )
+
+    def _request(self, url: str, timeout: float, cached: Optional[Dict[str, Any]] = None) -> Optional[requests.Response]:
+        """发送HTTP请求，有缓存的验证信息时发送条件请求
+
+        Returns:
+            状态码为200或304的响应；被拦截或请求失败时返回None
+        """
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            response = self.session.get(url, timeout=timeout, headers=headers)
+        except requests.RequestException as e:
+            logger.debug(f"HTTP获取网页失败，改用浏览器: {url}, 错误: {e}")
+            return None
+
+        if response.status_code == 200 or (response.status_code == 304 and cached):
+            return response
+        logger.debug(f"HTTP获取网页返回状态码 {response.status_code}，改用浏览器: {url}")
+        return None
+
+    @staticmethod
+    def _response_text(url: str, response: requests.Response) -> Optional[str]:
+        """提取HTTP响应中的网页文本，网页需要浏览器渲染时返回None"""
+        content_type = response.headers.get("Content-Type", "")
+        if "html" not in content_type and "xml" not in content_type:
+            return f"非网页内容（{content_type or '未知类型'}），未提取文本"
+
+        text = extract_text(response.text)
+        if len(text) < MIN_HTTP_TEXT_LENGTH or JS_REQUIRED_PATTERN.search(text[:2000]):
+            logger.debug(f"网页内容需要JavaScript渲染，改用浏览器: {url}")
+            return None
+        return text
+
+    def fetch_with_http(self, url: str, timeout: float) -> Optional[str]:
+        """使用HTTP请求获取网页文本
+
+        Returns:
+            网页文本；网页被拦截、请求失败或需要浏览器渲染时返回None
+        """
+        response = self._request(url, timeout)
+        return self._response_text(url, response) if response is not None else None
+
+    def fetch_with_browser(self, url: str, timeout: float) -> str:
+        """使用浏览器池中的浏览器获取网页文本
+
+        Raises:
+            TimeoutException: 页面加载超时
+            TimeoutError: 等待空闲浏览器超时
+            WebDriverException: 浏览器错误
+        """
+        with get_browser_pool().driver(timeout=timeout) as driver:
+            driver.set_page_load_timeout(timeout)
+            driver.get(url)
+            wait_for_page_ready(driver, timeout)
+            return driver.find_element(By.TAG_NAME, "body").text
+
+    def _count(self, stats: Dict[str, int], key: str):
+        """累加缓存统计（多个线程共用同一个统计字典）"""
+        with self._stats_lock:
+            stats[key] = stats.get(key, 0) + 1
+
+    def fetch(self, url: str, timeout: Optional[float] = None, stats: Optional[Dict[str, int]] = None) -> str:
+        """获取单个网页的文本内容
+
+        依次尝试：未过期的缓存、HTTP请求（缓存过期时为条件请求）、浏览器。
+
+        Args:
+            url: 网页地址
+            timeout: 超时时间（秒），默认使用page_timeout
+            stats: 缓存统计，会累加hits、misses、revalidated
+
+        Returns:
+            截断后的网页文本，失败时返回错误说明
+        """
+        timeout = timeout or self.page_timeout
+        deadline = time.monotonic() + timeout
+        stats = stats if stats is not None else {}
+
+        cached = self.cache.get_page(url) if self.cache else None
+        if cached and cached["fresh"]:
+            self._count(stats, "hits")
+            return truncate_content(cached["text"])
+
+        response = self._request(url, timeout, cached)
+        if response is not None and response.status_code == 304:
+            logger.debug(f"网页未变化，使用缓存的内容: {url}")
+            self.cache.refresh_page(url)
+            self._count(stats, "revalidated")
+            return truncate_content(cached["text"])
+
+        self._count(stats, "misses")
+        text = self._response_text(url, response) if response is not None else None
+        if text is not None:
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+        else:
+            etag = last_modified = None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return "获取网页内容超时"
+            try:
+                text = self.fetch_with_browser(url, remaining)
+            except (TimeoutException, TimeoutError):
+                logger.warning(f"获取网页内容超时: {url}")
+                return "获取网页内容超时"
+            except WebDriverException as e:
+                logger.warning(f"获取网页内容失败: {url}, 错误: {e}")
+                return f"获取网页内容失败: {e.msg or e}"
+
+        if self.cache:
+            self.cache.put_page(url, truncate_content(text), etag, last_modified)
+        return truncate_content(text)
+
+    def fetch_many(
+        self, urls: List[str], deadline: Optional[float] = None, stats: Optional[Dict[str, int]] = None
+    ) -> Dict[str, str]:
+        """并发获取多个网页的文本内容
+
+        Args:
+            urls: 网页地址列表
+            deadline: 全部网页的截止时间（秒），超过后返回已获取的部分结果
+            stats: 缓存统计，见fetch()
+
+        Returns:
+            网页地址到网页文本的映射，超时未获取的网页对应超时说明
+        """
+        urls = list(dict.fromkeys(url for url in urls if url))
+        if not urls:
+            return {}
+
+        start = time.monotonic()
+        page_timeout = min(self.page_timeout, deadline) if deadline else self.page_timeout
+
+        # 不使用with语句，超时时不等待未完成的网页
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(urls)), thread_name_prefix="page-fetch"
+        )
+        futures = {executor.submit(self.fetch, url, page_timeout, stats): url for url in urls}
+        done, not_done = wait(futures, timeout=deadline)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        contents = {}
+        for future, url in futures.items():
+            if future in done:
+                try:
+                    contents[url] = future.result()
+                except Exception as e:
+                    logger.warning(f"获取网页内容时发生错误: {url}, 错误: {e}")
+                    contents[url] = f"获取网页内容失败: {e}"
+            else:
+                contents[url] = "获取网页内容超时"
+
+        logger.info(
+            f"已获取 {len(done)}/{len(urls)} 个网页的内容，耗时 {time.monotonic() - start:.2f} 秒"
+            + (f"，{len(not_done)} 个网页超过截止时间" if not_done else "")
+        )
+        return contents
+
+
+# 全局网页内容获取器
+_page_fetcher: Optional[PageFetcher] = None
+_fetcher_lock = threading.Lock()
+
+
+def get_page_fetcher() -> PageFetcher:
+    """获取网页内容获取器实例
+
+    Returns:
+        网页内容获取器实例
+    """
+    global _page_fetcher
+
+    with _fetcher_lock:
+        if _page_fetcher is None:
+            _page_fetcher = PageFetcher.from_config(get_search_config())
+
+    return _page_fetcher
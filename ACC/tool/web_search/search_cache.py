@@ -0,0 +1,283 @@
+"""搜索结果缓存模块
+
+搜索工具共用的磁盘缓存，保存在本地SQLite文件中，分为两层：
+- 查询层：搜索引擎+搜索内容 -> 搜索结果列表
+- 网页层：网页URL -> 提取出的网页文本，同时保存ETag/Last-Modified，
+  过期后通过条件请求验证，网页未变化（304）时继续使用缓存的文本
+记录使用zlib压缩，超过有效期后失效，两层的总大小超过上限时按最近访问时间淘汰（LRU）。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+from ACC.config import get_search_config
+
+logger = logging.getLogger(__name__)
+
+# 默认缓存文件路径（项目根目录下的cache目录）
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+DEFAULT_SEARCH_CACHE_PATH = os.path.join(PROJECT_ROOT, "cache", "search_cache.sqlite")
+
+
+def _pack(data: Any) -> bytes:
+    """序列化并压缩"""
+    return zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+
+def _unpack(value: bytes) -> Any:
+    """解压并反序列化"""
+    return json.loads(zlib.decompress(value).decode("utf-8"))
+
+
+class SearchCache:
+    """搜索结果和网页内容的两层缓存（线程安全）"""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_SEARCH_CACHE_PATH,
+        query_ttl: Optional[float] = 3600,
+        page_ttl: Optional[float] = 86400,
+        max_size_mb: float = 50,
+    ):
+        """初始化搜索缓存
+
+        Args:
+            path: SQLite文件路径
+            query_ttl: 搜索结果有效期（秒），None表示永不过期
+            page_ttl: 网页内容有效期（秒），过期后有验证信息的网页会重新验证
+            max_size_mb: 缓存总大小上限（MB，按压缩后大小计算）
+        """
+        self.path = path
+        self.query_ttl = query_ttl
+        self.page_ttl = page_ttl
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS queries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT PRIMARY KEY, value BLOB NOT NULL, etag TEXT, last_modified TEXT, "
+            "size INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["SearchCache"]:
+        """根据[search]配置创建搜索缓存
+
+        Returns:
+            未启用缓存时返回None
+        """
+        if not config.get("cache", True):
+            return None
+
+        path = config.get("cache_path") or DEFAULT_SEARCH_CACHE_PATH
+        if not os.path.isabs(path):
+            # 相对路径以项目根目录为基准
+            path = os.path.join(PROJECT_ROOT, path)
+
+        try:
+            return cls(
+                path=path,
+                query_ttl=config.get("query_cache_ttl", 3600) or None,
+                page_ttl=config.get("page_cache_ttl", 86400) or None,
+                max_size_mb=config.get("cache_max_size_mb", 50),
+            )
+        except sqlite3.Error as e:
+            logger.error(f"打开搜索缓存失败，已禁用缓存: {e}")
+            return None
+
+    @staticmethod
+    def query_key(engine: str, query: str) -> str:
+        """计算搜索结果的缓存键，搜索内容中的空白会被规范化"""
+        normalized = " ".join(query.split()).lower()
+        return hashlib.sha256(f"{engine}\n{normalized}".encode("utf-8")).hexdigest()
+
+    def _expired(self, created: float, ttl: Optional[float], now: float) -> bool:
+        return ttl is not None and now - created > ttl
+
+    def get_results(self, engine: str, query: str, max_results: int) -> Optional[Dict[str, Any]]:
+        """读取缓存的搜索结果
+
+        缓存的结果是以不少于max_results的条数搜索得到的才算命中。
+
+        Returns:
+            包含results、page_title、page_url、backend的字典，未命中时返回None
+        """
+        key = self.query_key(engine, query)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM queries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self._expired(row[1], self.query_ttl, now):
+                self._conn.execute("DELETE FROM queries WHERE key = ?", (key,))
+                return None
+
+            data = _unpack(row[0])
+            if data.get("max_results", 0) < max_results:
+                return None
+            self._conn.execute("UPDATE queries SET accessed = ? WHERE key = ?", (now, key))
+
+        data["results"] = data["results"][:max_results]
+        return data
+
+    def put_results(self, engine: str, query: str, max_results: int, data: Dict[str, Any]):
+        """写入搜索结果
+
+        Args:
+            engine: 搜索引擎名称
+            query: 搜索内容
+            max_results: 搜索时请求的最大结果数
+            data: 包含results、page_title、page_url、backend的字典
+        """
+        value = _pack(dict(data, max_results=max_results))
+        self._insert(
+            "INSERT OR REPLACE INTO queries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+            (self.query_key(engine, query), value, len(value)),
+        )
+
+    def get_page(self, url: str) -> Optional[Dict[str, Any]]:
+        """读取缓存的网页内容
+
+        Returns:
+            包含text、etag、last_modified、fresh的字典，未缓存时返回None；
+            过期且没有验证信息的记录会被删除
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, etag, last_modified, created FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            fresh = not self._expired(row[3], self.page_ttl, now)
+            if not fresh and not (row[1] or row[2]):
+                self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+                return None
+            self._conn.execute("UPDATE pages SET accessed = ? WHERE url = ?", (now, url))
+
+        return {"text": _unpack(row[0]), "etag": row[1], "last_modified": row[2], "fresh": fresh}
+
+    def put_page(self, url: str, text: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """写入网页内容
+
+        Args:
+            url: 网页URL
+            text: 网页文本
+            etag: 响应头ETag
+            last_modified: 响应头Last-Modified
+        """
+        value = _pack(text)
+        self._insert(
+            "INSERT OR REPLACE INTO pages (url, value, etag, last_modified, size, created, accessed) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, value, etag, last_modified, len(value)),
+        )
+
+    def refresh_page(self, url: str):
+        """网页验证未变化后，重新开始计算有效期"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET created = ?, accessed = ? WHERE url = ?", (now, now, url)
+            )
+
+    def _insert(self, sql: str, params: tuple):
+        """写入记录（params末尾自动补充created和accessed）并按需淘汰旧记录"""
+        if params[-1] > self.max_size:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(sql, params + (now, now))
+            self._evict(now)
+
+    def _evict(self, now: float):
+        """删除过期记录，并按LRU淘汰直到总大小不超过上限（调用方需持有锁）"""
+        if self.query_ttl is not None:
+            self._conn.execute("DELETE FROM queries WHERE created < ?", (now - self.query_ttl,))
+        if self.page_ttl is not None:
+            # 有验证信息的网页过期后仍可重新验证，只删除没有验证信息的
+            self._conn.execute(
+                "DELETE FROM pages WHERE created < ? AND etag IS NULL AND last_modified IS NULL",
+                (now - self.page_ttl,),
+            )
+
+        total = self._conn.execute(
+            "SELECT (SELECT COALESCE(SUM(size), 0) FROM queries) + (SELECT COALESCE(SUM(size), 0) FROM pages)"
+        ).fetchone()[0]
+        if total <= self.max_size:
+            return
+
+        evicted = 0
+        for table, column, key, size, _ in self._conn.execute(
+            "SELECT 'queries', 'key', key, size, accessed FROM queries "
+            "UNION ALL SELECT 'pages', 'url', url, size, accessed FROM pages "
+            "ORDER BY accessed ASC"
+        ).fetchall():
+            if total <= self.max_size:
+                break
+            self._conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (key,))
+            total -= size
+            evicted += 1
+        logger.debug(f"搜索缓存淘汰了 {evicted} 条记录")
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM queries")
+            self._conn.execute("DELETE FROM pages")
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计信息"""
+        with self._lock:
+            queries, query_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM queries"
+            ).fetchone()
+            pages, page_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages"
+            ).fetchone()
+        return {"queries": queries, "pages": pages, "size": query_size + page_size}
+
+    def close(self):
+        """关闭缓存文件"""
+        with self._lock:
+            self._conn.close()
+
+
+# 全局搜索缓存
+_search_cache: Optional[SearchCache] = None
+_cache_loaded = False
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """获取搜索缓存实例
+
+    Returns:
+        搜索缓存实例，未启用缓存时返回None
+    """
+    global _search_cache, _cache_loaded
+
+    with _cache_lock:
+        if not _cache_loaded:
+            _search_cache = SearchCache.from_config(get_search_config())
+            _cache_loaded = True
+
+    return _search_cache
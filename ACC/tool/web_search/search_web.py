@@ -0,0 +1,193 @@
+"""多搜索引擎联合搜索工具
+
+该模块提供了同时在多个搜索引擎上搜索的工具，不再需要在某个搜索引擎不可用时再换一个重试：
+- 并发调用已注册的Bing、百度、谷歌搜索工具
+- 足够数量（quorum）的搜索引擎返回结果或到达截止时间后立即合并，不等待较慢的搜索引擎
+- 按规范化后的URL去重，并按各搜索引擎中的排名融合排序（Reciprocal Rank Fusion）
+- 合并后只对最终保留的结果获取网页内容
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from ACC.config import get_search_config
+from ACC.tool.base import BaseTool, ToolRegistry
+from ACC.tool.web_search.page_fetcher import get_page_fetcher
+
+logger = logging.getLogger(__name__)
+
+# 默认参与联合搜索的搜索工具
+DEFAULT_ENGINES = ["search_google", "search_bing", "search_baidu"]
+
+# 排名融合的平滑常数，越大排名靠后的结果与靠前的结果差距越小
+RRF_K = 60
+
+
+def normalize_url(url: str) -> str:
+    """规范化URL用于去重：忽略协议、www前缀、末尾斜杠和锚点"""
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parsed.path.rstrip("/")
+    query = f"?{parsed.query}" if parsed.query else ""
+    return f"{host}{path}{query}"
+
+
+def fuse_results(engine_results: Dict[str, List[Dict[str, Any]]], max_results: int) -> List[Dict[str, Any]]:
+    """合并多个搜索引擎的结果
+
+    Args:
+        engine_results: 搜索工具名称到其搜索结果列表的映射
+        max_results: 返回的最大结果数量
+
+    Returns:
+        去重并按融合得分排序的结果列表，每条结果的engines字段记录返回该结果的搜索工具
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    scores: Dict[str, float] = {}
+    for engine, results in engine_results.items():
+        for rank, result in enumerate(results, start=1):
+            if not result.get("url"):
+                continue
+            key = normalize_url(result["url"])
+            scores[key] = scores.get(key, 0.0) + 1.0 / (RRF_K + rank)
+            if key not in merged:
+                merged[key] = {
+                    "title": result.get("title", ""),
+                    "url": result["url"],
+                    "description": result.get("description", "无描述"),
+                    "engines": [],
+                }
+            elif merged[key]["description"] == "无描述":
+                merged[key]["description"] = result.get("description", "无描述")
+            merged[key]["engines"].append(engine)
+
+    ranked = sorted(merged, key=lambda key: -scores[key])
+    return [merged[key] for key in ranked[:max_results]]
+
+
+class SearchWebTool(BaseTool):
+    """多搜索引擎联合搜索工具"""
+
+    def __init__(self):
+        """初始化联合搜索工具"""
+        super().__init__(
+            name="search_web",
+            description="同时在谷歌、Bing、百度上搜索指定内容，合并去重后返回搜索结果，包含网页标题、链接和内容摘要（最多600字符），可以使用其它工具对链接进行进一步的访问以获取内容"
+        )
+
+    def execute(
+        self,
+        query: str,
+        max_results: int = 5,
+        timeout: int = 30,
+        fetch_content: bool = True,
+        engines: Optional[List[str]] = None,
+        quorum: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """执行联合搜索
+
+        Args:
+            query: 搜索查询内容
+            max_results: 返回的最大结果数量
+            timeout: 截止时间（秒），到达后使用已返回的结果
+            fetch_content: 是否获取网页内容摘要
+            engines: 参与搜索的搜索工具名称，默认使用配置中的engines
+            quorum: 有多少个搜索引擎返回结果后即可合并，默认使用配置中的quorum
+        """
+        config = get_search_config()
+        engines = engines or config.get("engines", DEFAULT_ENGINES)
+        tools = {name: ToolRegistry.get_tool(name) for name in engines}
+        tools = {name: tool for name, tool in tools.items() if tool is not None}
+        if not tools:
+            return {
+                "status": "error",
+                "message": f"没有可用的搜索引擎: {', '.join(engines)}",
+                "query": query,
+            }
+        quorum = min(quorum or config.get("quorum", 2), len(tools))
+
+        start = time.monotonic()
+        deadline = start + timeout
+
+        # 不使用with语句，达到quorum后不等待较慢的搜索引擎
+        executor = ThreadPoolExecutor(max_workers=len(tools), thread_name_prefix="search-web")
+        futures = {
+            executor.submit(tool.execute, query=query, max_results=max_results, timeout=timeout, fetch_content=False): name
+            for name, tool in tools.items()
+        }
+
+        engine_results: Dict[str, List[Dict[str, Any]]] = {}
+        engine_status: Dict[str, Dict[str, Any]] = {}
+        pending = set(futures)
+        while pending and len(engine_results) < quorum:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"status": "error", "message": str(e)}
+
+                if result.get("status") == "success" and result.get("results"):
+                    engine_results[name] = result["results"]
+                    engine_status[name] = {
+                        "status": "success",
+                        "count": len(result["results"]),
+                        "backend": result.get("backend"),
+                    }
+                else:
+                    engine_status[name] = {
+                        "status": result.get("status", "error"),
+                        "message": result.get("message", "没有搜索结果"),
+                    }
+        executor.shutdown(wait=False)
+
+        for future in pending:
+            engine_status[futures[future]] = {"status": "skipped", "message": "已有足够的搜索结果或超过截止时间，未等待"}
+
+        elapsed = time.monotonic() - start
+        if not engine_results:
+            logger.error(f"所有搜索引擎均未返回结果: {query}")
+            return {
+                "status": "error",
+                "message": "所有搜索引擎均未返回结果，请检查网络连接或稍后重试",
+                "query": query,
+                "engines": engine_status,
+            }
+
+        search_results = fuse_results(engine_results, max_results)
+
+        contents = {}
+        remaining = deadline - time.monotonic()
+        if fetch_content and remaining > 0:
+            contents = get_page_fetcher().fetch_many(
+                [result["url"] for result in search_results], deadline=remaining
+            )
+        for result in search_results:
+            result["page_content"] = contents.get(result["url"], "未获取网页内容")
+
+        message = (
+            f"成功获取联合搜索结果，共{len(search_results)}条（"
+            f"{len(engine_results)}/{len(tools)}个搜索引擎返回结果，搜索耗时{elapsed:.2f}秒）"
+        )
+        logger.info(message)
+
+        return {
+            "status": "success",
+            "message": message,
+            "query": query,
+            "engines": engine_status,
+            "results": search_results,
+        }
+
+
+# 注册工具
+ToolRegistry.register(SearchWebTool())
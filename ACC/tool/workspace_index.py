@@ -0,0 +1,467 @@
+"""工作空间文件索引模块
+
+search_workspace工具使用的内存索引，记录工作空间中每个文件的路径、大小、修改时间和内容哈希：
+- 首次查询时扫描整个工作空间，之后增量刷新：只重新读取大小或修改时间变化的文件
+- 已安装watchdog时监听文件系统事件（Linux上即inotify），没有变化时查询不需要扫描；
+  否则每次查询前按修改时间检查，两次检查之间至少间隔refresh_interval秒
+- 文本文件的内容以三元组（trigram）签名建立索引：每个文件保存一个布隆过滤器位图，
+  位数按文件中不同三元组的数量选择（小文件只需几十字节），
+  查询时先用位图筛选出可能包含查询内容的文件，再读取这些文件确认匹配的行
+- 索引只能建立在工作空间目录上，扫描的条目数有上限；索引实例数量有上限，淘汰时停止监听
+"""
+
+import atexit
+import fnmatch
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ACC.config import get_default_workspace_path, get_workspace_index_config
+from ACC.tool.directory_scanner import scan
+
+logger = logging.getLogger(__name__)
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 三元组签名的位数范围，以及每个三元组分配的位数（约12%的位被置1，误判率低）
+MIN_SIGNATURE_BITS = 1 << 9
+MAX_SIGNATURE_BITS = 1 << 15
+BITS_PER_TRIGRAM = 8
+
+# 一次扫描最多处理的目录项数，与list_directory的上限一致
+MAX_INDEX_ENTRIES = 100000
+
+# 最多同时保留的索引实例数，超出时停止监听并丢弃最久未使用的索引
+MAX_INDEXES = 4
+
+# 判断二进制文件时检查的字节数
+BINARY_SNIFF_SIZE = 8192
+
+
+def default_workspace_root() -> str:
+    """默认工作空间的绝对路径"""
+    return os.path.abspath(os.path.join(PROJECT_ROOT, get_default_workspace_path()))
+
+
+def trigram_hashes(text: str) -> Set[int]:
+    """文本（已转为小写）中所有不同三元组的哈希值"""
+    return {hash(text[i:i + 3]) for i in range(len(text) - 2)}
+
+
+def signature_bits(count: int) -> int:
+    """包含count个不同三元组的签名位数（2的幂）"""
+    bits = MIN_SIGNATURE_BITS
+    while bits < count * BITS_PER_TRIGRAM and bits < MAX_SIGNATURE_BITS:
+        bits <<= 1
+    return bits
+
+
+def trigram_signature(hashes: Iterable[int], bits: int) -> int:
+    """计算三元组签名位图"""
+    signature = bytearray(bits // 8)
+    mask = bits - 1
+    for value in hashes:
+        position = value & mask
+        signature[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(signature, "little")
+
+
+def _within(path: str, root: str) -> bool:
+    """path是否为root或其中的路径"""
+    return path == root or path.startswith(os.path.join(root, ""))
+
+
+class IndexedFile:
+    """索引中的一个文件"""
+
+    __slots__ = ("path", "relative_path", "size", "mtime", "content_hash", "signature", "signature_bits", "binary")
+
+    def __init__(self, path: str, relative_path: str, size: int, mtime: float):
+        self.path = path
+        self.relative_path = relative_path
+        self.size = size
+        self.mtime = mtime
+        self.content_hash: Optional[str] = None
+        # 三元组签名，二进制文件、超过大小上限或读取失败的文件为None
+        self.signature: Optional[int] = None
+        self.signature_bits = 0
+        # 二进制文件不参与内容搜索；没有签名的文本文件在搜索时直接扫描
+        self.binary = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "relative_path": self.relative_path,
+            "size": self.size,
+            "mtime": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.mtime)),
+        }
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    """文件系统事件处理器：记录发生了变化"""
+
+    def __init__(self, index: "WorkspaceIndex"):
+        self.index = index
+
+    def on_any_event(self, event):
+        if not getattr(event, "is_directory", False) or event.event_type != "modified":
+            self.index.mark_dirty()
+
+
+class WorkspaceIndex:
+    """工作空间文件索引（线程安全）"""
+
+    def __init__(
+        self,
+        root: str,
+        watch: bool = True,
+        refresh_interval: float = 2,
+        max_file_kb: int = 512,
+        respect_gitignore: bool = True,
+    ):
+        """初始化索引（首次查询时才开始监听和扫描）
+
+        Args:
+            root: 工作空间目录
+            watch: 已安装watchdog时是否监听文件变化
+            refresh_interval: 未监听时两次按修改时间检查之间的最小间隔（秒）
+            max_file_kb: 建立内容索引的文件大小上限（KB）
+            respect_gitignore: 是否按.gitignore规则忽略文件
+        """
+        self.root = os.path.abspath(root)
+        self.refresh_interval = refresh_interval
+        self.max_file_bytes = int(max_file_kb * 1024)
+        self.respect_gitignore = respect_gitignore
+        self.watch = watch
+        self.files: Dict[str, IndexedFile] = {}
+        self._lock = threading.RLock()
+        self._dirty = True
+        self._last_refresh = 0.0
+        self._observer = None
+        self.truncated = False
+        self.stats = {"refreshes": 0, "files_read": 0, "last_refresh_ms": 0.0}
+
+    @classmethod
+    def from_config(cls, root: str, config: Dict[str, Any]) -> "WorkspaceIndex":
+        """根据[workspace_index]配置创建索引"""
+        return cls(
+            root,
+            watch=config.get("watch", True),
+            refresh_interval=config.get("refresh_interval", 2),
+            max_file_kb=config.get("max_file_kb", 512),
+            respect_gitignore=config.get("respect_gitignore", True),
+        )
+
+    @property
+    def watching(self) -> bool:
+        return self._observer is not None
+
+    def _start_watching(self):
+        """使用watchdog监听工作空间，未安装或启动失败时退回按修改时间检查"""
+        if Observer is None or not os.path.isdir(self.root):
+            return
+        try:
+            observer = Observer()
+            observer.schedule(_ChangeHandler(self), self.root, recursive=True)
+            observer.daemon = True
+            observer.start()
+            self._observer = observer
+            logger.info(f"正在监听工作空间的文件变化: {self.root}")
+        except Exception as e:
+            logger.warning(f"监听工作空间失败，改为按修改时间检查: {e}")
+
+    def mark_dirty(self):
+        """标记索引需要刷新"""
+        self._dirty = True
+
+    def refresh(self, force: bool = False) -> bool:
+        """增量刷新索引
+
+        Args:
+            force: 是否忽略监听状态和检查间隔，立即检查
+
+        Returns:
+            是否进行了扫描
+        """
+        with self._lock:
+            # 工作空间目录可能在首次查询之后才创建
+            if self.watch and not self.watching:
+                self._start_watching()
+            if not force:
+                if self.watching and not self._dirty:
+                    return False
+                if not self.watching and time.monotonic() - self._last_refresh < self.refresh_interval:
+                    return False
+
+            # 先清除标记，扫描期间发生的变化留给下一次刷新
+            self._dirty = False
+            start = time.monotonic()
+            seen: Set[str] = set()
+            changed = 0
+            self.truncated = False
+            if os.path.isdir(self.root):
+                entries = scan(self.root, depth=0, respect_gitignore=self.respect_gitignore, with_stat=True)
+                for count, entry in enumerate(entries):
+                    if count >= MAX_INDEX_ENTRIES:
+                        # 超出上限时保留已索引的其余文件，避免误判为已删除
+                        self.truncated = True
+                        seen.update(self.files)
+                        logger.warning(f"工作空间条目超过 {MAX_INDEX_ENTRIES} 个，只索引了部分文件: {self.root}")
+                        break
+                    if entry.type != "file" or entry.size is None:
+                        continue
+                    seen.add(entry.path)
+                    known = self.files.get(entry.path)
+                    if known is not None and known.size == entry.size and known.mtime == entry.mtime:
+                        continue
+                    item = IndexedFile(entry.path, entry.relative_path, entry.size, entry.mtime)
+                    self._index_content(item)
+                    self.files[entry.path] = item
+                    changed += 1
+
+            removed = [path for path in self.files if path not in seen]
+            for path in removed:
+                del self.files[path]
+
+            elapsed = (time.monotonic() - start) * 1000
+            self._last_refresh = time.monotonic()
+            self.stats["refreshes"] += 1
+            self.stats["files_read"] += changed
+            self.stats["last_refresh_ms"] = round(elapsed, 1)
+            if changed or removed:
+                logger.info(
+                    f"工作空间索引已刷新: {len(self.files)} 个文件，更新 {changed} 个，删除 {len(removed)} 个，耗时 {elapsed:.0f} 毫秒"
+                )
+            return True
+
+    def _index_content(self, item: IndexedFile):
+        """读取文件，计算内容哈希和三元组签名"""
+        if item.size > self.max_file_bytes:
+            return
+        try:
+            with open(item.path, "rb") as f:
+                data = f.read(self.max_file_bytes + 1)
+        except OSError:
+            return
+        item.content_hash = hashlib.blake2b(data, digest_size=16).hexdigest()
+        if b"\0" in data[:BINARY_SNIFF_SIZE]:
+            item.binary = True
+            return
+        hashes = trigram_hashes(data.decode("utf-8", errors="replace").lower())
+        item.signature_bits = signature_bits(len(hashes))
+        item.signature = trigram_signature(hashes, item.signature_bits)
+
+    def _snapshot(self, prefix: str = "") -> List[IndexedFile]:
+        """刷新后按相对路径排序的文件列表
+
+        Args:
+            prefix: 只返回该相对目录（以/结尾）中的文件
+        """
+        self.refresh()
+        with self._lock:
+            items = [item for item in self.files.values() if item.relative_path.startswith(prefix)]
+        return sorted(items, key=lambda f: f.relative_path)
+
+    def find_glob(self, pattern: str, limit: int = 50, prefix: str = "") -> Dict[str, Any]:
+        """按glob模式查找文件，模式匹配相对路径或文件名"""
+        matches = [
+            item for item in self._snapshot(prefix)
+            if fnmatch.fnmatch(item.relative_path, pattern)
+            or fnmatch.fnmatch(os.path.basename(item.relative_path), pattern)
+        ]
+        return {"total": len(matches), "files": [item.to_dict() for item in matches[:limit]]}
+
+    def find_name(self, name: str, limit: int = 50, prefix: str = "") -> Dict[str, Any]:
+        """按文件名查找（不区分大小写），完全匹配的排在前面，其次是前缀匹配"""
+        needle = name.lower()
+        ranked = []
+        for item in self._snapshot(prefix):
+            filename = os.path.basename(item.relative_path).lower()
+            if needle not in filename:
+                continue
+            rank = 0 if filename == needle else 1 if filename.startswith(needle) else 2
+            ranked.append((rank, len(item.relative_path), item))
+        ranked.sort(key=lambda r: (r[0], r[1]))
+        return {"total": len(ranked), "files": [item.to_dict() for _, _, item in ranked[:limit]]}
+
+    def search_content(
+        self,
+        query: str,
+        limit: int = 50,
+        case_sensitive: bool = False,
+        regex: bool = False,
+        glob: Optional[str] = None,
+        prefix: str = "",
+    ) -> Dict[str, Any]:
+        """搜索文件内容
+
+        Args:
+            query: 要查找的文本（regex为True时为正则表达式）
+            limit: 最多返回的匹配行数
+            case_sensitive: 是否区分大小写
+            regex: query是否为正则表达式
+            glob: 只搜索匹配该glob模式的文件
+            prefix: 只搜索该相对目录（以/结尾）中的文件
+
+        Returns:
+            包含matches（路径、行号、行内容）、files_matched、candidates（经三元组筛选后需要读取的文件数）、
+            unindexed（没有签名、直接扫描的文件数，如超过大小上限的文件）和skipped（无法读取的文件数）的字典
+
+        Raises:
+            re.error: 正则表达式无效
+        """
+        flags = 0 if case_sensitive else re.IGNORECASE
+        pattern = re.compile(query if regex else re.escape(query), flags)
+        # 正则表达式无法提取三元组，只能逐个文件检查
+        hashes = trigram_hashes(query.lower()) if not regex else set()
+        # 各文件的签名位数不同，按位数分别计算查询的掩码
+        masks: Dict[int, int] = {}
+
+        def may_contain(item: IndexedFile) -> bool:
+            if item.binary:
+                return False
+            # 没有签名的文件无法筛选，只能直接扫描
+            if item.signature is None or not hashes:
+                return True
+            mask = masks.get(item.signature_bits)
+            if mask is None:
+                mask = masks[item.signature_bits] = trigram_signature(hashes, item.signature_bits)
+            return item.signature & mask == mask
+
+        candidates = [
+            item for item in self._snapshot(prefix)
+            if may_contain(item)
+            and (not glob or fnmatch.fnmatch(item.relative_path, glob)
+                 or fnmatch.fnmatch(os.path.basename(item.relative_path), glob))
+        ]
+
+        matches, files_matched, unindexed, skipped = [], 0, 0, 0
+        for item in candidates:
+            found = False
+            try:
+                with open(item.path, "rb") as f:
+                    if item.signature is None:
+                        # 建立索引时没有读取内容的文件，扫描前检查是否为二进制文件
+                        if b"\0" in f.read(BINARY_SNIFF_SIZE):
+                            continue
+                        f.seek(0)
+                        unindexed += 1
+                    # 逐行读取，超过大小上限的大文件也不会整个载入内存
+                    lines = io.TextIOWrapper(f, encoding="utf-8", errors="replace")
+                    for number, line in enumerate(lines, 1):
+                        line = line.rstrip("\n")
+                        if pattern.search(line):
+                            found = True
+                            if len(matches) < limit:
+                                matches.append({
+                                    "path": item.path,
+                                    "relative_path": item.relative_path,
+                                    "line": number,
+                                    "text": line.strip()[:300],
+                                })
+            except OSError:
+                skipped += 1
+            files_matched += found
+
+        return {
+            "matches": matches,
+            "files_matched": files_matched,
+            "candidates": len(candidates),
+            "unindexed": unindexed,
+            "skipped": skipped,
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """索引状态"""
+        with self._lock:
+            return {
+                "root": self.root,
+                "files": len(self.files),
+                "content_indexed": sum(1 for item in self.files.values() if item.signature is not None),
+                "watching": self.watching,
+                "truncated": self.truncated,
+                **self.stats,
+            }
+
+    def close(self):
+        """停止监听"""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+
+
+# 每个目录一个索引，按最近使用顺序保留最多MAX_INDEXES个
+_indexes: "OrderedDict[str, WorkspaceIndex]" = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def get_workspace_index(root: Optional[str] = None) -> WorkspaceIndex:
+    """获取工作空间的文件索引实例
+
+    Args:
+        root: 工作空间目录，默认为配置的工作空间目录
+
+    Returns:
+        文件索引实例
+    """
+    root = os.path.abspath(os.path.expanduser(root)) if root else default_workspace_root()
+
+    evicted = []
+    with _index_lock:
+        index = _indexes.get(root)
+        if index is None:
+            index = _indexes[root] = WorkspaceIndex.from_config(root, get_workspace_index_config())
+        _indexes.move_to_end(root)
+        while len(_indexes) > MAX_INDEXES:
+            evicted.append(_indexes.popitem(last=False)[1])
+
+    for old in evicted:
+        old.close()
+    return index
+
+
+def resolve_search_path(path: Optional[str]) -> Tuple[WorkspaceIndex, str]:
+    """把搜索路径解析为工作空间索引和相对目录前缀
+
+    Args:
+        path: 工作空间内的目录，为空时搜索整个工作空间
+
+    Returns:
+        (工作空间索引, 相对目录前缀)，前缀为空或以/结尾
+
+    Raises:
+        ValueError: 路径不在工作空间中
+    """
+    workspace = default_workspace_root()
+    if not path:
+        return get_workspace_index(workspace), ""
+    target = os.path.abspath(os.path.expanduser(path))
+    if not _within(target, workspace):
+        raise ValueError(f"只能搜索工作空间中的目录: {workspace}")
+    relative = os.path.relpath(target, workspace).replace(os.sep, "/")
+    return get_workspace_index(workspace), "" if relative == "." else relative + "/"
+
+
+def _close_indexes():
+    """进程退出时停止所有监听"""
+    with _index_lock:
+        indexes = list(_indexes.values())
+        _indexes.clear()
+    for index in indexes:
+        index.close()
+
+
+atexit.register(_close_indexes)
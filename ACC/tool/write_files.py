@@ -9,6 +9,7 @@ import os
 from pathlib import Path
 from typing import Dict, Any
 
+from ACC.fileio import atomic_write
 from ACC.tool.base import BaseTool, ToolRegistry
 
 logger = logging.getLogger(__name__)
@@ -61,8 +62,8 @@ class WriteFileTool(BaseTool):
             # 确保目录存在
             path.parent.mkdir(parents=True, exist_ok=True)
 
-            # 写入文件（覆盖模式）
-            path.write_text(content, encoding="utf-8")
+            # 写入文件（覆盖模式），先写临时文件再替换，不会留下写了一半的文件
+            atomic_write(path, content)
 
             logger.info(f"写入文件成功: {display_path}")
             return {
@@ -7,17 +7,21 @@
 - 管理系统状态
 """
 
+import asyncio
+import contextvars
 import json
 import logging
 import os
 import re
-from typing import Dict, Any
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Any, Optional
 
+from ACC.agent.base import drive_steps, adrive_steps
 from ACC.agent.planning import PlanningAgent
 from ACC.agent.analysis import AnalysisAgent
 
-# 修改导入，添加MEMORY_DIR
-from ACC.memory.memory_manager import MemoryManager, MEMORY_DIR
+from ACC.memory.memory_manager import MemoryManager
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +33,13 @@ from ACC.agent.refinement import RefinementAgent
 from ACC.agent.operate import OperateAgent
 
 
-from ACC.config import get_default_workspace_path
+from ACC.config import get_default_workspace_path, get_llm_config, get_workflow_config
+from ACC.retry import RetryBudget
+from ACC.memory.planning_store import get_planning_store
+from ACC.memory.session import get_session_manager, session_scope
+from ACC.scheduler import TaskScheduler
+from ACC.tool.command_jobs import JobTable, job_table_scope
+from ACC.tool.python_kernel import reset_namespace, reset_session_namespaces, session_namespace, task_namespace
 
 
 # 在文件顶部添加导入
@@ -38,20 +48,30 @@ from ACC.agent.sumup import SumupAgent
 class Workflow:
     """ACC工作流程控制类"""
 
-    def __init__(self):
-        """初始化工作流程控制器"""
-        logger.info("初始化工作流程控制器")
-
-        # 清空历史记录（新增）
-        MemoryManager.clean_history_file()
+    def __init__(self, session_id: Optional[str] = None):
+        """初始化工作流程控制器
 
-        # 原有清空目录操作
-        MemoryManager.clean_todo_directory()
-        MemoryManager.clean_refinement_directory()
-        # 添加清空操作目录
-        MemoryManager.clean_operation_directory()
-        # 添加清空操作解释目录
-        MemoryManager.clean_operation_generalization_directory()
+        Args:
+            session_id: 内存会话ID，不同会话的工作流使用各自的内存目录，可以同时执行；
+                为空时使用默认会话（ACC/memory）
+        """
+        logger.info("初始化工作流程控制器")
+        self.session = get_session_manager().get(session_id)
+
+        # 只清空本会话的内存
+        with session_scope(self.session):
+            # 清空历史记录（新增）
+            MemoryManager.clean_history_file()
+
+            # 原有清空目录操作
+            MemoryManager.clean_todo_directory()
+            MemoryManager.clean_refinement_directory()
+            # 添加清空操作目录
+            MemoryManager.clean_operation_directory()
+            # 添加清空操作解释目录
+            MemoryManager.clean_operation_generalization_directory()
+        # 清空本会话之前的运行留在Python内核中的命名空间
+        reset_session_namespaces(self.session.session_id)
 
         # 初始化Agent（原有代码）
         self.analysis_agent = AnalysisAgent()
@@ -60,6 +80,22 @@ class Workflow:
         # 添加操作Agent
         self.operate_agent = OperateAgent()
 
+        # 本工作流所有Agent共享的重试预算
+        self.retry_budget = RetryBudget.from_config(get_llm_config())
+        for agent in (
+            self.analysis_agent,
+            self.planning_agent,
+            self.refinement_agent,
+            self.operate_agent,
+        ):
+            agent.set_retry_budget(self.retry_budget)
+
+        # 任务调度：最大并行任务数，以及并行任务共享的history.json的锁
+        self.max_parallel_tasks = max(
+            int(get_workflow_config().get("max_parallel_tasks", 1)), 1
+        )
+        self._state_lock = threading.Lock()
+
         # 确保目录存在（原有代码）
         self._ensure_directories()
 
@@ -70,13 +106,13 @@ class Workflow:
     def _ensure_directories(self):
         """确保必要的目录存在"""
         # 确保操作目录存在
-        operation_dir = os.path.join(MEMORY_DIR, "todo", "operation")
+        operation_dir = self.session.path("todo", "operation")
         if not os.path.exists(operation_dir):
             os.makedirs(operation_dir, exist_ok=True)
             logger.info(f"创建目录: {operation_dir}")
 
         # 确保历史记录目录存在
-        operation_gen_dir = os.path.join(MEMORY_DIR, "operation_generalization")
+        operation_gen_dir = self.session.path("operation_generalization")
         if not os.path.exists(operation_gen_dir):
             os.makedirs(operation_gen_dir, exist_ok=True)
             logger.info(f"创建目录: {operation_gen_dir}")
@@ -91,18 +127,77 @@ class Workflow:
                 os.makedirs(workspace_path, exist_ok=True)
                 logger.info(f"创建工作空间目录: {workspace_path}")
 
-    # 修改 execute 方法中的循环处理逻辑
     def execute(self, user_input: str) -> Dict[str, Any]:
         """执行工作流程"""
+        with session_scope(self.session), job_table_scope(JobTable(f"workflow-{id(self):x}")):
+            try:
+                return drive_steps(self._execute_steps(user_input), self._perform_step)
+            finally:
+                self._log_memory_cache_stats()
+
+    async def arun(self, user_input: str) -> Dict[str, Any]:
+        """异步执行工作流程
+
+        各Agent通过arun执行，LLM请求不占用线程，一个事件循环可同时驱动多个Workflow实例。
+        注意：同一个Workflow实例的Agent持有消息状态，并发请求应各自创建Workflow。
+        """
+        with session_scope(self.session), job_table_scope(JobTable(f"workflow-{id(self):x}")):
+            try:
+                return await adrive_steps(self._execute_steps(user_input), self._aperform_step)
+            finally:
+                self._log_memory_cache_stats()
+
+    def close(self, remove: bool = True):
+        """结束本工作流的内存会话
+
+        Args:
+            remove: 是否删除会话目录（默认会话只关闭资源，不删除目录）
+        """
+        if self.session.is_default:
+            self.session.close(remove=False)
+        else:
+            get_session_manager().close(self.session.session_id, remove=remove)
+
+    def _log_memory_cache_stats(self):
+        """记录内存文件缓存的命中情况"""
+        stats = MemoryManager.cache_stats()
+        if stats:
+            logger.debug(
+                f"内存文件缓存: 命中 {stats['hits']} 次，未命中 {stats['misses']} 次，"
+                f"失效 {stats['invalidations']} 次，命中率 {stats['hit_rate']:.0%}"
+            )
+
+    def _agent_step(self, agent, *args):
+        """构造一个Agent运行步骤"""
+        return ("agent", (agent, args))
+
+    def _perform_step(self, kind: str, payload: Any) -> Any:
+        """同步执行Agent运行步骤或任务调度步骤"""
+        if kind == "schedule":
+            return self._run_schedule(payload)
+        agent, args = payload
+        return agent.run(*args)
+
+    async def _aperform_step(self, kind: str, payload: Any) -> Any:
+        """异步执行Agent运行步骤或任务调度步骤"""
+        if kind == "schedule":
+            return await self._arun_schedule(payload)
+        agent, args = payload
+        return await agent.arun(*args)
+
+    # 修改 execute 方法中的循环处理逻辑
+    def _execute_steps(self, user_input: str):
+        """工作流程的步骤生成器，由execute/arun驱动"""
         if user_input.strip().lower() in ("exit", "退出"):
             return {"status": "exit", "message": "用户请求退出系统"}
     
         logger.info(f"开始执行工作流程，用户输入: {user_input}")
+        self.retry_budget.reset()
     
         try:
             # 1. 运行分析Agent
             logger.info("🔄 正在询问分析Agent...")
-            analysis_result = self.analysis_agent.run(user_input)
+            analysis_result = yield self._agent_step(self.analysis_agent, user_input)
     
             # 添加这部分代码：当不需要规划时，以INFO级别显示分析代理的回复
             if not analysis_result.get("need_planning", True) and "message" in analysis_result:
@@ -111,112 +206,43 @@ class Workflow:
             if analysis_result.get("need_planning", True):
                 # 2. 运行规划Agent
                 logger.info("🔄 正在询问规划Agent...")
-                planning_result = self.planning_agent.run(user_input)
+                planning_result = yield self._agent_step(self.planning_agent, user_input)
                 MemoryManager.save_json("planning_result.json", planning_result)
     
                 # 添加总结Agent
                 self.sumup_agent = SumupAgent()
+                self.sumup_agent.set_retry_budget(self.retry_budget)
     
-                # 循环处理所有未完成的任务
-                all_tasks_completed = False
-                operation_results = []
-    
-                while not all_tasks_completed:
-                    # 3. 运行细化Agent - 只执行一次
-                    logger.info("🔄 正在询问细化Agent...")
-                    refinement_result = self.refinement_agent.run()
-    
-                    # 获取当前处理的任务编号
-                    current_task = refinement_result.get("current_task", "")
-                    task_number_match = re.search(r"^(\d+\.\d+)", current_task)
-    
-                    if not task_number_match:
-                        logger.error(f"无法识别任务编号: {current_task}")
-                        return {
-                            "status": "error",
-                            "message": f"无法识别任务编号: {current_task}",
-                        }
-    
-                    task_number = task_number_match.group()
-                    refinement_file = (
-                        f"todo/refinement/{task_number.replace('.', '_')}.md"
-                    )
-    
-                    # 确保细化文件存在
-                    if not os.path.exists(os.path.join(MEMORY_DIR, refinement_file)):
-                        logger.error(f"细化文件不存在: {refinement_file}")
-                        return {
-                            "status": "error",
-                            "message": f"细化文件不存在: {refinement_file}",
-                        }
-    
-                    # 4. 循环调用操作Agent直到当前任务完成
-                    current_task_completed = False
-                    while not current_task_completed:
-                        logger.info(f"🔄 正在调用操作Agent处理任务 {task_number}...")
-                        operation_result = self.operate_agent.run(refinement_file)
-                        operation_results.append(operation_result)
-    
-                        # 处理操作结果
-                        if "error" in operation_result and not operation_result.get("success", False):
-                            logger.error(f"操作Agent执行失败: {operation_result['error']}，但将继续尝试")
-                            # 不返回错误，继续尝试执行
-    
-                        # 检查操作是否成功完成
-                        operation_success = operation_result.get("success", False)
-    
-                        # 如果操作未成功完成，不清空历史记录，并将工具返回内容添加到历史对话
-                        if not operation_success:
-                            logger.info("操作未成功完成，保留历史记录")
-    
-                            # 如果有工具执行结果，将其添加到历史对话
-                            if tool_result := operation_result.get("tool_result"):
-                                logger.info(f"添加工具执行结果到历史对话: {tool_result}")
-    
-                                # 读取当前历史记录
-                                history = MemoryManager.read_json("history.json")
-    
-                                # 添加工具执行结果到历史记录
-                                history.append(
-                                    {
-                                        "role": "tool_result",
-                                        "content": json.dumps(
-                                            tool_result, ensure_ascii=False
-                                        ),
-                                    }
-                                )
-    
-                                # 保存更新后的历史记录
-                                MemoryManager.save_json("history.json", history)
-    
-                            # 添加explanation到历史对话
-                            if explanation := operation_result.get("explanation"):
-                                logger.info(
-                                    f"添加操作解释到历史对话: {explanation[:100]}..."
-                                )
-    
-                                # 读取当前历史记录
-                                history = MemoryManager.read_json("history.json")
-    
-                                # 添加explanation到历史记录，角色为assistant
-                                history.append(
-                                    {"role": "assistant", "content": explanation}
-                                )
-    
-                                # 保存更新后的历史记录
-                                MemoryManager.save_json("history.json", history)
-                        else:
-                            # 操作成功，更新planning.md中的任务状态
-                            self._update_planning_task_status(task_number)
-                            current_task_completed = True
-                            logger.info(f"任务 {task_number} 已完成")
-    
-                    # 检查是否还有未完成的任务
-                    all_tasks_completed = self._check_all_tasks_completed()
-    
+                # 按依赖关系调度规划任务，互不依赖的任务可以并行执行
+                planning_store = get_planning_store()
+                if not len(planning_store):
+                    logger.error("规划结果中没有可执行的任务")
+                    return {"status": "error", "message": "规划结果中没有可执行的任务"}
+                scheduler = TaskScheduler(planning_store)
+                logger.info(
+                    f"共 {len(scheduler.tasks)} 个任务，最大并行任务数: {self.max_parallel_tasks}"
+                )
+                operation_results = yield ("schedule", scheduler)
+
+                if scheduler.failed:
+                    task = scheduler.failed[0]
+                    return {
+                        "status": "error",
+                        "message": task.error,
+                        "operation_results": operation_results,
+                    }
+                if scheduler.pending:
+                    pending = [task.number for task in scheduler.pending]
+                    logger.error(f"以下任务的依赖无法满足（可能存在循环依赖）: {pending}")
+                    return {
+                        "status": "error",
+                        "message": f"任务依赖无法满足: {', '.join(pending)}",
+                        "operation_results": operation_results,
+                    }
+
                 # 所有任务完成后，运行总结Agent
                 logger.info("🔄 正在生成系统执行总结报告...")
-                summary_result = self.sumup_agent.run()
+                summary_result = yield self._agent_step(self.sumup_agent)
                 
                 return {
                     "status": "success",
@@ -236,85 +262,284 @@ class Workflow:
             logger.error(f"工作流程执行异常: {e}")
             return {"status": "error", "message": f"执行异常: {e}"}
 
-    def _update_planning_task_status(self, task_number: str) -> bool:
-        """更新planning.md中的任务状态为已完成
-
-        Args:
-            task_number: 任务编号，如"1.1"
+    def _task_agents(self):
+        """获取执行单个任务的细化Agent和操作Agent
 
-        Returns:
-            更新是否成功
+        串行执行时复用工作流的Agent；并行执行时每个任务使用独立的Agent实例，
+        避免并发任务共享消息状态（操作历史按任务编号分文件保存）。
         """
-        try:
-            planning_path = os.path.join(MEMORY_DIR, "todo", "planning.md")
-
-            # 读取planning.md内容
-            with open(planning_path, "r", encoding="utf-8") as f:
-                content = f.read()
+        if self.max_parallel_tasks <= 1:
+            return self.refinement_agent, self.operate_agent
 
-            # 替换对应任务的状态
-            pattern = r"- \[ \] " + re.escape(task_number)
-            replacement = f"- [x] {task_number}"
-            updated_content = re.sub(pattern, replacement, content)
+        refinement_agent = RefinementAgent()
+        operate_agent = OperateAgent()
+        refinement_agent.set_retry_budget(self.retry_budget)
+        operate_agent.set_retry_budget(self.retry_budget)
+        return refinement_agent, operate_agent
 
-            # 写回文件
-            with open(planning_path, "w", encoding="utf-8") as f:
-                f.write(updated_content)
+    def _task_steps(self, task_number: str):
+        """单个任务的步骤生成器：细化一次，然后循环调用操作Agent直到任务完成
 
+        Returns:
+            {"status": "success"/"error", "operation_results": [...], "message": ...}
+        """
+        refinement_agent, operate_agent = self._task_agents()
+        operation_results = []
+
+        # 3. 运行细化Agent - 只执行一次
+        logger.info(f"🔄 正在询问细化Agent（任务 {task_number}）...")
+        refinement_result = yield self._agent_step(refinement_agent, task_number)
+
+        # 获取当前处理的任务编号
+        current_task = refinement_result.get("current_task", "")
+        task_number_match = re.search(r"^(\d+\.\d+)", current_task)
+
+        if not task_number_match:
+            logger.error(f"无法识别任务编号: {current_task}")
+            return {
+                "status": "error",
+                "message": f"无法识别任务编号: {current_task}",
+                "operation_results": operation_results,
+            }
+
+        refinement_file = f"todo/refinement/{task_number.replace('.', '_')}.md"
+
+        # 确保细化文件存在
+        if not os.path.exists(os.path.join(MemoryManager.memory_dir(), refinement_file)):
+            logger.error(f"细化文件不存在: {refinement_file}")
+            return {
+                "status": "error",
+                "message": f"细化文件不存在: {refinement_file}",
+                "operation_results": operation_results,
+            }
+
+        # 4. 循环调用操作Agent直到当前任务完成
+        while True:
+            logger.info(f"🔄 正在调用操作Agent处理任务 {task_number}...")
+            operation_result = yield self._agent_step(operate_agent, refinement_file)
+            operation_results.append(operation_result)
+
+            # 处理操作结果
+            if "error" in operation_result and not operation_result.get("success", False):
+                logger.error(f"操作Agent执行失败: {operation_result['error']}，但将继续尝试")
+                # 不返回错误，继续尝试执行
+
+            # 检查操作是否成功完成（任务状态由调度器更新）
+            if operation_result.get("success", False):
+                logger.info(f"任务 {task_number} 已完成")
+                return {"status": "success", "operation_results": operation_results}
+
+            # 如果操作未成功完成，不清空历史记录，并将工具返回内容添加到历史对话
+            logger.info("操作未成功完成，保留历史记录")
+            self._append_operation_feedback(operation_result)
+
+    def _append_operation_feedback(self, operation_result: Dict[str, Any]):
+        """将未完成操作的工具结果和解释追加到history.json"""
+        tool_result = operation_result.get("tool_result")
+        explanation = operation_result.get("explanation")
+        if not tool_result and not explanation:
+            return
+
+        # 并行任务共用history.json，读改写需要加锁
+        with self._state_lock:
+            # 读取当前历史记录
+            history = MemoryManager.read_json("history.json")
+
+            # 如果有工具执行结果，将其添加到历史对话
+            if tool_result:
+                logger.info(f"添加工具执行结果到历史对话: {tool_result}")
+                history.append(
+                    {
+                        "role": "tool_result",
+                        "content": json.dumps(tool_result, ensure_ascii=False),
+                    }
+                )
+
+            # 添加explanation到历史对话，角色为assistant
+            if explanation:
+                logger.info(f"添加操作解释到历史对话: {explanation[:100]}...")
+                history.append({"role": "assistant", "content": explanation})
+
+            # 保存更新后的历史记录
+            MemoryManager.save_json("history.json", history)
+
+    def _finish_task(self, scheduler: TaskScheduler, task_number: str, result, operation_results: list):
+        """记录一个任务的执行结果"""
+        if isinstance(result, BaseException):
+            logger.error(f"任务 {task_number} 执行异常: {result}")
+            result = {"status": "error", "message": f"任务 {task_number} 执行异常: {result}"}
+
+        operation_results.extend(result.get("operation_results", []))
+        # 任务结束后释放其Python命名空间中的变量
+        reset_namespace(session_namespace(self.session.session_id, task_namespace(task_number)))
+        if result.get("status") == "success":
+            scheduler.complete(task_number)
             logger.info(f"已将任务 {task_number} 标记为已完成")
-            return True
-        except Exception as e:
-            logger.error(f"更新任务状态失败: {e}")
-            return False
+        else:
+            scheduler.fail(task_number, result.get("message", f"任务 {task_number} 执行失败"))
 
-    def _check_all_tasks_completed(self) -> bool:
-        """检查planning.md中是否所有任务都已完成
+    def _run_schedule(self, scheduler: TaskScheduler) -> list:
+        """同步执行调度器中的所有任务，最多max_parallel_tasks个任务同时执行
 
         Returns:
-            是否所有任务都已完成
+            所有操作Agent的执行结果
         """
-        try:
-            planning_path = os.path.join(MEMORY_DIR, "todo", "planning.md")
+        operation_results = []
+        if self.max_parallel_tasks <= 1:
+            # 串行执行，直接在当前线程中驱动
+            while not scheduler.failed and (ready := scheduler.take_ready(1)):
+                task_number = ready[0]
+                try:
+                    result = drive_steps(self._task_steps(task_number), self._perform_step)
+                except Exception as e:
+                    result = e
+                self._finish_task(scheduler, task_number, result, operation_results)
+            return operation_results
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_parallel_tasks, thread_name_prefix="acc-task"
+        ) as pool:
+            running = {}
+            while True:
+                # 有任务失败后不再启动新任务，等待已启动的任务结束
+                if not scheduler.failed:
+                    for task_number in scheduler.take_ready(self.max_parallel_tasks - len(running)):
+                        logger.info(f"▶️ 开始执行任务 {task_number}")
+                        # 在当前上下文的副本中执行，任务线程使用本工作流的后台任务表
+                        future = pool.submit(
+                            contextvars.copy_context().run,
+                            drive_steps,
+                            self._task_steps(task_number),
+                            self._perform_step,
+                        )
+                        running[future] = task_number
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task_number = running.pop(future)
+                    result = future.exception() or future.result()
+                    self._finish_task(scheduler, task_number, result, operation_results)
+        return operation_results
+
+    async def _arun_schedule(self, scheduler: TaskScheduler) -> list:
+        """异步执行调度器中的所有任务，与_run_schedule逻辑相同
 
-            # 读取planning.md内容
-            with open(planning_path, "r", encoding="utf-8") as f:
-                content = f.read()
+        Returns:
+            所有操作Agent的执行结果
+        """
+        operation_results = []
+        running = {}
+        while True:
+            if not scheduler.failed:
+                for task_number in scheduler.take_ready(self.max_parallel_tasks - len(running)):
+                    logger.info(f"▶️ 开始执行任务 {task_number}")
+                    task = asyncio.ensure_future(
+                        adrive_steps(self._task_steps(task_number), self._aperform_step)
+                    )
+                    running[task] = task_number
+            if not running:
+                break
 
-            # 查找是否还有未完成的任务
-            if re.search(r"- \[ \]", content):
-                return False
-            return True
-        except Exception as e:
-            logger.error(f"检查任务完成状态失败: {e}")
-            return True  # 出错时默认认为所有任务已完成，避免无限循环
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task_number = running.pop(task)
+                result = task.exception() or task.result()
+                self._finish_task(scheduler, task_number, result, operation_results)
+        return operation_results
 
 
-# 单例模式
+# 单例模式（默认会话）
 _workflow_instance = None
+# 命名会话的工作流实例
+_session_workflows: Dict[str, Workflow] = {}
+# 可重入：创建Workflow时可能触发过期会话的清理，进而在同一线程中移除其他会话的实例
+_workflow_lock = threading.RLock()
+
+
+class _WorkflowRegistration:
+    """内存会话关闭（包括过期被清理）时移除该会话的Workflow实例，释放其Agent和消息历史"""
+
+    def __init__(self, session_id: str, workflow: Workflow):
+        self.session_id = session_id
+        self.workflow = workflow
 
+    def close(self):
+        with _workflow_lock:
+            if _session_workflows.get(self.session_id) is self.workflow:
+                del _session_workflows[self.session_id]
+        self.workflow = None
 
-def get_workflow_instance() -> Workflow:
+
+def get_workflow_instance(session_id: Optional[str] = None) -> Workflow:
     """获取Workflow实例
 
+    Args:
+        session_id: 内存会话ID，为空时返回默认会话的实例
+
     Returns:
         Workflow实例
     """
     global _workflow_instance
 
-    if _workflow_instance is None:
-        _workflow_instance = Workflow()
+    with _workflow_lock:
+        if not session_id:
+            if _workflow_instance is None:
+                _workflow_instance = Workflow()
+            return _workflow_instance
+
+        workflow = _session_workflows.get(session_id)
+        # 会话过期被清理后重新创建
+        if workflow is None or workflow.session.closed:
+            workflow = Workflow(session_id)
+            _session_workflows[session_id] = workflow
+            workflow.session.resource(
+                "workflow_registration", lambda: _WorkflowRegistration(session_id, workflow)
+            )
+        return workflow
+
 
-    return _workflow_instance
+def close_workflow_session(session_id: str) -> bool:
+    """结束会话：丢弃该会话的Workflow实例并删除会话目录
+
+    Args:
+        session_id: 内存会话ID
+
+    Returns:
+        会话是否存在
+    """
+    with _workflow_lock:
+        workflow = _session_workflows.pop(session_id, None)
+    if workflow is None:
+        return get_session_manager().close(session_id)
+    workflow.close()
+    return True
 
 
-def run_workflow(user_input: str) -> Dict[str, Any]:
+def run_workflow(user_input: str, session_id: Optional[str] = None) -> Dict[str, Any]:
     """运行工作流程
 
     Args:
         user_input: 用户输入
+        session_id: 内存会话ID，不同会话可以在多个线程中同时运行
 
     Returns:
         执行结果
     """
-    workflow = get_workflow_instance()
+    workflow = get_workflow_instance(session_id)
     return workflow.execute(user_input)
+
+
+async def arun_workflow(user_input: str, session_id: Optional[str] = None) -> Dict[str, Any]:
+    """异步运行工作流程
+
+    Args:
+        user_input: 用户输入
+        session_id: 内存会话ID，不同会话可以在同一个事件循环中同时运行
+
+    Returns:
+        执行结果
+    """
+    workflow = get_workflow_instance(session_id)
+    return await workflow.arun(user_input)